@@ -0,0 +1,321 @@
+"""
+로컬 영속 캐시 백엔드.
+
+- 파싱 결과, 임베딩, 문제 세트처럼 "입력 해시 -> 결과" 형태로 재사용 가능한 값을 저장한다.
+- SQLite(기본) 또는 파일시스템 백엔드를 선택할 수 있고, 둘 다 TTL/용량 기반 eviction과 hit/miss 카운터를 제공한다.
+- 값은 bytes로만 다루며, 직렬화는 각 캐시 사용처의 책임이다.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Literal, Optional, Protocol
+
+CacheBackendKind = Literal["sqlite", "filesystem"]
+
+CACHE_DIR = os.getenv("CACHE_DIR", ".cache")
+
+
+def sha256_hex(*parts: str | bytes) -> str:
+    """Hash the given parts into a single hex digest."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8") if isinstance(part, str) else part)
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss/eviction counters of a cache backend."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hit_rate, 4),
+        }
+
+
+class CacheBackend(Protocol):
+    stats: CacheStats
+
+    def get(self, key: str) -> Optional[bytes]: ...
+
+    def set(self, key: str, value: bytes) -> None: ...
+
+    def delete(self, key: str) -> None: ...
+
+    def clear(self) -> None: ...
+
+    def size_bytes(self) -> int: ...
+
+
+class SqliteCacheBackend:
+    """
+    SQLite 파일 하나에 모든 엔트리를 저장하는 백엔드. 접근 시각 기준 LRU로 eviction 한다.
+    엔트리 수와 바이트 합계는 쓰기마다 전체를 집계하지 않고 메모리 카운터로 유지한다.
+    TTL 정리와 카운터 재집계(다른 프로세스의 쓰기 반영)는 `sweep_interval_seconds`마다 한 번만 한다.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        ttl_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        sweep_interval_seconds: float = 60.0,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._count = 0
+        self._total_bytes = 0
+        self._last_sweep_at = float("-inf")
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed_at ON cache_entries (accessed_at)")
+        with self._lock:
+            self._sweep(time.time())
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[bytes]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats.misses += 1
+                return None
+            value, created_at = row
+            if self._is_expired(created_at, now):
+                self._delete(key)
+                self.stats.evictions += 1
+                self.stats.misses += 1
+                return None
+            self._conn.execute("UPDATE cache_entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self.stats.hits += 1
+            return bytes(value)
+
+    def set(self, key: str, value: bytes) -> None:
+        now = time.time()
+        with self._lock:
+            self._delete(key)
+            self._conn.execute(
+                "INSERT INTO cache_entries (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, sqlite3.Binary(value), len(value), now, now),
+            )
+            self._count += 1
+            self._total_bytes += len(value)
+            self._evict(now)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._delete(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries")
+            self._count = self._total_bytes = 0
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            return self._total_bytes
+
+    def _delete(self, key: str) -> bool:
+        row = self._conn.execute("SELECT size FROM cache_entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return False
+        self._conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+        self._count -= 1
+        self._total_bytes -= row[0]
+        return True
+
+    def _sweep(self, now: float) -> None:
+        """TTL이 지난 엔트리를 지우고, 카운터를 테이블 기준으로 다시 맞춘다."""
+        if self.ttl_seconds is not None:
+            cursor = self._conn.execute(
+                "DELETE FROM cache_entries WHERE created_at < ?", (now - self.ttl_seconds,)
+            )
+            self.stats.evictions += max(cursor.rowcount, 0)
+        self._count, self._total_bytes = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries"
+        ).fetchone()
+        self._last_sweep_at = now
+
+    def _evict(self, now: float) -> None:
+        """용량 제한을 넘으면 가장 오래 접근되지 않은 엔트리부터 지운다."""
+        if now - self._last_sweep_at >= self.sweep_interval_seconds:
+            self._sweep(now)
+
+        while (self.max_entries is not None and self._count > self.max_entries) or (
+            self.max_bytes is not None and self._total_bytes > self.max_bytes
+        ):
+            row = self._conn.execute(
+                "SELECT key FROM cache_entries ORDER BY accessed_at ASC LIMIT 1"
+            ).fetchone()
+            if row is None or not self._delete(row[0]):
+                break
+            self.stats.evictions += 1
+
+
+class FileSystemCacheBackend:
+    """엔트리마다 파일 하나를 쓰는 백엔드. 파일 mtime을 접근 시각으로 사용해 LRU로 eviction 한다."""
+
+    _HEADER = struct.Struct("<d")  # created_at
+
+    def __init__(
+        self,
+        directory: str | Path,
+        *,
+        ttl_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        # 키에 경로 구분자 등이 섞여도 안전하도록 파일명은 항상 해시로 만든다.
+        return self.directory / f"{sha256_hex(key)}.bin"
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        now = time.time()
+        with self._lock:
+            try:
+                raw = path.read_bytes()
+            except FileNotFoundError:
+                self.stats.misses += 1
+                return None
+            (created_at,) = self._HEADER.unpack_from(raw)
+            if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+                path.unlink(missing_ok=True)
+                self.stats.evictions += 1
+                self.stats.misses += 1
+                return None
+            os.utime(path, (now, now))
+            self.stats.hits += 1
+            return raw[self._HEADER.size:]
+
+    def set(self, key: str, value: bytes) -> None:
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with self._lock:
+            tmp_path.write_bytes(self._HEADER.pack(time.time()) + value)
+            os.replace(tmp_path, path)
+            self._evict()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._path(key).unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            for path in self.directory.glob("*.bin"):
+                path.unlink(missing_ok=True)
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            return sum(path.stat().st_size for path in self.directory.glob("*.bin"))
+
+    def _evict(self) -> None:
+        now = time.time()
+        entries = []
+        for path in self.directory.glob("*.bin"):
+            try:
+                stat = path.stat()
+                with path.open("rb") as f:
+                    (created_at,) = self._HEADER.unpack(f.read(self._HEADER.size))
+            except (FileNotFoundError, struct.error):
+                continue
+            if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+                path.unlink(missing_ok=True)
+                self.stats.evictions += 1
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        entries.sort()
+        count = len(entries)
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if not (
+                (self.max_entries is not None and count > self.max_entries)
+                or (self.max_bytes is not None and total > self.max_bytes)
+            ):
+                break
+            path.unlink(missing_ok=True)
+            self.stats.evictions += 1
+            count -= 1
+            total -= size
+
+
+def create_cache_backend(
+    kind: CacheBackendKind,
+    namespace: str,
+    *,
+    ttl_seconds: Optional[float] = None,
+    max_entries: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    cache_dir: str | Path = CACHE_DIR,
+) -> CacheBackend:
+    """Create a cache backend stored under `cache_dir/namespace`."""
+    base = Path(cache_dir)
+    match kind:
+        case "sqlite":
+            return SqliteCacheBackend(
+                base / f"{namespace}.sqlite3",
+                ttl_seconds=ttl_seconds,
+                max_entries=max_entries,
+                max_bytes=max_bytes,
+            )
+        case "filesystem":
+            return FileSystemCacheBackend(
+                base / namespace,
+                ttl_seconds=ttl_seconds,
+                max_entries=max_entries,
+                max_bytes=max_bytes,
+            )
+        case _:
+            raise ValueError(f"Invalid cache backend: {kind}")
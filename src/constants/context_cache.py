@@ -0,0 +1,253 @@
+"""
+Provider-side context caching of shared prompt prefixes.
+
+problem_gen의 유형별 워커 3개와 같은 경험의 재실행은 모두 같은 `<resume>` 블록(BASE_SYSTEM_PROMPT)으로 시작한다.
+이 모듈은 그 공통 prefix를 Gemini context cache(`client.caches.create`)에 한 번만 올리고, 이후 호출은 캐시 이름
+(`cachedContents/...`)만 참조하게 한다. 캐시된 토큰은 할인된 가격으로 과금되고, 매 호출마다 다시 처리하지 않는다.
+
+- 캐시는 (모델, prefix) 해시마다 프로세스에 하나이며, 같은 키를 동시에 요청한 워커들은 첫 워커가 만든 캐시를 기다려 재사용한다.
+- 캐시는 `ttl_seconds` 뒤에 provider에서 만료된다. 만료 `refresh_margin_seconds` 전부터는 진행 중인 호출이
+  만료된 캐시를 참조하지 않도록 새 캐시를 만든다.
+- provider의 최소 캐시 크기(`min_tokens`)보다 짧은 prefix나 Gemini가 아닌 모델은 캐시하지 않고 None을 돌려준다.
+  캐시 생성이 실패해도 None을 돌려주므로, 호출하는 쪽은 언제나 캐시 없이 보내는 경로를 갖고 있어야 한다.
+- `local` 백엔드는 네트워크 없이 동작하는 테스트용 대역이다.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Literal, Optional, Protocol
+
+from constants.cache import sha256_hex
+from constants.rate_limiter import model_key
+
+logger = logging.getLogger(__name__)
+
+ContextCacheBackendKind = Literal["gemini", "local"]
+
+CONTEXT_CACHE_TTL_SECONDS = float(os.getenv("CONTEXT_CACHE_TTL_SECONDS", 600))
+# Gemini 2.5 Flash의 최소 캐시 크기. Pro 모델은 더 크다(4096).
+CONTEXT_CACHE_MIN_TOKENS = int(os.getenv("CONTEXT_CACHE_MIN_TOKENS", 1024))
+CONTEXT_CACHE_REFRESH_MARGIN_SECONDS = 60.0
+
+
+def estimate_tokens(text: str) -> int:
+    """A conservative (low) token estimate. Korean text has more tokens per character, so this never overshoots."""
+    return len(text) // 4
+
+
+def is_cacheable_model(model: str) -> bool:
+    """Only Gemini API models (`gemini-...` or `google_genai:gemini-...`) support the context cache backend."""
+    provider = model.split(":", 1)[0] if ":" in model else "google_genai"
+    return provider == "google_genai"
+
+
+@dataclass(frozen=True)
+class ContextCacheHandle:
+    name: str
+    model: str
+    expires_at: float
+
+
+class ContextCacheBackend(Protocol):
+    def create(self, model: str, system_instruction: str, ttl_seconds: float) -> ContextCacheHandle: ...
+
+    def delete(self, name: str) -> None: ...
+
+
+class GeminiContextCacheBackend:
+    """Creates explicit context caches with the google-genai client."""
+
+    def __init__(self, client: Any = None):
+        self._client = client
+
+    def client(self) -> Any:
+        if self._client is None:
+            from google import genai
+
+            self._client = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
+        return self._client
+
+    def create(self, model: str, system_instruction: str, ttl_seconds: float) -> ContextCacheHandle:
+        from google.genai import types
+
+        cached = self.client().caches.create(
+            model=model,
+            config=types.CreateCachedContentConfig(
+                system_instruction=system_instruction,
+                ttl=f"{int(ttl_seconds)}s",
+                display_name="problem_gen_prefix",
+            ),
+        )
+        expires_at = cached.expire_time.timestamp() if cached.expire_time else time.time() + ttl_seconds
+        return ContextCacheHandle(name=cached.name, model=model, expires_at=expires_at)
+
+    def delete(self, name: str) -> None:
+        self.client().caches.delete(name=name)
+
+
+class LocalContextCacheBackend:
+    """In-memory stand-in of the provider cache for tests and local runs."""
+
+    def __init__(self, *, clock: Callable[[], float] = time.time):
+        self._clock = clock
+        self._contents: dict[str, tuple[str, str, float]] = {}
+        self._lock = threading.Lock()
+        self.creates = 0
+
+    def create(self, model: str, system_instruction: str, ttl_seconds: float) -> ContextCacheHandle:
+        with self._lock:
+            self.creates += 1
+            name = f"cachedContents/local-{self.creates}"
+            expires_at = self._clock() + ttl_seconds
+            self._contents[name] = (model, system_instruction, expires_at)
+        return ContextCacheHandle(name=name, model=model, expires_at=expires_at)
+
+    def delete(self, name: str) -> None:
+        with self._lock:
+            self._contents.pop(name, None)
+
+    def get(self, name: str) -> Optional[str]:
+        """The cached system instruction, or None if it does not exist or has expired."""
+        with self._lock:
+            content = self._contents.get(name)
+        if content is None or content[2] <= self._clock():
+            return None
+        return content[1]
+
+
+@dataclass
+class ContextCacheStats:
+    created: int = 0
+    reused: int = 0
+    refreshed: int = 0
+    skipped: int = 0
+    failed: int = 0
+
+    def as_dict(self, entries: int = 0) -> dict[str, float]:
+        lookups = self.created + self.reused
+        return {
+            "entries": entries,
+            "created": self.created,
+            "reused": self.reused,
+            "refreshed": self.refreshed,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "reuse_rate": round(self.reused / lookups, 4) if lookups else 0.0,
+        }
+
+
+class ContextCacheManager:
+    """Maps (model, prefix) to a live provider cache, creating it once and replacing it before it expires."""
+
+    def __init__(
+        self,
+        backend: ContextCacheBackend,
+        *,
+        ttl_seconds: float = CONTEXT_CACHE_TTL_SECONDS,
+        min_tokens: int = CONTEXT_CACHE_MIN_TOKENS,
+        refresh_margin_seconds: float = CONTEXT_CACHE_REFRESH_MARGIN_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.min_tokens = min_tokens
+        self.refresh_margin_seconds = min(refresh_margin_seconds, ttl_seconds / 2)
+        self._clock = clock
+        self._handles: dict[str, ContextCacheHandle] = {}
+        self._key_locks: dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._stats = ContextCacheStats()
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            now = self._clock()
+            # 만료된 엔트리를 정리한다. 생성 중인 키의 락은 남겨 둔다.
+            for expired_key in [k for k, handle in self._handles.items() if handle.expires_at <= now]:
+                del self._handles[expired_key]
+                if not self._key_locks[expired_key].locked():
+                    del self._key_locks[expired_key]
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def get_or_create(self, model: str, prefix: str) -> Optional[str]:
+        """Return the cache name holding `prefix` as the system instruction of `model`, or None to send it uncached."""
+        if not is_cacheable_model(model) or estimate_tokens(prefix) < self.min_tokens:
+            with self._lock:
+                self._stats.skipped += 1
+            return None
+
+        provider_model = model_key(model)
+        key = sha256_hex(provider_model, prefix)
+        # 같은 키의 생성은 한 번만 한다. 다른 키의 생성은 서로 기다리지 않는다.
+        with self._key_lock(key):
+            with self._lock:
+                handle = self._handles.get(key)
+                if handle is not None and handle.expires_at - self.refresh_margin_seconds > self._clock():
+                    self._stats.reused += 1
+                    return handle.name
+            try:
+                new_handle = self.backend.create(provider_model, prefix, self.ttl_seconds)
+            except Exception as e:
+                with self._lock:
+                    self._stats.failed += 1
+                logger.warning(f"Could not create a context cache for {provider_model}, sending the prompt uncached: {type(e).__name__}: {str(e)[:200]}")
+                return None
+            with self._lock:
+                self._handles[key] = new_handle
+                self._stats.created += 1
+                self._stats.refreshed += handle is not None
+            return new_handle.name
+
+    def clear(self) -> None:
+        """Delete every cache this manager created. Caches expire on their own, so errors are only logged."""
+        with self._lock:
+            handles = list(self._handles.values())
+            self._handles.clear()
+            self._key_locks.clear()
+        for handle in handles:
+            try:
+                self.backend.delete(handle.name)
+            except Exception as e:
+                logger.warning(f"Could not delete context cache {handle.name}: {e}")
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            return self._stats.as_dict(entries=len(self._handles))
+
+
+def create_context_cache_backend(kind: ContextCacheBackendKind) -> ContextCacheBackend:
+    if kind == "gemini":
+        return GeminiContextCacheBackend()
+    if kind == "local":
+        return LocalContextCacheBackend()
+    raise ValueError(f"Unknown context cache backend: {kind}")
+
+
+_context_caches: dict[tuple, ContextCacheManager] = {}
+_context_caches_lock = threading.Lock()
+
+
+def get_context_cache(
+    backend: ContextCacheBackendKind = "gemini",
+    ttl_seconds: float = CONTEXT_CACHE_TTL_SECONDS,
+    min_tokens: int = CONTEXT_CACHE_MIN_TOKENS,
+) -> ContextCacheManager:
+    """Return the process-wide context cache manager for the given settings."""
+    cache_key = (backend, ttl_seconds, min_tokens)
+    with _context_caches_lock:
+        if cache_key not in _context_caches:
+            _context_caches[cache_key] = ContextCacheManager(
+                create_context_cache_backend(backend),
+                ttl_seconds=ttl_seconds,
+                min_tokens=min_tokens,
+            )
+        return _context_caches[cache_key]
+
+
+def context_cache_stats() -> dict[str, dict[str, float]]:
+    with _context_caches_lock:
+        managers = dict(_context_caches)
+    return {f"{backend}:{ttl_seconds}:{min_tokens}": manager.stats() for (backend, ttl_seconds, min_tokens), manager in managers.items()}
@@ -0,0 +1,154 @@
+"""
+Cache-backed embeddings.
+
+같은 섹션 텍스트나 반복되는 채팅 쿼리를 매번 다시 임베딩하지 않도록, 임베딩 모델 앞에 2단계 캐시를 둔다.
+  - 1단계: 프로세스 내 LRU
+  - 2단계: 로컬 SQLite (constants.cache.SqliteCacheBackend)
+벡터는 float32 blob으로 저장해 JSON 대비 용량을 크게 줄인다.
+"""
+import asyncio
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Optional
+
+from langchain_core.embeddings import Embeddings
+
+from constants.cache import CacheBackend, sha256_hex
+
+
+def encode_vector(vector: list[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def decode_vector(blob: bytes) -> list[float]:
+    vector = array("f")
+    vector.frombytes(blob)
+    return vector.tolist()
+
+
+class CachedEmbeddings(Embeddings):
+    """Wraps an `Embeddings` with an in-process LRU tier and a persistent tier keyed by model + text hash."""
+
+    def __init__(
+        self,
+        underlying: Embeddings,
+        model: str,
+        *,
+        backend: Optional[CacheBackend] = None,
+        lru_size: int = 4096,
+    ):
+        self.underlying = underlying
+        self.model = model
+        self.backend = backend
+        self.lru_size = lru_size
+        self._lru: OrderedDict[str, bytes] = OrderedDict()
+        self._lru_bytes = 0
+        self._lock = threading.Lock()
+        self.lru_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+
+    def _key(self, kind: str, text: str) -> str:
+        # 모델에 따라 query/document 임베딩이 다를 수 있으므로 종류도 키에 포함한다.
+        return sha256_hex(self.model, kind, text)
+
+    def _lru_get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            blob = self._lru.get(key)
+            if blob is not None:
+                self._lru.move_to_end(key)
+                self.lru_hits += 1
+            return blob
+
+    def _lru_put(self, key: str, blob: bytes) -> None:
+        with self._lock:
+            previous = self._lru.pop(key, None)
+            if previous is not None:
+                self._lru_bytes -= len(previous)
+            self._lru[key] = blob
+            self._lru_bytes += len(blob)
+            while len(self._lru) > self.lru_size:
+                _, evicted = self._lru.popitem(last=False)
+                self._lru_bytes -= len(evicted)
+
+    def _lookup(self, keys: list[str]) -> dict[str, bytes]:
+        found = {}
+        for key in keys:
+            blob = self._lru_get(key)
+            if blob is None and self.backend is not None:
+                blob = self.backend.get(key)
+                if blob is not None:
+                    with self._lock:
+                        self.persistent_hits += 1
+                    self._lru_put(key, blob)
+            if blob is not None:
+                found[key] = blob
+        return found
+
+    def _store(self, items: dict[str, bytes]) -> None:
+        for key, blob in items.items():
+            self._lru_put(key, blob)
+            if self.backend is not None:
+                self.backend.set(key, blob)
+
+    def _missing(self, kind: str, texts: list[str]) -> tuple[list[str], dict[str, bytes], dict[str, str]]:
+        keys = [self._key(kind, text) for text in texts]
+        found = self._lookup(list(dict.fromkeys(keys)))
+        # 같은 배치 안의 중복 텍스트는 한 번만 임베딩한다.
+        missing = {key: text for key, text in zip(keys, texts) if key not in found}
+        with self._lock:
+            self.misses += len(missing)
+        return keys, found, missing
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys, found, missing = self._missing("document", texts)
+        if missing:
+            vectors = self.underlying.embed_documents(list(missing.values()))
+            computed = {key: encode_vector(vector) for key, vector in zip(missing, vectors)}
+            self._store(computed)
+            found.update(computed)
+        return [decode_vector(found[key]) for key in keys]
+
+    def embed_query(self, text: str) -> list[float]:
+        keys, found, missing = self._missing("query", [text])
+        if missing:
+            blob = encode_vector(self.underlying.embed_query(text))
+            self._store({keys[0]: blob})
+            return decode_vector(blob)
+        return decode_vector(found[keys[0]])
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        # 영속 계층은 로컬 디스크 I/O이므로 이벤트 루프를 막지 않도록 스레드에서 실행한다.
+        keys, found, missing = await asyncio.to_thread(self._missing, "document", texts)
+        if missing:
+            vectors = await self.underlying.aembed_documents(list(missing.values()))
+            computed = {key: encode_vector(vector) for key, vector in zip(missing, vectors)}
+            await asyncio.to_thread(self._store, computed)
+            found.update(computed)
+        return [decode_vector(found[key]) for key in keys]
+
+    async def aembed_query(self, text: str) -> list[float]:
+        keys, found, missing = await asyncio.to_thread(self._missing, "query", [text])
+        if missing:
+            blob = encode_vector(await self.underlying.aembed_query(text))
+            await asyncio.to_thread(self._store, {keys[0]: blob})
+            return decode_vector(blob)
+        return decode_vector(found[keys[0]])
+
+    def stats(self, persistent_bytes: bool = True) -> dict[str, float]:
+        """`persistent_bytes=False` skips the backend size scan, which blocks; use it on the event loop."""
+        with self._lock:
+            hits = self.lru_hits + self.persistent_hits
+            total = hits + self.misses
+            stats = {
+                "lru_hits": self.lru_hits,
+                "persistent_hits": self.persistent_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / total, 4) if total else 0.0,
+                "lru_entries": len(self._lru),
+                "lru_bytes": self._lru_bytes,
+            }
+        if persistent_bytes:
+            stats["persistent_bytes"] = self.backend.size_bytes() if self.backend is not None else 0
+        return stats
@@ -0,0 +1,322 @@
+"""
+Model fallback chains with a process-wide circuit breaker.
+
+노드마다 모델 체인(예: gemini-2.5-pro → gemini-2.5-flash → anthropic:claude-sonnet-4-20250514)을 설정하면,
+호출은 체인의 앞에서부터 건강한 모델로 보내진다.
+
+- 모델 장애(할당량, timeout, 5xx, 연결 오류)가 연속으로 `failure_threshold`번 나면 그 모델의 회로가 열린다.
+  장애는 예외 타입과 HTTP 상태 코드로만 판단한다(메시지 문자열은 보지 않는다).
+- 대체 모델이 없는 체인(모델 하나)은 회로 차단기를 쓰지 않는다. 넘어갈 모델이 없으므로 회로를 열면 모든 사용자의 호출이 실패할 뿐이다.
+  회로가 열린 모델은 `recovery_seconds` 동안 호출하지 않고 곧바로 다음 모델로 넘어가므로, 장애 중인 모델의
+  timeout을 기다리지 않는다. 그 뒤에는 한 호출만 시험으로 보내(half-open) 성공하면 회로를 닫는다.
+- 회로 상태는 모델마다 프로세스에 하나이며, 동시에 실행되는 모든 그래프 실행이 공유한다.
+- 체인의 모든 모델이 실패하면 지수 백오프(full jitter) 뒤에 체인을 다시 시도한다.
+- 스키마 검증 실패 등 모델 장애가 아닌 오류는 다음 모델로 넘기지 않고 그대로 올린다.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Iterator, Literal, Optional, Sequence, TypeVar
+
+from constants.llm_invoke import MAX_QUOTA_RETRIES
+from constants.rate_limiter import model_key
+
+logger = logging.getLogger(__name__)
+
+R = TypeVar("R")
+
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_BREAKER_FAILURE_THRESHOLD", 3))
+CIRCUIT_BREAKER_RECOVERY_SECONDS = float(os.getenv("CIRCUIT_BREAKER_RECOVERY_SECONDS", 30))
+
+# 408, 429 할당량, 500 INTERNAL, 502, 503 UNAVAILABLE, 504 DEADLINE_EXCEEDED, 529 overloaded(Anthropic)
+MODEL_FAILURE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504, 529})
+
+CIRCUIT_OPEN_MESSAGE = "All models are unavailable (circuit open)"
+
+CircuitState = Literal["closed", "open", "half_open"]
+
+
+def _error_chain(e: BaseException) -> Iterator[BaseException]:
+    """The error and the errors it was raised from. Provider SDK errors are usually wrapped by the LangChain integration."""
+    seen: set[int] = set()
+    error: Optional[BaseException] = e
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        yield error
+        error = error.__cause__ or error.__context__
+
+
+def _transport_error_types() -> tuple[type[BaseException], ...]:
+    types: tuple[type[BaseException], ...] = (TimeoutError, asyncio.TimeoutError, ConnectionError)
+    try:
+        import httpx
+
+        types += (httpx.TimeoutException, httpx.NetworkError)
+    except ImportError:
+        pass
+    return types
+
+
+def status_code_of(e: BaseException) -> Optional[int]:
+    """The HTTP status code of a provider error (`code` of google-genai, `status_code` of Anthropic/OpenAI/httpx), if any."""
+    for error in _error_chain(e):
+        for value in (getattr(error, "status_code", None), getattr(error, "code", None), getattr(getattr(error, "response", None), "status_code", None)):
+            if isinstance(value, int) and not isinstance(value, bool) and 100 <= value < 600:
+                return value
+    return None
+
+
+def is_model_failure(e: BaseException) -> bool:
+    """Errors that say the model is unhealthy rather than that the request or its output was bad."""
+    transport_errors = _transport_error_types()
+    if any(isinstance(error, transport_errors) for error in _error_chain(e)):
+        return True
+    return status_code_of(e) in MODEL_FAILURE_STATUS_CODES
+
+
+class CircuitOpenError(RuntimeError):
+    """Every model of the chain is failing, and none was called."""
+
+    def __init__(self, models: Sequence[str]):
+        super().__init__(f"{CIRCUIT_OPEN_MESSAGE}: {', '.join(models)}")
+        self.models = list(models)
+
+
+@dataclass
+class CircuitBreakerStats:
+    successes: int = 0
+    failures: int = 0
+    opened: int = 0
+    short_circuited: int = 0
+
+    def as_dict(self, state: CircuitState = "closed") -> dict[str, float | str]:
+        return {
+            "state": state,
+            "successes": self.successes,
+            "failures": self.failures,
+            "opened": self.opened,
+            "short_circuited": self.short_circuited,
+        }
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker of one model."""
+
+    def __init__(
+        self,
+        failure_threshold: int = CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+        recovery_seconds: float = CIRCUIT_BREAKER_RECOVERY_SECONDS,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self._clock = clock
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+        self._stats = CircuitBreakerStats()
+
+    def _state_locked(self) -> CircuitState:
+        if self._opened_at is None:
+            return "closed"
+        return "open" if self._clock() - self._opened_at < self.recovery_seconds else "half_open"
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            return self._state_locked()
+
+    def stats(self) -> dict[str, float | str]:
+        with self._lock:
+            return self._stats.as_dict(self._state_locked())
+
+    def allow(self) -> bool:
+        """Whether a call may be sent now. In the half-open state only one probe call is let through."""
+        with self._lock:
+            state = self._state_locked()
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            self._stats.short_circuited += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._consecutive_failures = 0
+            self._opened_at = None
+            self._probing = False
+            self._stats.successes += 1
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._consecutive_failures += 1
+            self._stats.failures += 1
+            if self._probing or self._consecutive_failures >= self.failure_threshold:
+                self._stats.opened += self._opened_at is None or self._probing
+                self._opened_at = self._clock()
+            self._probing = False
+
+    def release(self) -> None:
+        """The call ended without telling anything about the model's health (cancelled, or a bad request)."""
+        with self._lock:
+            self._probing = False
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def configure_circuit_breaker(model: str, failure_threshold: int, recovery_seconds: float) -> CircuitBreaker:
+    breaker = CircuitBreaker(failure_threshold=failure_threshold, recovery_seconds=recovery_seconds)
+    with _breakers_lock:
+        _breakers[model_key(model)] = breaker
+    return breaker
+
+
+def get_circuit_breaker(model: str) -> CircuitBreaker:
+    """Return the process-wide circuit breaker of the model."""
+    key = model_key(model)
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = _breakers[key] = CircuitBreaker()
+        return breaker
+
+
+class _NoCircuitBreaker:
+    """Stands in for the breaker of a single-model chain: every call goes through and nothing is recorded."""
+
+    def allow(self) -> bool:
+        return True
+
+    def record_success(self) -> None:
+        pass
+
+    def record_failure(self) -> None:
+        pass
+
+    def release(self) -> None:
+        pass
+
+    def stats(self) -> dict[str, float | str]:
+        return {"state": "disabled"}
+
+
+_NO_CIRCUIT_BREAKER = _NoCircuitBreaker()
+
+
+def _breaker_for(model: str, models: Sequence[str]) -> CircuitBreaker | _NoCircuitBreaker:
+    return get_circuit_breaker(model) if len(models) > 1 else _NO_CIRCUIT_BREAKER
+
+
+def circuit_breaker_stats() -> dict[str, dict[str, float | str]]:
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {model: breaker.stats() for model, breaker in breakers.items()}
+
+
+@dataclass(frozen=True)
+class Backoff:
+    """Exponential backoff with full jitter between passes over the whole chain."""
+
+    base_seconds: float = 1.0
+    max_seconds: float = 20.0
+    max_rounds: int = 2
+
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_seconds, self.base_seconds * 2**attempt))
+
+
+def model_chain(model: str, fallback_models: Sequence[str]) -> list[str]:
+    """The model followed by its fallbacks, without duplicates."""
+    return list(dict.fromkeys([model, *fallback_models]))
+
+
+def quota_retries_for(models: Sequence[str]) -> int:
+    """With another model to fall back to, a quota error moves on right away instead of waiting for the quota."""
+    return 0 if len(models) > 1 else MAX_QUOTA_RETRIES
+
+
+def _on_failure(model: str, e: BaseException, breaker: CircuitBreaker | _NoCircuitBreaker) -> None:
+    breaker.record_failure()
+    logger.warning(f"{model} failed ({type(e).__name__}: {str(e)[:200]}), trying the next model. breaker={breaker.stats()}")
+
+
+async def afallback(models: Sequence[str], call: Callable[[str], Awaitable[R]], backoff: Backoff = Backoff()) -> R:
+    """Return `await call(model)` of the first healthy model of the chain that succeeds."""
+    last_error: Optional[BaseException] = None
+    for attempt in range(backoff.max_rounds):
+        if attempt:
+            await asyncio.sleep(backoff.delay(attempt - 1))
+        called = False
+        for model in models:
+            breaker = _breaker_for(model, models)
+            if not breaker.allow():
+                continue
+            called = True
+            try:
+                result = await call(model)
+            except Exception as e:
+                if not is_model_failure(e):
+                    breaker.release()
+                    raise
+                _on_failure(model, e, breaker)
+                last_error = e
+                continue
+            except BaseException:
+                breaker.release()
+                raise
+            breaker.record_success()
+            if model != models[0]:
+                logger.info(f"Fell back from {models[0]} to {model}.")
+            return result
+        if not called:
+            break
+    if last_error is None:
+        raise CircuitOpenError(models)
+    raise last_error
+
+
+def fallback(models: Sequence[str], call: Callable[[str], R], backoff: Backoff = Backoff()) -> R:
+    """Sync version of `afallback` for sync nodes."""
+    last_error: Optional[BaseException] = None
+    for attempt in range(backoff.max_rounds):
+        if attempt:
+            time.sleep(backoff.delay(attempt - 1))
+        called = False
+        for model in models:
+            breaker = _breaker_for(model, models)
+            if not breaker.allow():
+                continue
+            called = True
+            try:
+                result = call(model)
+            except Exception as e:
+                if not is_model_failure(e):
+                    breaker.release()
+                    raise
+                _on_failure(model, e, breaker)
+                last_error = e
+                continue
+            except BaseException:
+                breaker.release()
+                raise
+            breaker.record_success()
+            if model != models[0]:
+                logger.info(f"Fell back from {models[0]} to {model}.")
+            return result
+        if not called:
+            break
+    if last_error is None:
+        raise CircuitOpenError(models)
+    raise last_error
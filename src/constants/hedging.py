@@ -0,0 +1,177 @@
+"""
+Hedged LLM requests.
+
+`parse_resume_node`와 `problem_gen`의 p99는 100초 timeout까지 응답하지 않는 소수의 호출이 결정한다.
+hedging을 켜면 호출이 최근 지연 시간의 백분위(예: p95)를 넘도록 끝나지 않을 때 같은 모델(또는 대체 모델)로
+같은 요청을 한 번 더 보내고, 먼저 끝난 쪽의 결과를 쓴 뒤 나머지는 취소한다.
+
+- 추가 부하는 예산으로 제한한다: 호출마다 `max_extra_load`만큼 예산이 쌓이고, hedge 한 번에 1을 쓴다.
+  (max_extra_load=0.1이면 hedge 요청은 전체 호출의 약 10%를 넘지 않는다.)
+- 지연 시간 표본이 `min_samples`보다 적으면 hedge하지 않는다.
+- 동기 호출의 hedge는 스레드에서 실행하며, 진 쪽 호출은 취소할 수 없으므로 결과만 버린다.
+"""
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import logging
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+R = TypeVar("R")
+
+# 예산이 아무리 쌓여도 한꺼번에 보낼 수 있는 hedge 수의 상한
+MAX_HEDGE_BURST = 5.0
+
+
+@dataclass(frozen=True)
+class HedgeConfig:
+    percentile: float = 0.95
+    max_extra_load: float = 0.1
+    min_delay_seconds: float = 1.0
+    min_samples: int = 20
+
+
+@dataclass
+class HedgeStats:
+    calls: int = 0
+    hedges_fired: int = 0
+    hedges_won: int = 0
+    skipped_for_budget: int = 0
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            "calls": self.calls,
+            "hedges_fired": self.hedges_fired,
+            "hedges_won": self.hedges_won,
+            "skipped_for_budget": self.skipped_for_budget,
+            "fire_rate": round(self.hedges_fired / self.calls, 4) if self.calls else 0.0,
+            "win_rate": round(self.hedges_won / self.hedges_fired, 4) if self.hedges_fired else 0.0,
+        }
+
+
+class Hedger:
+    """Tracks the recent latency of one model and hedges its slow calls."""
+
+    def __init__(self, window: int = 200):
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._budget = 1.0
+        self._lock = threading.Lock()
+        self._stats = HedgeStats()
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            return self._stats.as_dict()
+
+    def hedge_delay(self, config: HedgeConfig) -> Optional[float]:
+        """The time after which a call is hedged, or None while there are too few samples."""
+        with self._lock:
+            if len(self._latencies) < config.min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        index = min(math.ceil(config.percentile * len(ordered)) - 1, len(ordered) - 1)
+        return max(ordered[max(index, 0)], config.min_delay_seconds)
+
+    def _start_call(self, config: HedgeConfig) -> None:
+        with self._lock:
+            self._stats.calls += 1
+            self._budget = min(self._budget + config.max_extra_load, MAX_HEDGE_BURST)
+
+    def _try_fire(self) -> bool:
+        with self._lock:
+            if self._budget < 1:
+                self._stats.skipped_for_budget += 1
+                return False
+            self._budget -= 1
+            self._stats.hedges_fired += 1
+            return True
+
+    def _finish(self, started_at: float, hedge_won: bool) -> None:
+        with self._lock:
+            self._latencies.append(time.perf_counter() - started_at)
+            self._stats.hedges_won += hedge_won
+
+    async def ainvoke(self, primary: Callable[[], Awaitable[R]], backup: Callable[[], Awaitable[R]], config: HedgeConfig) -> R:
+        """Run `primary`, and also `backup` if `primary` is slower than the hedge delay. Returns the first success."""
+        self._start_call(config)
+        delay = self.hedge_delay(config)
+        started_at = time.perf_counter()
+        primary_task = asyncio.ensure_future(primary())
+        try:
+            done, _ = await asyncio.wait({primary_task}, timeout=delay)
+            if done or not self._try_fire():
+                result = await primary_task
+                self._finish(started_at, hedge_won=False)
+                return result
+
+            logger.info(f"Hedging a call that is still running after {delay:.2f}s.")
+            backup_task = asyncio.ensure_future(backup())
+            pending = {primary_task, backup_task}
+            first_error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        for other in pending:
+                            other.cancel()
+                        self._finish(started_at, hedge_won=task is backup_task)
+                        return task.result()
+                    first_error = first_error or task.exception()
+            raise first_error
+        except BaseException:
+            primary_task.cancel()
+            raise
+
+    def invoke(self, primary: Callable[[], R], backup: Callable[[], R], config: HedgeConfig) -> R:
+        """Sync version of `ainvoke`. The losing call keeps running in its thread; its result is discarded."""
+        self._start_call(config)
+        delay = self.hedge_delay(config)
+        started_at = time.perf_counter()
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="hedge")
+        try:
+            primary_future = executor.submit(primary)
+            done, _ = concurrent.futures.wait({primary_future}, timeout=delay)
+            if done or not self._try_fire():
+                result = primary_future.result()
+                self._finish(started_at, hedge_won=False)
+                return result
+
+            logger.info(f"Hedging a call that is still running after {delay:.2f}s.")
+            backup_future = executor.submit(backup)
+            pending = {primary_future, backup_future}
+            first_error: Optional[BaseException] = None
+            while pending:
+                done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        self._finish(started_at, hedge_won=future is backup_future)
+                        return future.result()
+                    first_error = first_error or future.exception()
+            raise first_error
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+_hedgers: dict[str, Hedger] = {}
+_hedgers_lock = threading.Lock()
+
+
+def get_hedger(model: str) -> Hedger:
+    """Return the process-wide hedger of the model."""
+    with _hedgers_lock:
+        hedger = _hedgers.get(model)
+        if hedger is None:
+            hedger = _hedgers[model] = Hedger()
+        return hedger
+
+
+def hedge_stats() -> dict[str, dict[str, float]]:
+    with _hedgers_lock:
+        hedgers = dict(_hedgers)
+    return {model: hedger.stats() for model, hedger in hedgers.items()}
@@ -0,0 +1,190 @@
+"""
+Rate-limited LLM calls.
+
+모든 그래프의 LLM 호출은 이 모듈을 거쳐 `constants.rate_limiter`의 모델별 슬롯을 기다린 뒤 실행된다.
+제한을 넘겨 제공자가 할당량 오류(429/RESOURCE_EXHAUSTED)를 반환하면, 오류를 그대로 돌려주는 대신
+그 모델의 limiter를 잠시 멈추고 대기열로 돌아가 다시 시도한다.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any, AsyncIterator, Optional
+
+from constants.hedging import HedgeConfig, get_hedger
+from constants.rate_limiter import get_rate_limiter
+
+if TYPE_CHECKING:
+    from langchain_core.runnables import Runnable, RunnableConfig
+
+logger = logging.getLogger(__name__)
+
+# google-genai ClientError(code), google.api_core ResourceExhausted(code), Anthropic/OpenAI RateLimitError(status_code) 모두 429다.
+QUOTA_STATUS_CODE = 429
+QUOTA_BACKOFF_SECONDS = 2.0
+MAX_QUOTA_RETRIES = 3
+# 이미지/PDF 한 부분의 입력 토큰 추정치. 실제 사용량은 응답의 usage_metadata로 보정한다.
+FILE_PART_TOKENS = 2000
+CHARS_PER_TOKEN = 4
+
+
+def is_quota_error(e: BaseException) -> bool:
+    """Quota errors, classified like `constants.fallback.is_model_failure`: by the HTTP status in the error chain, never by message text."""
+    # fallback이 이 모듈을 import하므로 호출 시점에 가져온다.
+    from constants.fallback import status_code_of
+
+    return status_code_of(e) == QUOTA_STATUS_CODE
+
+
+def estimate_tokens(messages: Any, max_output_tokens: int = 0) -> int:
+    """Estimate the tokens of a call before sending it: text length plus a fixed cost per file part, plus the output cap."""
+    if isinstance(messages, str):
+        messages = [messages]
+    tokens = 0
+    for message in messages:
+        content = getattr(message, "content", message)
+        parts = [content] if isinstance(content, str) else content
+        for part in parts:
+            if isinstance(part, str):
+                tokens += len(part) // CHARS_PER_TOKEN
+            elif isinstance(part, dict) and part.get("type") == "text":
+                tokens += len(part.get("text", "")) // CHARS_PER_TOKEN
+            else:
+                tokens += FILE_PART_TOKENS
+    return tokens + max_output_tokens + 1
+
+
+def _usage_tokens(result: Any) -> Optional[int]:
+    message = result.get("raw") if isinstance(result, dict) else result
+    usage = getattr(message, "usage_metadata", None)
+    return usage.get("total_tokens") if usage else None
+
+
+def _settle(model: str, estimated_tokens: int, result: Any) -> None:
+    actual_tokens = _usage_tokens(result)
+    if actual_tokens is not None:
+        get_rate_limiter(model).settle(estimated_tokens, actual_tokens)
+
+
+def _on_quota_error(model: str, e: BaseException, attempt: int) -> float:
+    delay = QUOTA_BACKOFF_SECONDS * 2**attempt
+    get_rate_limiter(model).pause(delay)
+    logger.warning(f"{model} rejected a call for quota, pausing its limiter for {delay:.1f}s: {str(e)}")
+    return delay
+
+
+async def _aacquire(model: str, user_id: str, tokens: int) -> None:
+    limiter = get_rate_limiter(model)
+    waited = await limiter.acquire(user_id, tokens)
+    if waited > 0.5:
+        logger.info(f"Waited {waited:.2f}s for a {model} slot. stats={limiter.stats()}")
+
+
+async def _acall(runnable: Runnable, messages: Any, config: Optional[RunnableConfig], model: str, tokens: int) -> Any:
+    result = await runnable.ainvoke(messages, config)
+    _settle(model, tokens, result)
+    return result
+
+
+async def _ainvoke_once(runnable: Runnable, messages: Any, config: Optional[RunnableConfig], model: str, user_id: str, tokens: int) -> Any:
+    await _aacquire(model, user_id, tokens)
+    return await _acall(runnable, messages, config, model, tokens)
+
+
+def _call(runnable: Runnable, messages: Any, config: Optional[RunnableConfig], model: str, tokens: int) -> Any:
+    result = runnable.invoke(messages, config)
+    _settle(model, tokens, result)
+    return result
+
+
+def _invoke_once(runnable: Runnable, messages: Any, config: Optional[RunnableConfig], model: str, user_id: str, tokens: int) -> Any:
+    get_rate_limiter(model).acquire_sync(user_id, tokens)
+    return _call(runnable, messages, config, model, tokens)
+
+
+async def ainvoke_llm(
+    runnable: Runnable,
+    messages: Any,
+    config: Optional[RunnableConfig] = None,
+    *,
+    model: str,
+    user_id: str = "",
+    max_output_tokens: int = 0,
+    max_quota_retries: int = MAX_QUOTA_RETRIES,
+    hedge: Optional[HedgeConfig] = None,
+    hedge_runnable: Optional[Runnable] = None,
+    hedge_model: Optional[str] = None,
+) -> Any:
+    """
+    `runnable.ainvoke(messages, config)` after waiting for a slot of the model's limiter.
+
+    `hedge`를 주면 느린 호출을 `hedge_runnable`(없으면 같은 runnable)로 한 번 더 보낸다. (`constants.hedging`)
+    hedger의 지연 시간과 hedge 타이머는 슬롯을 받은 뒤의 provider 호출만 잰다(대기열 대기 시간은 제외).
+    hedge 요청은 `hedge_model`의 limiter 슬롯을 따로 받은 뒤 보낸다.
+    """
+    tokens = estimate_tokens(messages, max_output_tokens)
+    for attempt in range(max_quota_retries + 1):
+        try:
+            if hedge is None:
+                return await _ainvoke_once(runnable, messages, config, model, user_id, tokens)
+            await _aacquire(model, user_id, tokens)
+            return await get_hedger(model).ainvoke(
+                lambda: _acall(runnable, messages, config, model, tokens),
+                lambda: _ainvoke_once(hedge_runnable or runnable, messages, config, hedge_model or model, user_id, tokens),
+                hedge,
+            )
+        except Exception as e:
+            if not is_quota_error(e) or attempt == max_quota_retries:
+                raise
+            _on_quota_error(model, e, attempt)
+
+
+def invoke_llm(
+    runnable: Runnable,
+    messages: Any,
+    config: Optional[RunnableConfig] = None,
+    *,
+    model: str,
+    user_id: str = "",
+    max_output_tokens: int = 0,
+    max_quota_retries: int = MAX_QUOTA_RETRIES,
+    hedge: Optional[HedgeConfig] = None,
+    hedge_runnable: Optional[Runnable] = None,
+    hedge_model: Optional[str] = None,
+) -> Any:
+    """Sync version of `ainvoke_llm` for sync nodes."""
+    tokens = estimate_tokens(messages, max_output_tokens)
+    for attempt in range(max_quota_retries + 1):
+        try:
+            if hedge is None:
+                return _invoke_once(runnable, messages, config, model, user_id, tokens)
+            get_rate_limiter(model).acquire_sync(user_id, tokens)
+            return get_hedger(model).invoke(
+                lambda: _call(runnable, messages, config, model, tokens),
+                lambda: _invoke_once(hedge_runnable or runnable, messages, config, hedge_model or model, user_id, tokens),
+                hedge,
+            )
+        except Exception as e:
+            if not is_quota_error(e) or attempt == max_quota_retries:
+                raise
+            _on_quota_error(model, e, attempt)
+
+
+@asynccontextmanager
+async def arate_limited(model: str, messages: Any, *, user_id: str = "", max_output_tokens: int = 0) -> AsyncIterator[None]:
+    """Hold a slot for a call made inside the block, e.g. a streamed call."""
+    limiter = get_rate_limiter(model)
+    await limiter.acquire(user_id, estimate_tokens(messages, max_output_tokens))
+    started_at = time.perf_counter()
+    try:
+        yield
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        if is_quota_error(e):
+            _on_quota_error(model, e, 0)
+        raise
+    finally:
+        logger.debug(f"{model} call held its slot for {time.perf_counter() - started_at:.2f}s.")
@@ -0,0 +1,204 @@
+"""
+Process-wide chat model registry.
+
+노드가 호출될 때마다 `ChatGoogleGenerativeAI`/`init_chat_model`을 새로 만들면 매번 HTTP/gRPC 채널을 새로 열고,
+`with_structured_output`의 스키마 변환도 매번 다시 한다. 이 모듈은 (모델, temperature, timeout, 출력 예산, 스키마)를 키로
+모델 클라이언트와 structured output 래퍼를 재사용한다.
+
+- google-genai의 async 클라이언트는 처음 사용한 이벤트 루프에 묶이므로, 레지스트리는 이벤트 루프마다 하나씩 둔다
+  (루프 밖의 동기 호출은 별도의 레지스트리를 공유한다).
+- 각 레지스트리는 크기가 제한된 LRU이며, 가장 오래 쓰이지 않은 모델부터 내보낸다.
+
+Usage:
+    python -m constants.llm_registry   # 호출당 모델 준비 오버헤드 측정 (레지스트리 사용 전/후)
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, replace
+from typing import TYPE_CHECKING, Any, Callable, Hashable, Optional, Sequence
+
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseChatModel
+    from langchain_core.runnables import Runnable
+
+LLM_REGISTRY_MAX_MODELS = int(os.getenv("LLM_REGISTRY_MAX_MODELS", 64))
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    """Everything that is passed to the chat model constructor. None values are left to the provider defaults."""
+
+    model: str
+    temperature: Optional[float] = None
+    timeout: Optional[float] = None
+    max_output_tokens: Optional[int] = None
+    thinking_budget: Optional[int] = None
+    max_retries: Optional[int] = None
+
+    def kwargs(self) -> dict[str, Any]:
+        return {k: v for k, v in asdict(self).items() if k != "model" and v is not None}
+
+    def for_model(self, model: str) -> ModelSpec:
+        """The same settings for another model, e.g. the next model of a fallback chain. `thinking_budget` is Gemini-only."""
+        provider = model.split(":", 1)[0] if ":" in model else "google_genai"
+        thinking_budget = self.thinking_budget if provider.startswith("google") else None
+        return replace(self, model=model, thinking_budget=thinking_budget)
+
+
+def default_factory(model: str, **kwargs) -> BaseChatModel:
+    """`provider:model` 형식이면 init_chat_model로, 아니면 Gemini 모델로 만든다."""
+    if ":" in model:
+        from langchain.chat_models import init_chat_model
+
+        if "max_output_tokens" in kwargs:
+            kwargs["max_tokens"] = kwargs.pop("max_output_tokens")
+        return init_chat_model(model, **kwargs)
+
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    return ChatGoogleGenerativeAI(model=model, **kwargs)
+
+
+def factory_for(model: str, google_factory: Callable[..., BaseChatModel]) -> Optional[Callable[..., BaseChatModel]]:
+    """Use `google_factory` for bare Gemini model names and `default_factory` for `provider:model` names."""
+    return None if ":" in model else google_factory
+
+
+class ModelRegistry:
+    """A size-bounded LRU of chat models and the runnables derived from them."""
+
+    def __init__(self, max_models: int = LLM_REGISTRY_MAX_MODELS):
+        self.max_models = max_models
+        self._models: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_create(self, key: Hashable, create: Callable[[], Any]) -> Any:
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._models.move_to_end(key)
+                self.hits += 1
+                return model
+            self.misses += 1
+        # 생성은 락 밖에서 한다. 동시에 같은 키를 만들면 먼저 등록된 쪽을 쓴다.
+        created = create()
+        with self._lock:
+            model = self._models.setdefault(key, created)
+            self._models.move_to_end(key)
+            while len(self._models) > self.max_models:
+                self._models.popitem(last=False)
+                self.evictions += 1
+            return model
+
+    def clear(self) -> None:
+        with self._lock:
+            self._models.clear()
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "models": len(self._models),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+_sync_registry = ModelRegistry()
+_loop_registries: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, ModelRegistry]" = weakref.WeakKeyDictionary()
+_registries_lock = threading.Lock()
+
+
+def get_registry() -> ModelRegistry:
+    """Return the registry of the running event loop, or the shared registry outside of one."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return _sync_registry
+    with _registries_lock:
+        registry = _loop_registries.get(loop)
+        if registry is None:
+            registry = _loop_registries[loop] = ModelRegistry()
+        return registry
+
+
+def get_chat_model(spec: ModelSpec, factory: Optional[Callable[..., BaseChatModel]] = None) -> BaseChatModel:
+    """Return the shared chat model of the spec."""
+    factory = factory or default_factory
+    return get_registry().get_or_create(("chat", factory, spec), lambda: factory(model=spec.model, **spec.kwargs()))
+
+
+def get_structured_model(
+    spec: ModelSpec,
+    schema: type,
+    *,
+    include_raw: bool = False,
+    method: Optional[str] = None,
+    factory: Optional[Callable[..., BaseChatModel]] = None,
+) -> Runnable:
+    """Return the shared `with_structured_output` runnable of the spec and schema. `method=None` uses the model's default."""
+    factory = factory or default_factory
+    method_kwargs = {"method": method} if method is not None else {}
+    return get_registry().get_or_create(
+        ("structured", factory, spec, schema, include_raw, method),
+        lambda: get_chat_model(spec, factory).with_structured_output(schema, include_raw=include_raw, **method_kwargs),
+    )
+
+
+def get_tool_model(spec: ModelSpec, tools: Sequence[Any], factory: Optional[Callable[..., BaseChatModel]] = None) -> Runnable:
+    """Return the shared `bind_tools` runnable of the spec. Tools are identified by name."""
+    factory = factory or default_factory
+    return get_registry().get_or_create(
+        ("tools", factory, spec, tuple(tool.name for tool in tools)),
+        lambda: get_chat_model(spec, factory).bind_tools(tools),
+    )
+
+
+def benchmark(iterations: int = 200) -> dict[str, float]:
+    """Measure the per-call cost of preparing a structured model with and without the registry (no network calls)."""
+    from pydantic import BaseModel
+
+    os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+
+    class Answer(BaseModel):
+        answer: str
+        confidence: float
+
+    spec = ModelSpec(model="gemini-2.5-flash", temperature=0.1, timeout=100)
+
+    started_at = time.perf_counter()
+    for _ in range(iterations):
+        default_factory(spec.model, **spec.kwargs()).with_structured_output(Answer)
+    per_call_before = (time.perf_counter() - started_at) / iterations
+
+    registry = ModelRegistry()
+    create = lambda: default_factory(spec.model, **spec.kwargs()).with_structured_output(Answer)  # noqa: E731
+    started_at = time.perf_counter()
+    for _ in range(iterations):
+        registry.get_or_create(("structured", spec, Answer), create)
+    per_call_after = (time.perf_counter() - started_at) / iterations
+
+    return {
+        "iterations": iterations,
+        "per_call_ms_before": round(per_call_before * 1000, 3),
+        "per_call_ms_after": round(per_call_after * 1000, 3),
+        "speedup": round(per_call_before / per_call_after, 1) if per_call_after else float("inf"),
+    }
+
+
+if __name__ == "__main__":
+    print(benchmark())  # noqa: T201
@@ -0,0 +1,276 @@
+"""
+Process-wide per-model rate limiter.
+
+Gemini 할당량(요청/분, 토큰/분)을 넘기면 호출이 실패하고, 노드는 "quota" 문자열을 보고 오류를 반환할 뿐이었다.
+이 모듈은 모델마다 하나의 token bucket(요청 수 + 토큰 수)을 두고, 세 그래프의 모든 LLM 호출이 슬롯을 기다리게 한다.
+
+- 대기열은 사용자별로 나뉘며, 사용자 사이를 round-robin으로 돌며 슬롯을 준다. 한 사용자의 대량 요청이
+  다른 사용자의 요청을 굶기지 않는다.
+- asyncio 코루틴과 (sync 노드가 실행되는) 스레드가 같은 버킷을 공유한다.
+- 제한은 `LLM_RATE_LIMITS` 환경 변수(JSON, 예: {"gemini-2.5-pro": {"rpm": 150, "tpm": 2000000}})나
+  `configure_rate_limit`으로 설정한다. 설정이 없는 모델은 제한 없이 통과하되, 할당량 오류가 나면 `pause`로 잠시 멈춘다.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+# 대기 중인 호출은 최소 이 간격으로 깨어나 버킷을 다시 확인한다.
+MAX_POLL_SECONDS = 1.0
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    rpm: Optional[int] = None
+    tpm: Optional[int] = None
+
+
+@dataclass(eq=False)
+class _Waiter:
+    user: str
+    tokens: int
+    enqueued_at: float
+    notify: Callable[[], None]
+    granted: bool = False
+
+
+@dataclass
+class RateLimiterStats:
+    """Counters of one limiter. `queue_depth` is filled in by `FairRateLimiter.stats`."""
+
+    granted: int = 0
+    throttled: int = 0
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+    max_queue_depth: int = 0
+    pauses: int = 0
+
+    def as_dict(self, queue_depth: int = 0) -> dict[str, float]:
+        return {
+            "queue_depth": queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "granted": self.granted,
+            "throttled": self.throttled,
+            "avg_wait_seconds": round(self.total_wait_seconds / self.granted, 4) if self.granted else 0.0,
+            "max_wait_seconds": round(self.max_wait_seconds, 4),
+            "pauses": self.pauses,
+        }
+
+
+def _notify_loop(loop: asyncio.AbstractEventLoop, event: asyncio.Event) -> None:
+    try:
+        loop.call_soon_threadsafe(event.set)
+    except RuntimeError:
+        # 대기하던 이벤트 루프가 이미 닫혔다.
+        pass
+
+
+class FairRateLimiter:
+    """A requests/min + tokens/min token bucket with round-robin queueing across users."""
+
+    def __init__(self, rpm: Optional[int] = None, tpm: Optional[int] = None, *, clock: Callable[[], float] = time.monotonic):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._clock = clock
+        self._requests = float(rpm or 0)
+        self._tokens = float(tpm or 0)
+        self._updated_at = clock()
+        self._paused_until = 0.0
+        # 삽입 순서가 round-robin 순서이다. 슬롯을 받은 사용자는 맨 뒤로 보낸다.
+        self._queues: OrderedDict[str, deque[_Waiter]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = RateLimiterStats()
+
+    @property
+    def queue_depth(self) -> int:
+        with self._lock:
+            return sum(len(queue) for queue in self._queues.values())
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            return self._stats.as_dict(queue_depth=sum(len(queue) for queue in self._queues.values()))
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(now - self._updated_at, 0.0)
+        self._updated_at = now
+        if self.rpm:
+            self._requests = min(float(self.rpm), self._requests + elapsed * self.rpm / 60)
+        if self.tpm:
+            self._tokens = min(float(self.tpm), self._tokens + elapsed * self.tpm / 60)
+
+    def _delay_for(self, tokens: int, now: float) -> float:
+        delay = max(self._paused_until - now, 0.0)
+        if self.rpm and self._requests < 1:
+            delay = max(delay, (1 - self._requests) * 60 / self.rpm)
+        if self.tpm:
+            # 버킷보다 큰 요청은 버킷이 가득 찼을 때 보낸다.
+            needed = min(tokens, self.tpm)
+            if self._tokens < needed:
+                delay = max(delay, (needed - self._tokens) * 60 / self.tpm)
+        return delay
+
+    def _dispatch_locked(self) -> float:
+        """Grant slots in round-robin order. Returns how long until the next waiter can be served (0 if none wait)."""
+        now = self._clock()
+        self._refill(now)
+        while self._queues:
+            user, queue = next(iter(self._queues.items()))
+            waiter = queue[0]
+            delay = self._delay_for(waiter.tokens, now)
+            if delay > 0:
+                return delay
+            if self.rpm:
+                self._requests -= 1
+            if self.tpm:
+                self._tokens -= min(waiter.tokens, self.tpm)
+            queue.popleft()
+            del self._queues[user]
+            if queue:
+                self._queues[user] = queue
+            waiter.granted = True
+            waited = now - waiter.enqueued_at
+            self._stats.granted += 1
+            self._stats.throttled += waited > 0.01
+            self._stats.total_wait_seconds += waited
+            self._stats.max_wait_seconds = max(self._stats.max_wait_seconds, waited)
+            waiter.notify()
+        return 0.0
+
+    def _enqueue_locked(self, waiter: _Waiter) -> None:
+        self._queues.setdefault(waiter.user, deque()).append(waiter)
+        depth = sum(len(queue) for queue in self._queues.values())
+        self._stats.max_queue_depth = max(self._stats.max_queue_depth, depth)
+
+    def _cancel_locked(self, waiter: _Waiter) -> None:
+        if waiter.granted:
+            # 슬롯을 받은 뒤 취소되면 호출하지 않으므로 돌려준다.
+            self._refund_locked(waiter.tokens)
+            return
+        queue = self._queues.get(waiter.user)
+        if queue and waiter in queue:
+            queue.remove(waiter)
+            if not queue:
+                del self._queues[waiter.user]
+
+    def _refund_locked(self, tokens: int) -> None:
+        if self.rpm:
+            self._requests = min(float(self.rpm), self._requests + 1)
+        if self.tpm:
+            self._tokens = min(float(self.tpm), self._tokens + min(tokens, self.tpm))
+
+    @property
+    def unlimited(self) -> bool:
+        return not self.rpm and not self.tpm and self._paused_until <= self._clock()
+
+    async def acquire(self, user: str = "", tokens: int = 1) -> float:
+        """Wait for a slot. Returns the seconds spent waiting."""
+        if self.unlimited:
+            return 0.0
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        waiter = _Waiter(user=user, tokens=tokens, enqueued_at=self._clock(), notify=lambda: _notify_loop(loop, event))
+        with self._lock:
+            self._enqueue_locked(waiter)
+        try:
+            while True:
+                with self._lock:
+                    event.clear()
+                    delay = self._dispatch_locked()
+                    if waiter.granted:
+                        return self._clock() - waiter.enqueued_at
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=min(delay, MAX_POLL_SECONDS))
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            with self._lock:
+                self._cancel_locked(waiter)
+                self._dispatch_locked()
+            raise
+
+    def acquire_sync(self, user: str = "", tokens: int = 1) -> float:
+        """Blocking version of `acquire` for sync nodes running in executor threads."""
+        if self.unlimited:
+            return 0.0
+        event = threading.Event()
+        waiter = _Waiter(user=user, tokens=tokens, enqueued_at=self._clock(), notify=event.set)
+        with self._lock:
+            self._enqueue_locked(waiter)
+        try:
+            while True:
+                with self._lock:
+                    event.clear()
+                    delay = self._dispatch_locked()
+                    if waiter.granted:
+                        return self._clock() - waiter.enqueued_at
+                event.wait(timeout=min(delay, MAX_POLL_SECONDS))
+        except BaseException:
+            with self._lock:
+                self._cancel_locked(waiter)
+                self._dispatch_locked()
+            raise
+
+    def settle(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """Correct the token bucket with the usage reported by the provider."""
+        if not self.tpm:
+            return
+        with self._lock:
+            self._refill(self._clock())
+            self._tokens = min(float(self.tpm), self._tokens + estimated_tokens - actual_tokens)
+
+    def pause(self, seconds: float) -> None:
+        """Stop granting slots for a while, e.g. after the provider rejected a call for quota."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+            self._stats.pauses += 1
+
+
+def _load_rate_limits() -> dict[str, RateLimit]:
+    raw = os.getenv("LLM_RATE_LIMITS")
+    if not raw:
+        return {}
+    return {model: RateLimit(rpm=limits.get("rpm"), tpm=limits.get("tpm")) for model, limits in json.loads(raw).items()}
+
+
+_rate_limits: Optional[dict[str, RateLimit]] = None
+_limiters: dict[str, FairRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def model_key(model: str) -> str:
+    """`google_genai:gemini-2.5-flash`와 `gemini-2.5-flash`는 같은 할당량을 쓴다."""
+    return model.split(":", 1)[-1]
+
+
+def configure_rate_limit(model: str, rpm: Optional[int] = None, tpm: Optional[int] = None) -> FairRateLimiter:
+    """Replace the limiter of a model. Callers already waiting on the previous limiter are not moved."""
+    limiter = FairRateLimiter(rpm=rpm, tpm=tpm)
+    with _limiters_lock:
+        _limiters[model_key(model)] = limiter
+    return limiter
+
+
+def get_rate_limiter(model: str) -> FairRateLimiter:
+    """Return the process-wide limiter of the model."""
+    global _rate_limits
+    key = model_key(model)
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            if _rate_limits is None:
+                _rate_limits = _load_rate_limits()
+            limit = _rate_limits.get(key, RateLimit())
+            limiter = _limiters[key] = FairRateLimiter(rpm=limit.rpm, tpm=limit.tpm)
+        return limiter
+
+
+def rate_limiter_stats() -> dict[str, dict[str, float]]:
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {model: limiter.stats() for model, limiter in limiters.items()}
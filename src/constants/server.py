@@ -0,0 +1,34 @@
+"""
+LangGraph 서버의 커스텀 HTTP 앱 (langgraph.json의 `http.app`).
+
+그래프 모듈은 import 시점에 외부 서비스에 연결하지 않으므로, 서버가 뜰 때 lifespan에서
+Qdrant 클라이언트/컬렉션과 임베딩 모델을 미리 준비해 첫 요청의 지연을 없앤다.
+준비가 끝나면 그때까지 만들어진 객체를 `gc.freeze()`로 full GC 대상에서 빼, 요청 처리 중 GC 정지 시간을 줄인다.
+"""
+import gc
+import logging
+from contextlib import asynccontextmanager
+
+from starlette.applications import Starlette
+
+from constants.vector_store import embedding_cache_stats, warm_up
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: Starlette):
+    try:
+        await warm_up()
+    except Exception as e:
+        # 준비에 실패해도 서버는 띄운다. 첫 요청에서 다시 시도한다.
+        logger.warning(f"Warm-up failed: {str(e)}")
+    else:
+        # 영속 계층은 재시작 후에도 남아 있으므로, 시작 시점의 크기를 남겨 둔다.
+        logger.info(f"Embedding cache ready. stats={embedding_cache_stats()}")
+    gc.collect()
+    gc.freeze()
+    yield
+
+
+app = Starlette(lifespan=lifespan)
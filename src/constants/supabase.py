@@ -1,7 +1,17 @@
 import os
-from supabase import create_client, Client
+from functools import cache
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 supabase_url = os.getenv("SUPABASE_URL")
 supabase_key = os.getenv("SUPABASE_KEY")
 
-supabase: Client = create_client(supabase_url, supabase_key)
\ No newline at end of file
+
+@cache
+def get_supabase() -> "Client":
+    """Supabase 클라이언트는 처음 사용할 때 만든다. import 시점에는 연결하지 않는다."""
+    from supabase import create_client
+
+    return create_client(supabase_url, supabase_key)
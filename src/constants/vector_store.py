@@ -1,86 +1,237 @@
-import getpass
+"""
+Qdrant 벡터 스토어 공용 모듈.
+
+import 시점에는 네트워크 연결, 컬렉션 확인, API 키 입력 요청 등 어떤 부수 효과도 일으키지 않는다.
+클라이언트, 임베딩, 벡터 스토어는 처음 사용할 때 만들어지고, 컬렉션도 처음 사용할 때 한 번만 확인/생성한다.
+서버에서는 `warm_up()`으로 첫 요청 전에 미리 준비할 수 있다.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
 import os
-from langchain_qdrant import QdrantVectorStore
-from qdrant_client import QdrantClient
-from qdrant_client.http.models import Distance, VectorParams, Filter, FieldCondition, MatchValue, PointIdsList, \
-  PayloadSchemaType
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
-from langchain_core.vectorstores import VectorStoreRetriever
-from langchain_openai import OpenAIEmbeddings
+import threading
+import time
+import uuid
+from functools import cache
+from typing import TYPE_CHECKING, Callable, Optional
 
+from langchain_core.documents import Document
+from qdrant_client.http.models import Distance, VectorParams, Filter, FieldCondition, MatchValue, MatchAny, \
+  PayloadSchemaType, PointStruct, PayloadSelectorInclude, FilterSelector, Range, SetPayload, SetPayloadOperation, \
+  UpdateStatus, HasIdCondition, DeleteOperation, PointIdsList
 
-if not os.environ.get("GOOGLE_API_KEY"):
-  os.environ["GOOGLE_API_KEY"] = getpass.getpass("Enter API key for Google Gemini: ")
+if TYPE_CHECKING:
+  from langchain_core.vectorstores import VectorStoreRetriever
+  from langchain_qdrant import QdrantVectorStore
+  from qdrant_client import AsyncQdrantClient, QdrantClient
+
+  from constants.embedding_cache import CachedEmbeddings
+
+logger = logging.getLogger(__name__)
 
 qdrant_url = os.getenv("QDRANT_URL")
 qdrant_api_key = os.getenv("QDRANT_API_KEY")
 apply_docs_collection_name = os.getenv("APPLY_DOCS_COLLECTION_NAME")
-apply_docs_collection_name = os.getenv("APPLY_DOCS_COLLECTION_NAME")
 personalized_problems_collection_name = os.getenv("PERSONALIZED_PROBLEMS_COLLECTION_NAME")
+index_generations_collection_name = os.getenv(
+  "INDEX_GENERATIONS_COLLECTION_NAME",
+  f"{apply_docs_collection_name}_generations" if apply_docs_collection_name else None,
+)
+
+embedding_model = "text-embedding-3-small"
+
+
+def _require_env(value: Optional[str], env_name: str) -> str:
+  # Validate required environment variables
+  if not value:
+    raise ValueError(f"{env_name} environment variable is required")
+  return value
+
+
+def get_apply_docs_collection_name() -> str:
+  return _require_env(apply_docs_collection_name, "APPLY_DOCS_COLLECTION_NAME")
+
+
+def get_personalized_problems_collection_name() -> str:
+  return _require_env(personalized_problems_collection_name, "PERSONALIZED_PROBLEMS_COLLECTION_NAME")
+
+
+def get_index_generations_collection_name() -> str:
+  return _require_env(index_generations_collection_name, "INDEX_GENERATIONS_COLLECTION_NAME")
 
-# Validate required environment variables
-if not apply_docs_collection_name:
-    raise ValueError("APPLY_DOCS_COLLECTION_NAME environment variable is required")
-if not personalized_problems_collection_name:
-    raise ValueError("PERSONALIZED_PROBLEMS_COLLECTION_NAME environment variable is required")
 
 """
 - QdrantClient는 직접적인 종속성(Direct SDK)임.
 - QdrantClient는 정말 필수적일 때만 사용하는 것이 좋다. 예를 들어, 컬렉션 생성, 페이로드 인덱스 생성 등.
 - 그 외에는 vendor 비종속성 코드를 사용하는 것이 좋다.
 """
-client = QdrantClient(url=qdrant_url, api_key=qdrant_api_key)
+@cache
+def get_client() -> QdrantClient:
+  from qdrant_client import QdrantClient
+
+  return QdrantClient(url=qdrant_url, api_key=qdrant_api_key)
+
+
+@cache
+def get_async_client() -> AsyncQdrantClient:
+  """비동기 노드에서 공유하는 클라이언트. 내부 커넥션 풀을 재사용하므로 실행마다 새로 만들지 않는다."""
+  from qdrant_client import AsyncQdrantClient
+
+  return AsyncQdrantClient(url=qdrant_url, api_key=qdrant_api_key)
+
 
 # GoogleGenerativeAIEmbeddings에는 큰 문제가 있음. 
 # 내부적으로 grpc 통신을 한다는데, 이거땜에 비동기로 여겨짐. 이거땜에 모든 코드를 전부 비동기로 변경해야 함. 하지만 잘 적용도 안됨!! event loop error!!
 # embeddings = GoogleGenerativeAIEmbeddings(model=embedding_model)
-embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
+@cache
+def get_embeddings() -> CachedEmbeddings:
+  """같은 텍스트는 다시 임베딩하지 않도록 LRU + SQLite 캐시를 앞에 둔다."""
+  from langchain_openai import OpenAIEmbeddings
+
+  from constants.cache import create_cache_backend
+  from constants.embedding_cache import CachedEmbeddings
+
+  return CachedEmbeddings(
+    OpenAIEmbeddings(model=embedding_model),
+    model=embedding_model,
+    backend=create_cache_backend(
+      "sqlite",
+      "embedding_cache",
+      max_bytes=int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", 512 * 1024 * 1024)),
+    ),
+    lru_size=int(os.getenv("EMBEDDING_CACHE_LRU_SIZE", 4096)),
+  )
 
-def ensure_collection_exists(collection_name: str, vector_size: int = 1536):
+def embedding_cache_stats(persistent_bytes: bool = True) -> dict[str, float]:
+  """
+  임베딩 캐시의 누적 지표. 아직 임베딩 모델을 만들지 않았다면 빈 dict를 돌려준다.
+  persistent_bytes=False면 영속 계층의 크기 집계를 건너뛰고 메모리 카운터만 돌려준다(이벤트 루프에서 호출할 때).
+  """
+  if get_embeddings.cache_info().currsize == 0:
+    return {}
+  return get_embeddings().stats(persistent_bytes=persistent_bytes)
+
+USER_ID_INDEX = {"metadata.user_id": PayloadSchemaType.KEYWORD}
+GENERATION_POINTER_INDEXES = {
+  "generation": PayloadSchemaType.INTEGER,
+  "allocated_generation": PayloadSchemaType.INTEGER,
+}
+GENERATION_INDEXES = {
+  "metadata.generations": PayloadSchemaType.INTEGER,
+  "metadata.latest_generation": PayloadSchemaType.INTEGER,
+}
+
+def ensure_collection_exists(collection_name: str, vector_size: int = 1536, payload_indexes: dict = USER_ID_INDEX):
   """컬렉션이 존재하지 않으면 생성하고 필요한 인덱스를 설정합니다."""
-  try:
-    client.get_collection(collection_name)
-  except Exception as e:
-    client.create_collection(
+  client = get_client()
+  if client.collection_exists(collection_name):
+    return
+  client.create_collection(
+    collection_name=collection_name,
+    vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE),
+  )
+  for field_name, field_schema in payload_indexes.items():
+    client.create_payload_index(
       collection_name=collection_name,
-      vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE),
+      field_name=field_name,
+      field_schema=field_schema
     )
-    client.create_payload_index(
+
+async def aensure_collection_exists(collection_name: str, vector_size: int = 1536, payload_indexes: dict = USER_ID_INDEX):
+  """ensure_collection_exists의 비동기 버전."""
+  async_client = get_async_client()
+  if await async_client.collection_exists(collection_name):
+    return
+  await async_client.create_collection(
+    collection_name=collection_name,
+    vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE),
+  )
+  for field_name, field_schema in payload_indexes.items():
+    await async_client.create_payload_index(
       collection_name=collection_name,
-      field_name="metadata.user_id",
-      field_schema=PayloadSchemaType.KEYWORD
+      field_name=field_name,
+      field_schema=field_schema
     )
 
-# 컬렉션들 초기화
-ensure_collection_exists(apply_docs_collection_name)
-ensure_collection_exists(personalized_problems_collection_name)
+
+def _collection_specs() -> list[tuple[str, int, dict]]:
+  return [
+    (get_apply_docs_collection_name(), 1536, {**USER_ID_INDEX, **GENERATION_INDEXES}),
+    (get_personalized_problems_collection_name(), 1536, USER_ID_INDEX),
+    # 사용자별 "현재 generation" 포인터와 generation 카운터만 저장하는 컬렉션. 벡터는 의미가 없으므로 크기 1로 둔다.
+    (get_index_generations_collection_name(), 1, GENERATION_POINTER_INDEXES),
+  ]
+
+
+_collections_ready = False
+_collections_lock = threading.Lock()
+
+
+def ensure_collections() -> None:
+  """컬렉션들을 처음 사용할 때 한 번만 확인/생성한다."""
+  global _collections_ready
+  if _collections_ready:
+    return
+  with _collections_lock:
+    if not _collections_ready:
+      for collection_name, vector_size, payload_indexes in _collection_specs():
+        ensure_collection_exists(collection_name, vector_size, payload_indexes)
+      _collections_ready = True
+
+
+async def aensure_collections() -> None:
+  """ensure_collections의 비동기 버전."""
+  global _collections_ready
+  if _collections_ready:
+    return
+  for collection_name, vector_size, payload_indexes in _collection_specs():
+    try:
+      await aensure_collection_exists(collection_name, vector_size, payload_indexes)
+    except Exception:
+      # 동시에 다른 실행이 먼저 만들었을 수 있다.
+      if not await get_async_client().collection_exists(collection_name):
+        raise
+  _collections_ready = True
+
+
+async def warm_up() -> None:
+  """서버 시작 시 호출해 임베딩/클라이언트 생성과 컬렉션 확인을 첫 요청 전에 끝낸다."""
+  get_embeddings()
+  await aensure_collections()
 
 
 def create_vector_store(collection_name: str) -> QdrantVectorStore:
   """Factory function to create QdrantVectorStore instances."""
+  from langchain_qdrant import QdrantVectorStore
+
+  ensure_collections()
   return QdrantVectorStore(
-    client=client,
+    client=get_client(),
     collection_name=collection_name,
-    embedding=embeddings,
+    embedding=get_embeddings(),
     content_payload_key="page_content",
     metadata_payload_key="metadata",
   )
 
-apply_docs_vector_store = create_vector_store(apply_docs_collection_name)
-personalized_problems_vector_store = create_vector_store(personalized_problems_collection_name)
+
+@cache
+def get_apply_docs_vector_store() -> QdrantVectorStore:
+  return create_vector_store(get_apply_docs_collection_name())
+
+
+@cache
+def get_personalized_problems_vector_store() -> QdrantVectorStore:
+  return create_vector_store(get_personalized_problems_collection_name())
 
 """
   - as_retriever()가 리턴하는 `VectorStoreRetriever`가 바로 완전한 비종속성 코드임.
   - 따라서 아래와 같이 문서 검색 예시를 추상화하는 것이 좋다.
 """
 def get_retriever_for_user(user_id: str) -> VectorStoreRetriever:
-  return apply_docs_vector_store.as_retriever(search_type="similarity", search_kwargs={
+  return get_apply_docs_vector_store().as_retriever(search_type="similarity", search_kwargs={
   "k": 5,
-  "filter": Filter(
-    must=[
-      FieldCondition(key="metadata.user_id", match=MatchValue(value=user_id))
-    ]
-  )
+  "filter": get_user_docs_filter(user_id),
 })
 
 def get_filter_condition(key: str, value: str) -> Filter:
@@ -90,23 +241,411 @@ def get_filter_condition(key: str, value: str) -> Filter:
     ]
   )
 
-def delete_docs_by(key: str, value: str, collection_name: str = apply_docs_collection_name):
-  filter_condition = get_filter_condition(key, value)
-  scroll_result = client.scroll(
-    collection_name=collection_name,
-    scroll_filter=filter_condition,
-    with_payload=False,
+def delete_docs_by(key: str, value: str, collection_name: Optional[str] = None):
+  """필터에 맞는 모든 포인트를 서버에서 한 번에 삭제한다."""
+  ensure_collections()
+  result = get_client().delete(
+    collection_name=collection_name or get_apply_docs_collection_name(),
+    points_selector=FilterSelector(filter=get_filter_condition(key, value)),
+  )
+  return result.status == UpdateStatus.COMPLETED
+
+
+async def adelete_docs_by(key: str, value: str, collection_name: Optional[str] = None):
+  """delete_docs_by의 비동기 버전."""
+  await aensure_collections()
+  result = await get_async_client().delete(
+    collection_name=collection_name or get_apply_docs_collection_name(),
+    points_selector=FilterSelector(filter=get_filter_condition(key, value)),
+  )
+  return result.status == UpdateStatus.COMPLETED
+
+
+def get_user_apply_docs(user_id: str, page_size: int = 256) -> list[Document]:
+  """사용자의 현재 generation 지원 문서(프로필 + 경험)를 모두 읽는다. 임베딩 벡터는 가져오지 않는다."""
+  ensure_collections()
+  docs: list[Document] = []
+  offset = None
+  while True:
+    points, offset = get_client().scroll(
+      collection_name=get_apply_docs_collection_name(),
+      scroll_filter=get_user_docs_filter(user_id),
+      limit=page_size,
+      offset=offset,
+      with_payload=True,
+      with_vectors=False,
+    )
+    docs.extend(
+      Document(id=str(point.id), page_content=point.payload["page_content"], metadata=point.payload["metadata"])
+      for point in points
+    )
+    if offset is None:
+      return docs
+
+
+async def aget_user_apply_docs(user_id: str, page_size: int = 256) -> list[Document]:
+  """get_user_apply_docs의 비동기 버전."""
+  await aensure_collections()
+  scroll_filter = await aget_user_docs_filter(user_id)
+  docs: list[Document] = []
+  offset = None
+  while True:
+    points, offset = await get_async_client().scroll(
+      collection_name=get_apply_docs_collection_name(),
+      scroll_filter=scroll_filter,
+      limit=page_size,
+      offset=offset,
+      with_payload=True,
+      with_vectors=False,
+    )
+    docs.extend(
+      Document(id=str(point.id), page_content=point.payload["page_content"], metadata=point.payload["metadata"])
+      for point in points
+    )
+    if offset is None:
+      return docs
+
+
+async def aget_docs_by_ids(ids: list[str], collection_name: Optional[str] = None) -> list[Document]:
+  """QdrantVectorStore.get_by_ids의 비동기 버전. 순서는 ids와 같지 않을 수 있다."""
+  await aensure_collections()
+  points = await get_async_client().retrieve(
+    collection_name=collection_name or get_apply_docs_collection_name(),
+    ids=ids,
+    with_payload=True,
     with_vectors=False,
-    limit=30,
   )
+  return [
+    Document(id=str(point.id), page_content=point.payload["page_content"], metadata=point.payload["metadata"])
+    for point in points
+  ]
+
+
+def delete_docs_by_any(key: str, values: list[str], collection_name: Optional[str] = None):
+  """key의 값이 values 중 하나인 모든 포인트를 한 번의 요청으로 삭제한다."""
+  ensure_collections()
+  result = get_client().delete(
+    collection_name=collection_name or get_apply_docs_collection_name(),
+    points_selector=FilterSelector(filter=Filter(must=[FieldCondition(key=key, match=MatchAny(any=values))])),
+  )
+  return result.status == UpdateStatus.COMPLETED
+
+
+async def adelete_docs_by_any(key: str, values: list[str], collection_name: Optional[str] = None):
+  """delete_docs_by_any의 비동기 버전."""
+  await aensure_collections()
+  result = await get_async_client().delete(
+    collection_name=collection_name or get_apply_docs_collection_name(),
+    points_selector=FilterSelector(filter=Filter(must=[FieldCondition(key=key, match=MatchAny(any=values))])),
+  )
+  return result.status == UpdateStatus.COMPLETED
+
+
+async def aadd_documents(documents: list[Document], ids: list[str], collection_name: Optional[str] = None) -> list[str]:
+  """
+  QdrantVectorStore.aadd_documents는 내부적으로 스레드 풀에서 동기 메서드를 실행한다.
+  이벤트 루프를 점유하지 않도록 임베딩과 업서트를 모두 비동기 API로 직접 수행한다.
+  payload 구조는 QdrantVectorStore와 동일하다(page_content, metadata).
+  """
+  if not documents:
+    return []
+  await aensure_collections()
+  vectors = await get_embeddings().aembed_documents([doc.page_content for doc in documents])
+  await get_async_client().upsert(
+    collection_name=collection_name or get_apply_docs_collection_name(),
+    points=[
+      PointStruct(
+        id=point_id,
+        vector=vector,
+        payload={"page_content": doc.page_content, "metadata": doc.metadata},
+      )
+      for point_id, doc, vector in zip(ids, documents, vectors)
+    ],
+  )
+  return ids
+
+
+# 같은 사용자의 같은 내용 청크는 항상 같은 point id를 갖도록 한다. 업서트가 멱등이 되고, 변경되지 않은 청크의 id가 유지된다.
+_POINT_ID_NAMESPACE = uuid.UUID("6f1c1b4e-5d0e-4a39-9a53-3f4f2b8f7c21")
+
+
+def document_point_id(user_id: str, content_hash: str) -> str:
+  return str(uuid.uuid5(_POINT_ID_NAMESPACE, f"{user_id}:{content_hash}"))
 
-  points = scroll_result[0]
-  ids_to_delete = [point.id for point in points]
 
-  if ids_to_delete:
-    client.delete(
+"""
+Per-user index generations
+  - 청크 포인트는 자신이 속한 generation 목록(metadata.generations)과 가장 최근 generation(metadata.latest_generation)을 가진다.
+  - 새 인덱싱은 새 generation id로 청크를 쓴 뒤(변경되지 않은 청크는 generation만 추가), 포인터 포인트 하나를 업서트해 원자적으로 전환한다.
+  - 검색은 현재 generation에 속한 청크만 읽으므로, 인덱싱 도중에도 이전 generation이 그대로 보인다.
+  - 이전 generation의 청크는 백그라운드에서 서버 측 필터 삭제로 정리한다.
+  - 전환되지 못하고 버려진 generation(가장 최근 할당분 제외)도 같은 GC에서 청크에서 빼거나 삭제한다.
+  - generation id는 사용자별 카운터 포인트에서 할당하고, 포인터는 더 새로운 generation으로만 바뀌는 조건부 쓰기(update_filter)로 전환한다.
+    Qdrant는 한 shard의 쓰기를 순서대로 적용하므로, 여러 워커 프로세스가 동시에 인덱싱해도 할당과 전환이 어긋나지 않는다.
+"""
+GENERATION_ALLOCATION_ATTEMPTS = 20
+
+
+def _generation_pointer_id(user_id: str) -> str:
+  return str(uuid.uuid5(_POINT_ID_NAMESPACE, f"generation:{user_id}"))
+
+
+def _generation_counter_id(user_id: str) -> str:
+  return str(uuid.uuid5(_POINT_ID_NAMESPACE, f"generation_counter:{user_id}"))
+
+
+async def anew_generation(user_id: str) -> int:
+  """
+  사용자의 다음 generation id를 할당한다. 모든 프로세스가 같은 카운터 포인트를 쓰므로 id는 사용자별로 단조 증가한다.
+  카운터보다 큰 값으로만 바뀌는 조건부 쓰기로 값을 올리고, 다시 읽어 owner 토큰이 자신의 것일 때만 할당에 성공한 것으로 본다.
+  """
+  await aensure_collections()
+  async_client = get_async_client()
+  collection_name = get_index_generations_collection_name()
+  counter_id, pointer_id = _generation_counter_id(user_id), _generation_pointer_id(user_id)
+  for _ in range(GENERATION_ALLOCATION_ATTEMPTS):
+    payloads = {
+      str(point.id): point.payload or {}
+      for point in await async_client.retrieve(collection_name, ids=[counter_id, pointer_id], with_payload=True)
+    }
+    # 카운터가 없는 사용자(이전 버전에서 인덱싱된 사용자)는 현재 포인터 다음 값부터 할당한다.
+    generation = max(
+      payloads.get(counter_id, {}).get("allocated_generation", 0),
+      payloads.get(pointer_id, {}).get("generation", 0),
+    ) + 1
+    owner = uuid.uuid4().hex
+    await async_client.upsert(
       collection_name=collection_name,
-      points_selector=PointIdsList(points=ids_to_delete)
+      points=[PointStruct(
+        id=counter_id,
+        vector=[1.0],
+        payload={"user_id": user_id, "allocated_generation": generation, "owner": owner},
+      )],
+      update_filter=Filter(must=[FieldCondition(key="allocated_generation", range=Range(lt=generation))]),
     )
-    return True
-  return False
\ No newline at end of file
+    points = await async_client.retrieve(collection_name, ids=[counter_id], with_payload=True)
+    if points and (points[0].payload or {}).get("owner") == owner:
+      return generation
+  raise RuntimeError(f"Could not allocate an index generation for user {user_id}")
+
+
+def get_current_generation(user_id: str) -> Optional[int]:
+  ensure_collections()
+  points = get_client().retrieve(get_index_generations_collection_name(), ids=[_generation_pointer_id(user_id)], with_payload=True)
+  return points[0].payload["generation"] if points else None
+
+
+async def aget_current_generation(user_id: str) -> Optional[int]:
+  await aensure_collections()
+  points = await get_async_client().retrieve(get_index_generations_collection_name(), ids=[_generation_pointer_id(user_id)], with_payload=True)
+  return points[0].payload["generation"] if points else None
+
+
+def user_docs_filter(user_id: str, generation: Optional[int]) -> Filter:
+  """generation 포인터가 없는 사용자(마이그레이션 이전 데이터)는 user_id로만 필터링한다."""
+  must = [FieldCondition(key="metadata.user_id", match=MatchValue(value=user_id))]
+  if generation is not None:
+    must.append(FieldCondition(key="metadata.generations", match=MatchValue(value=generation)))
+  return Filter(must=must)
+
+
+def get_user_docs_filter(user_id: str) -> Filter:
+  """사용자의 현재 generation 청크만 읽는 필터."""
+  return user_docs_filter(user_id, get_current_generation(user_id))
+
+
+async def aget_user_docs_filter(user_id: str) -> Filter:
+  """get_user_docs_filter의 비동기 버전."""
+  return user_docs_filter(user_id, await aget_current_generation(user_id))
+
+
+async def astage_documents(
+  user_id: str,
+  generation: int,
+  documents: list[Document],
+  current_generation: Optional[int] = None,
+) -> tuple[int, int]:
+  """
+  문서를 새 generation에 기록하고 (임베딩한 수, 재사용한 수)를 반환한다.
+  이미 같은 content_hash의 포인트가 있으면 임베딩하지 않고 generation만 추가한다.
+  """
+  if not documents:
+    return 0, 0
+  await aensure_collections()
+  ids = [document_point_id(user_id, doc.metadata["content_hash"]) for doc in documents]
+  existing_points = {
+    str(point.id): point
+    for point in await get_async_client().retrieve(
+      get_apply_docs_collection_name(),
+      ids=ids,
+      with_payload=PayloadSelectorInclude(include=["metadata.generations", "metadata.latest_generation"]),
+    )
+  }
+
+  operations = []
+  new_documents, new_ids = [], []
+  for point_id, doc in zip(ids, documents):
+    point = existing_points.get(point_id)
+    if point is None:
+      metadata = {**doc.metadata, "generations": [generation], "latest_generation": generation}
+      new_documents.append(Document(page_content=doc.page_content, metadata=metadata))
+      new_ids.append(point_id)
+      continue
+    metadata = (point.payload or {}).get("metadata", {})
+    # 현재 포인터보다 오래된 generation은 더 이상 읽히지 않으므로 목록에서 뺀다.
+    generations = [
+      g for g in metadata.get("generations", [])
+      if current_generation is None or g >= current_generation
+    ]
+    operations.append(SetPayloadOperation(set_payload=SetPayload(
+      payload={
+        "generations": sorted({*generations, generation}),
+        "latest_generation": max(metadata.get("latest_generation") or 0, generation),
+      },
+      points=[point_id],
+      key="metadata",
+    )))
+
+  if operations:
+    await get_async_client().batch_update_points(get_apply_docs_collection_name(), update_operations=operations)
+  await aadd_documents(new_documents, ids=new_ids)
+  return len(new_documents), len(operations)
+
+
+async def aunstage_documents_except(user_id: str, generation: int, keep_ids: list[str]) -> int:
+  """
+  generation에 기록되었지만 keep_ids에 없는 청크에서 generation을 빼고, 다른 generation에 속하지 않는 청크는 삭제한다.
+  스트리밍 파싱 도중 미리 기록했지만 최종 결과에는 없는 청크(실패한 시도 등)를 전환 전에 정리할 때 사용한다.
+  """
+  await aensure_collections()
+  async_client = get_async_client()
+  collection_name = get_apply_docs_collection_name()
+  scroll_filter = Filter(
+    must=[
+      FieldCondition(key="metadata.user_id", match=MatchValue(value=user_id)),
+      FieldCondition(key="metadata.generations", match=MatchValue(value=generation)),
+    ],
+    must_not=[HasIdCondition(has_id=keep_ids)] if keep_ids else None,
+  )
+  points, offset = [], None
+  while True:
+    batch, offset = await async_client.scroll(
+      collection_name,
+      scroll_filter=scroll_filter,
+      limit=256,
+      offset=offset,
+      with_payload=PayloadSelectorInclude(include=["metadata.generations"]),
+      with_vectors=False,
+    )
+    points.extend(batch)
+    if offset is None:
+      break
+
+  await _aprune_generations(points, keep=lambda g: g != generation)
+  return len(points)
+
+
+async def _aprune_generations(points: list, keep: Callable[[int], bool]) -> None:
+  """청크의 generation 목록에서 keep을 만족하지 않는 generation을 빼고, 남는 generation이 없는 청크는 삭제한다."""
+  operations, delete_ids = [], []
+  for point in points:
+    generations = [g for g in (point.payload or {}).get("metadata", {}).get("generations", []) if keep(g)]
+    if not generations:
+      delete_ids.append(point.id)
+      continue
+    operations.append(SetPayloadOperation(set_payload=SetPayload(
+      payload={"generations": generations, "latest_generation": max(generations)},
+      points=[point.id],
+      key="metadata",
+    )))
+  if delete_ids:
+    operations.append(DeleteOperation(delete=PointIdsList(points=delete_ids)))
+  if operations:
+    await get_async_client().batch_update_points(get_apply_docs_collection_name(), update_operations=operations)
+
+
+async def aset_current_generation(user_id: str, generation: int) -> bool:
+  """
+  포인터를 새 generation으로 전환한다. 더 새로운 generation이 이미 전환되었다면 전환하지 않는다.
+  비교와 쓰기는 서버에서 조건부 쓰기 하나로 처리되므로, 동시에 전환하는 실행이 포인터를 이전 generation으로 되돌릴 수 없다.
+  """
+  await aensure_collections()
+  await get_async_client().upsert(
+    collection_name=get_index_generations_collection_name(),
+    points=[PointStruct(
+      id=_generation_pointer_id(user_id),
+      vector=[1.0],
+      payload={"user_id": user_id, "generation": generation},
+    )],
+    update_filter=Filter(must=[FieldCondition(key="generation", range=Range(lt=generation))]),
+  )
+  return await aget_current_generation(user_id) == generation
+
+
+async def agc_generations(user_id: str, current_generation: int) -> None:
+  """
+  현재 generation보다 오래된 청크(및 generation 정보가 없는 예전 청크)를 서버 측 필터로 삭제한다.
+  삭제 기준은 호출 시점에 다시 읽은 포인터다. 포인터가 current_generation이 아니면(다른 실행이 전환했으면) 그 generation을 기준으로 한다.
+  현재 generation과 가장 최근에 할당된 generation 사이의 generation은 전환되지 못한 채 버려진 것(취소된 추측/스트리밍 파싱 등)이므로
+  청크에서 빼고, 그 generation에만 속한 청크는 삭제한다. 아직 진행 중일 수 있는 가장 최근 generation은 남긴다.
+  """
+  await aensure_collections()
+  async_client = get_async_client()
+  counter_id, pointer_id = _generation_counter_id(user_id), _generation_pointer_id(user_id)
+  payloads = {
+    str(point.id): point.payload or {}
+    for point in await async_client.retrieve(get_index_generations_collection_name(), ids=[counter_id, pointer_id], with_payload=True)
+  }
+  pointer_generation = payloads.get(pointer_id, {}).get("generation")
+  if pointer_generation is None:
+    return
+  if pointer_generation != current_generation:
+    logger.info(f"Generation pointer of user {user_id} moved from {current_generation} to {pointer_generation}, collecting against it.")
+    current_generation = pointer_generation
+  await async_client.delete(
+    collection_name=get_apply_docs_collection_name(),
+    points_selector=FilterSelector(filter=Filter(
+      must=[FieldCondition(key="metadata.user_id", match=MatchValue(value=user_id))],
+      must_not=[FieldCondition(key="metadata.latest_generation", range=Range(gte=current_generation))],
+    )),
+  )
+
+  newest_generation = payloads.get(counter_id, {}).get("allocated_generation", current_generation)
+  if newest_generation <= current_generation + 1:
+    return
+  # 버려진 generation에 기록된 청크는 latest_generation이 (current, newest) 범위에 있다.
+  scroll_filter = Filter(must=[
+    FieldCondition(key="metadata.user_id", match=MatchValue(value=user_id)),
+    FieldCondition(key="metadata.latest_generation", range=Range(gt=current_generation, lt=newest_generation)),
+  ])
+  points, offset = [], None
+  while True:
+    batch, offset = await async_client.scroll(
+      get_apply_docs_collection_name(),
+      scroll_filter=scroll_filter,
+      limit=256,
+      offset=offset,
+      with_payload=PayloadSelectorInclude(include=["metadata.generations"]),
+      with_vectors=False,
+    )
+    points.extend(batch)
+    if offset is None:
+      break
+  await _aprune_generations(points, keep=lambda g: g == current_generation or g >= newest_generation)
+
+
+_background_tasks: set[asyncio.Task] = set()
+
+
+def schedule_generation_gc(user_id: str, current_generation: int) -> asyncio.Task:
+  """GC를 백그라운드 태스크로 실행한다. 태스크가 끝날 때까지 참조를 유지한다."""
+  async def _gc():
+    try:
+      await agc_generations(user_id, current_generation)
+    except Exception as e:
+      logger.warning(f"Generation GC failed for user {user_id}: {str(e)}")
+
+  task = asyncio.create_task(_gc())
+  _background_tasks.add(task)
+  task.add_done_callback(_background_tasks.discard)
+  return task
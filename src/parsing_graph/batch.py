@@ -0,0 +1,254 @@
+"""
+Bulk resume ingestion.
+
+`ResumeParseResult` 스키마 변경 등으로 수천 개의 이력서를 다시 파싱해야 할 때 사용하는 배치 진입점.
+manifest의 (user_id, file) 쌍마다 `parsing_graph`를 실행하며, 진행 상황을 로컬 파일에 체크포인트한다.
+
+Usage:
+    python -m parsing_graph.batch manifest.csv --concurrency 8 --parse-rpm 30
+
+manifest는 `user_id,resume_file_path` 헤더를 가진 CSV 또는 같은 키를 가진 JSONL 파일이다.
+`resume_file_path`는 signed URL 또는 로컬 파일 경로이다. 그래프는 로컬 경로를 받지 않으므로 로컬 파일은 data URI로 변환되어 전달된다.
+`--is-resume-rpm`, `--parse-rpm`은 `constants.rate_limiter`의 모델별 리미터를 설정하므로 재시도, page window, schema split, repair 호출까지 모두 제한된다.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import math
+import os
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+from constants.rate_limiter import configure_rate_limit, rate_limiter_stats
+from parsing_graph.configuration import ConfigSchema
+from parsing_graph.errors import classify_error
+from parsing_graph.parsing_graph import parsing_graph
+from parsing_graph.resume_file import to_data_uri
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ManifestItem:
+    user_id: str
+    resume_file_path: str
+
+    @property
+    def key(self) -> str:
+        return f"{self.user_id}\t{self.resume_file_path}"
+
+
+@dataclass
+class ItemResult:
+    key: str
+    user_id: str
+    resume_file_path: str
+    status: str  # "succeeded" | "not_resume" | "failed"
+    latency_seconds: float
+    error_category: Optional[str] = None
+    error: Optional[str] = None
+
+
+class ProgressCheckpoint:
+    """Append-only JSONL log of finished items, used to resume an interrupted batch."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = asyncio.Lock()
+
+    def load(self) -> dict[str, dict[str, Any]]:
+        if not self.path.exists():
+            return {}
+        finished = {}
+        with self.path.open(encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # 크래시로 마지막 줄이 잘렸을 수 있다.
+                    continue
+                finished[record["key"]] = record
+        return finished
+
+    async def append(self, result: ItemResult) -> None:
+        line = json.dumps(asdict(result), ensure_ascii=False) + "\n"
+        async with self._lock:
+            await asyncio.to_thread(self._write, line)
+
+    def _write(self, line: str) -> None:
+        with self.path.open("ab+") as f:
+            # 크래시로 잘린 마지막 줄 뒤에 이어 쓰면 새 기록까지 읽을 수 없게 되므로 줄을 바꾼다.
+            if f.seek(0, os.SEEK_END) > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    line = "\n" + line
+            f.write(line.encode("utf-8"))
+            f.flush()
+
+
+def load_manifest(path: Path) -> list[ManifestItem]:
+    """Load (user_id, resume_file_path) pairs from a CSV or JSONL manifest."""
+    with path.open(encoding="utf-8") as f:
+        if path.suffix == ".jsonl":
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = list(csv.DictReader(f))
+    return [ManifestItem(user_id=row["user_id"], resume_file_path=row["resume_file_path"]) for row in rows]
+
+
+def _percentile(values: list[float], percentile: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(math.ceil(percentile / 100 * len(ordered)) - 1, 0)
+    return ordered[index]
+
+
+def _to_graph_file_path(resume_file_path: str) -> str:
+    if resume_file_path.startswith(("http://", "https://", "data:")):
+        return resume_file_path
+    return to_data_uri(resume_file_path)
+
+
+async def _run_item(item: ManifestItem, config: dict[str, Any]) -> ItemResult:
+    started_at = time.perf_counter()
+    try:
+        resume_file_path = await asyncio.to_thread(_to_graph_file_path, item.resume_file_path)
+        result = await parsing_graph.ainvoke(
+            {"user_id": item.user_id, "resume_file_path": resume_file_path},
+            config,
+        )
+    except Exception as e:
+        return ItemResult(
+            key=item.key,
+            user_id=item.user_id,
+            resume_file_path=item.resume_file_path,
+            status="failed",
+            latency_seconds=time.perf_counter() - started_at,
+            error_category="exception",
+            error=str(e),
+        )
+
+    latency_seconds = time.perf_counter() - started_at
+    error = result.get("error")
+    if error:
+        status = "failed"
+    elif result.get("parsed_result") is None:
+        status = "not_resume"
+    else:
+        status = "succeeded"
+    return ItemResult(
+        key=item.key,
+        user_id=item.user_id,
+        resume_file_path=item.resume_file_path,
+        status=status,
+        latency_seconds=latency_seconds,
+        error_category=classify_error(error),
+        error=error,
+    )
+
+
+async def run_batch(
+    items: list[ManifestItem],
+    checkpoint: ProgressCheckpoint,
+    *,
+    concurrency: int = 4,
+    configurable: Optional[dict[str, Any]] = None,
+    retry_failed: bool = False,
+) -> dict[str, Any]:
+    """Run the parsing graph over the manifest items and return a summary report."""
+    finished = checkpoint.load()
+    pending = [
+        item
+        for item in items
+        if item.key not in finished or (retry_failed and finished[item.key]["status"] == "failed")
+    ]
+    logger.info(f"{len(items) - len(pending)} items already finished, {len(pending)} items to process.")
+
+    config = {"configurable": configurable or {}}
+
+    semaphore = asyncio.Semaphore(concurrency)
+    results: list[ItemResult] = []
+
+    async def worker(item: ManifestItem) -> None:
+        async with semaphore:
+            result = await _run_item(item, config)
+        await checkpoint.append(result)
+        results.append(result)
+        logger.info(f"[{len(results)}/{len(pending)}] {item.user_id}: {result.status} ({result.latency_seconds:.1f}s)")
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*[worker(item) for item in pending])
+    elapsed_seconds = time.perf_counter() - started_at
+
+    latencies = [result.latency_seconds for result in results]
+    return {
+        "processed": len(results),
+        "skipped": len(items) - len(pending),
+        "elapsed_seconds": round(elapsed_seconds, 3),
+        "throughput_per_minute": round(len(results) / elapsed_seconds * 60, 3) if elapsed_seconds else 0.0,
+        "latency_p50_seconds": _percentile(latencies, 50),
+        "latency_p95_seconds": _percentile(latencies, 95),
+        "status": dict(Counter(result.status for result in results)),
+        "failures": dict(Counter(result.error_category for result in results if result.status == "failed")),
+        "rate_limiters": rate_limiter_stats(),
+    }
+
+
+def _parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run parsing_graph over a manifest of resumes.")
+    parser.add_argument("manifest", type=Path, help="CSV or JSONL file with user_id and resume_file_path.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Maximum number of concurrent graph runs.")
+    parser.add_argument("--checkpoint", type=Path, default=None, help="Progress file. Defaults to <manifest>.progress.jsonl.")
+    parser.add_argument("--is-resume-rpm", type=int, default=None, help="Requests per minute for the is_resume model.")
+    parser.add_argument("--parse-rpm", type=int, default=None, help="Requests per minute for the parse model.")
+    parser.add_argument("--configurable", type=json.loads, default={}, help="JSON object of ConfigSchema overrides.")
+    parser.add_argument("--retry-failed", action="store_true", help="Re-run items that failed in a previous run.")
+    return parser.parse_args(argv)
+
+
+def configure_rate_limits(configurable: dict[str, Any], is_resume_rpm: Optional[int] = None, parse_rpm: Optional[int] = None) -> None:
+    """
+    Set the process-wide per-model limits that `ainvoke_llm` applies to every model call,
+    including quota retries, page-window, schema-split and repair calls.
+    """
+    schema = ConfigSchema(**{k: v for k, v in configurable.items() if k in ConfigSchema.__dataclass_fields__})
+    rate_limits: dict[str, int] = {}
+    if is_resume_rpm:
+        rate_limits[schema.is_resume_model] = is_resume_rpm
+    if parse_rpm:
+        # 두 모델이 같다면 더 엄격한 제한을 따른다.
+        model = schema.career_relevant_document_parse_model
+        rate_limits[model] = min(rate_limits.get(model, parse_rpm), parse_rpm)
+    for model, rpm in rate_limits.items():
+        configure_rate_limit(model, rpm=rpm)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    args = _parse_args(argv)
+    configure_rate_limits(args.configurable, is_resume_rpm=args.is_resume_rpm, parse_rpm=args.parse_rpm)
+
+    checkpoint_path = args.checkpoint or args.manifest.with_suffix(".progress.jsonl")
+    report = asyncio.run(
+        run_batch(
+            load_manifest(args.manifest),
+            ProgressCheckpoint(checkpoint_path),
+            concurrency=args.concurrency,
+            configurable=args.configurable,
+            retry_failed=args.retry_failed,
+        )
+    )
+    print(json.dumps(report, ensure_ascii=False, indent=2))  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
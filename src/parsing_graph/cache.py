@@ -0,0 +1,127 @@
+"""
+Content-addressed parse cache.
+
+같은 이력서 PDF가 다시 업로드되면 `is_resume`/`parse_resume` LLM 호출을 건너뛰고 저장된 `ResumeParseResult`를 재사용한다.
+캐시 키는 파일 바이트 해시 + 파싱 전략 + 모델 이름(fallback 체인, repair/hedge 모델 포함) + 프롬프트 버전 + 전략별 설정
++ PDF 경량화 옵션 + 스트리밍 파싱 여부 + `API_VERSION`으로 만들어지므로, 이 중 하나라도 바뀌면 자동으로 무효화된다.
+"""
+import json
+import logging
+import threading
+from typing import Optional
+
+from constants.cache import CacheBackend, CacheBackendKind, create_cache_backend, sha256_hex
+from constants.metadata import API_VERSION
+from parsing_graph.configuration import ConfigSchema
+from parsing_graph.pdf_slim import SlimOptions
+from parsing_graph.prompts import PAGE_WINDOW_INSTRUCTION, PARSE_INSTRUCTION, REPAIR_SYSTEM_PROMPT, SCHEMA_SPLIT_INSTRUCTIONS
+from parsing_graph.schema.schema import ResumeParseResult
+
+logger = logging.getLogger(__name__)
+
+PARSE_CACHE_NAMESPACE = "parse_cache"
+
+
+def prompt_version(prompt: str) -> str:
+    """Return a short, stable version id for a prompt."""
+    return sha256_hex(prompt)[:12]
+
+
+def build_parse_cache_key(file_hash: str, configurable: ConfigSchema) -> str:
+    """Build the cache key from the file hash and every input that affects the parse result."""
+    key_parts = {
+        "file_sha256": file_hash,
+        "is_resume_model": configurable.is_resume_model,
+        "parse_model": configurable.career_relevant_document_parse_model,
+        "is_resume_prompt_version": prompt_version(configurable.is_resume_system_prompt),
+        "parse_prompt_version": prompt_version(configurable.system_prompt),
+        "parse_instruction_version": prompt_version(PARSE_INSTRUCTION),
+        "parse_strategy": configurable.parse_strategy,
+        "is_resume_fallback_models": list(configurable.is_resume_fallback_models),
+        "parse_fallback_models": list(configurable.parse_fallback_models),
+        "repair": [configurable.repair_model, configurable.repair_max_output_tokens, prompt_version(REPAIR_SYSTEM_PROMPT)]
+        if configurable.repair_enabled
+        else None,
+        # 경량화된 파일은 모델이 보는 입력이 달라지므로 경량화 옵션(스토어 variant)도 키에 넣는다.
+        "pdf_slim": SlimOptions.from_config(configurable).variant if configurable.pdf_slim_enabled else None,
+        "stream_parse": configurable.stream_parse and configurable.parse_strategy == "single",
+        "hedge": [configurable.hedge_model] if configurable.hedge_enabled else None,
+        "api_version": API_VERSION,
+    }
+    if configurable.parse_strategy == "page_windows":
+        # 구간 경계가 바뀌면 병합 결과도 바뀐다.
+        key_parts["page_windows"] = [
+            configurable.page_window_size,
+            configurable.page_window_overlap,
+            configurable.page_window_min_pages,
+            prompt_version(PAGE_WINDOW_INSTRUCTION),
+        ]
+    elif configurable.parse_strategy == "schema_split":
+        key_parts["schema_split"] = {
+            prefix: [
+                getattr(configurable, f"{prefix}_parse_model"),
+                getattr(configurable, f"{prefix}_parse_thinking_budget"),
+                getattr(configurable, f"{prefix}_parse_max_output_tokens"),
+                prompt_version(instruction),
+            ]
+            for prefix, instruction in SCHEMA_SPLIT_INSTRUCTIONS.items()
+        }
+    if configurable.adaptive_parse_policy:
+        # 문서마다 모델/예산이 달라지므로 정책의 입력도 키에 넣는다.
+        key_parts["parse_policy"] = [
+            configurable.light_parse_model,
+            configurable.light_parse_max_pages,
+            configurable.light_parse_max_text_chars,
+            configurable.light_parse_max_images,
+            configurable.heavy_parse_min_pages,
+        ]
+    return sha256_hex(json.dumps(key_parts, sort_keys=True))
+
+
+class ParseCache:
+    """Stores `ResumeParseResult` objects as JSON in a cache backend."""
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+
+    def get(self, key: str) -> Optional[ResumeParseResult]:
+        raw = self.backend.get(key)
+        if raw is None:
+            return None
+        try:
+            return ResumeParseResult.model_validate_json(raw)
+        except ValueError:
+            # 스키마가 바뀌어 더 이상 읽을 수 없는 엔트리는 버린다.
+            logger.warning(f"Dropping unreadable parse cache entry: {key}")
+            self.backend.delete(key)
+            return None
+
+    def put(self, key: str, parsed_result: ResumeParseResult) -> None:
+        self.backend.set(key, parsed_result.model_dump_json().encode("utf-8"))
+
+    def stats(self) -> dict[str, float]:
+        return {**self.backend.stats.as_dict(), "bytes": self.backend.size_bytes()}
+
+
+_parse_caches: dict[tuple, ParseCache] = {}
+_parse_caches_lock = threading.Lock()
+
+
+def get_parse_cache(
+    backend: CacheBackendKind = "sqlite",
+    ttl_seconds: Optional[float] = None,
+    max_entries: Optional[int] = None,
+) -> ParseCache:
+    """Return the process-wide parse cache for the given backend settings."""
+    cache_key = (backend, ttl_seconds, max_entries)
+    with _parse_caches_lock:
+        if cache_key not in _parse_caches:
+            _parse_caches[cache_key] = ParseCache(
+                create_cache_backend(
+                    backend,
+                    PARSE_CACHE_NAMESPACE,
+                    ttl_seconds=ttl_seconds,
+                    max_entries=max_entries,
+                )
+            )
+        return _parse_caches[cache_key]
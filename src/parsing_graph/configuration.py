@@ -6,11 +6,14 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field, fields
-from typing import Annotated, Optional, Type, TypeVar
+from typing import Annotated, Literal, Optional, Type, TypeVar
 
 from langchain_core.runnables import RunnableConfig, ensure_config
 from langgraph.config import get_config
 
+from constants.fallback import Backoff
+from constants.hedging import HedgeConfig
+
 from parsing_graph.prompts import PARSING_SYSTEM_PROMPT, IS_RESUME_SYSTEM_PROMPT
 
 
@@ -59,6 +62,245 @@ class ConfigSchema:
         },
     )
 
+    parse_cache_enabled: bool = field(
+        default=True,
+        metadata={
+            "description": "Whether to reuse the stored parse result when the same resume file is uploaded again. "
+            "The cache key is the hash of the file bytes plus the models, prompt versions and API_VERSION."
+        },
+    )
+    parse_cache_backend: Literal["sqlite", "filesystem"] = field(
+        default="sqlite",
+        metadata={"description": "The local backend of the parse cache."},
+    )
+    parse_cache_ttl_seconds: int = field(
+        default=30 * 24 * 60 * 60,
+        metadata={"description": "How long a parse cache entry stays valid, in seconds."},
+    )
+    parse_cache_max_entries: int = field(
+        default=10_000,
+        metadata={"description": "The maximum number of parse cache entries. Least recently used entries are evicted first."},
+    )
+
+    parse_strategy: Literal["single", "page_windows", "schema_split"] = field(
+        default="single",
+        metadata={
+            "description": "How to parse the resume. 'single' parses the whole file in one call. "
+            "'page_windows' splits long PDFs into overlapping page windows, parses them concurrently and merges the results. "
+            "'schema_split' extracts the profile, careers and projects in concurrent calls, each with its own model and budget."
+        },
+    )
+    page_window_size: int = field(
+        default=8,
+        metadata={"description": "The number of pages per window in the 'page_windows' parse strategy."},
+    )
+    page_window_overlap: int = field(
+        default=1,
+        metadata={"description": "The number of pages shared by adjacent windows, so that experiences spanning a boundary are not cut."},
+    )
+    page_window_min_pages: int = field(
+        default=12,
+        metadata={"description": "Documents with fewer pages than this are parsed in a single call even in the 'page_windows' strategy."},
+    )
+    page_window_concurrency: int = field(
+        default=8,
+        metadata={"description": "The maximum number of page windows parsed at the same time."},
+    )
+
+    stream_parse: bool = field(
+        default=False,
+        metadata={
+            "description": "Stream the parse output in the 'single' parse strategy and index each career/project experience "
+            "as soon as its JSON is complete, overlapping embedding with the rest of generation. "
+            "Progress is sent as custom stream events."
+        },
+    )
+
+    profile_parse_model: Annotated[str, {"__template_metadata__": {"kind": "llm"}}] = field(
+        default='gemini-2.5-flash',
+        metadata={"description": "The model that extracts the candidate profile in the 'schema_split' parse strategy."},
+    )
+    profile_parse_max_output_tokens: int = field(
+        default=2048,
+        metadata={"description": "The output token budget of the candidate profile call in the 'schema_split' parse strategy."},
+    )
+    profile_parse_thinking_budget: int = field(
+        default=0,
+        metadata={"description": "The thinking token budget of the candidate profile call in the 'schema_split' parse strategy. 0 disables thinking."},
+    )
+    career_parse_model: Annotated[str, {"__template_metadata__": {"kind": "llm"}}] = field(
+        default='gemini-2.5-pro',
+        metadata={"description": "The model that extracts career experiences in the 'schema_split' parse strategy."},
+    )
+    career_parse_max_output_tokens: int = field(
+        default=8192,
+        metadata={"description": "The output token budget of the career experiences call in the 'schema_split' parse strategy."},
+    )
+    career_parse_thinking_budget: int = field(
+        default=4096,
+        metadata={"description": "The thinking token budget of the career experiences call in the 'schema_split' parse strategy. 0 disables thinking."},
+    )
+    project_parse_model: Annotated[str, {"__template_metadata__": {"kind": "llm"}}] = field(
+        default='gemini-2.5-pro',
+        metadata={"description": "The model that extracts project experiences in the 'schema_split' parse strategy."},
+    )
+    project_parse_max_output_tokens: int = field(
+        default=8192,
+        metadata={"description": "The output token budget of the project experiences call in the 'schema_split' parse strategy."},
+    )
+    project_parse_thinking_budget: int = field(
+        default=4096,
+        metadata={"description": "The thinking token budget of the project experiences call in the 'schema_split' parse strategy. 0 disables thinking."},
+    )
+
+    repair_enabled: bool = field(
+        default=True,
+        metadata={
+            "description": "Send schema-invalid parse output and its validation errors to a text-only model to fix the JSON, "
+            "instead of re-running the whole multimodal parse."
+        },
+    )
+    repair_model: Annotated[str, {"__template_metadata__": {"kind": "llm"}}] = field(
+        default='gemini-2.0-flash',
+        metadata={"description": "The text-only model that repairs schema-invalid parse output."},
+    )
+    repair_max_output_tokens: int = field(
+        default=8192,
+        metadata={"description": "The output token budget of the repair call."},
+    )
+
+    pre_classify_enabled: bool = field(
+        default=False,
+        metadata={
+            "description": "Classify text-layer PDFs locally before calling the is_resume model. "
+            "Only documents the classifier accepts as resumes skip the model; "
+            "local rejections, ambiguous documents and documents without a text layer are decided by the model. "
+            "Opt-in: a keyword false accept is never checked by the model."
+        },
+    )
+    pre_classify_accept_score: int = field(
+        default=4,
+        metadata={"description": "The minimum number of matched resume signals to accept a document without the model."},
+    )
+    pre_classify_reject_score: int = field(
+        default=1,
+        metadata={"description": "The maximum resume signal score at which the classifier suspects a non-resume. The model still confirms it."},
+    )
+
+    pdf_slim_enabled: bool = field(
+        default=False,
+        metadata={
+            "description": "Slim the PDF before sending it to the models: downsample and recompress embedded images, "
+            "drop duplicate images and strip metadata. The parse cache key still uses the hash of the original file."
+        },
+    )
+    pdf_slim_max_image_dimension: int = field(
+        default=1600,
+        metadata={"description": "The longest side, in pixels, of embedded images after slimming."},
+    )
+    pdf_slim_jpeg_quality: int = field(
+        default=75,
+        metadata={"description": "The JPEG quality of recompressed images (1-95)."},
+    )
+    pdf_slim_dedupe_images: bool = field(
+        default=True,
+        metadata={"description": "Keep one copy of images repeated across pages (logos, headers, backgrounds)."},
+    )
+    pdf_slim_strip_metadata: bool = field(
+        default=True,
+        metadata={"description": "Remove the document info dictionary and XMP metadata."},
+    )
+    pdf_slim_strip_fonts: bool = field(
+        default=False,
+        metadata={
+            "description": "Remove embedded font programs. The text layer is kept, but pages are rendered with substitute fonts, "
+            "which can hurt CJK documents."
+        },
+    )
+
+    adaptive_parse_policy: bool = field(
+        default=False,
+        metadata={
+            "description": "Pick the parse model, thinking budget, output cap and timeout from the page count, text length "
+            "and image count of the document (see `select_parse_policy`). Short documents then move to `light_parse_model`. "
+            "When disabled, every document uses the 'heavy' tier (the main parse model with the full budget)."
+        },
+    )
+    light_parse_model: Annotated[str, {"__template_metadata__": {"kind": "llm"}}] = field(
+        default='gemini-2.5-flash',
+        metadata={"description": "The parse model of short, text-layer resumes in the adaptive parse policy."},
+    )
+    light_parse_max_pages: int = field(
+        default=2,
+        metadata={"description": "Documents with at most this many pages (and little text and few images) use the light tier."},
+    )
+    light_parse_max_text_chars: int = field(
+        default=8000,
+        metadata={"description": "The maximum text layer length of the light tier."},
+    )
+    light_parse_max_images: int = field(
+        default=3,
+        metadata={"description": "The maximum number of embedded images of the light tier. Visual portfolios need the main model."},
+    )
+    heavy_parse_min_pages: int = field(
+        default=6,
+        metadata={"description": "Documents with at least this many pages use the heavy tier with the full thinking budget."},
+    )
+
+    speculative_parse: bool = field(
+        default=False,
+        metadata={
+            "description": "Run is_resume and parse_resume at the same time. "
+            "The parse result is committed only if the document turns out to be a resume, and discarded otherwise."
+        },
+    )
+
+    is_resume_fallback_models: list[str] = field(
+        default_factory=list,
+        metadata={
+            "description": "Models tried in order when `is_resume_model` fails or its circuit is open (see `constants.fallback`). "
+            "Bare names are Gemini models; other providers use the provider:model-name form."
+        },
+    )
+    parse_fallback_models: list[str] = field(
+        default_factory=list,
+        metadata={
+            "description": "Models tried in order when the parse model of the policy fails or its circuit is open, "
+            "e.g. ['gemini-2.5-flash', 'anthropic:claude-sonnet-4-20250514']."
+        },
+    )
+    fallback_backoff_base_seconds: float = field(
+        default=1.0,
+        metadata={"description": "The base delay of the exponential backoff (with full jitter) between passes over a failing chain."},
+    )
+    fallback_max_rounds: int = field(
+        default=1,
+        metadata={
+            "description": "Passes over the fallback chain in one node run. The graph-level parse retries back off as well, "
+            "so a single pass is enough by default."
+        },
+    )
+
+    hedge_enabled: bool = field(
+        default=False,
+        metadata={
+            "description": "Send a duplicate parse call when the first one is slower than `hedge_percentile` of recent calls, "
+            "and use whichever answers first (see `constants.hedging`)."
+        },
+    )
+    hedge_percentile: float = field(
+        default=0.95,
+        metadata={"description": "The percentile of recent parse latency after which a call is hedged."},
+    )
+    hedge_max_extra_load: float = field(
+        default=0.1,
+        metadata={"description": "The maximum ratio of hedged calls to all parse calls, e.g. 0.1 adds at most about 10% more requests."},
+    )
+    hedge_model: Optional[str] = field(
+        default=None,
+        metadata={"description": "The model of the duplicate call. Defaults to the model of the first call."},
+    )
+
     @classmethod
     def from_runnable_config(cls: Type[T], config: Optional[RunnableConfig] = None) -> T:
         """Create a Configuration instance from a RunnableConfig object."""
@@ -70,6 +312,87 @@ class ConfigSchema:
         configurable = config.get("configurable") or {}
         _fields = {f.name for f in fields(cls) if f.init}
         return cls(**{k: v for k, v in configurable.items() if k in _fields})
+
+    def backoff(self) -> Backoff:
+        return Backoff(base_seconds=self.fallback_backoff_base_seconds, max_rounds=self.fallback_max_rounds)
+
+    def hedge_config(self) -> Optional[HedgeConfig]:
+        if not self.hedge_enabled:
+            return None
+        return HedgeConfig(percentile=self.hedge_percentile, max_extra_load=self.hedge_max_extra_load)
     
 
-T = TypeVar("T", bound=ConfigSchema)
\ No newline at end of file
+T = TypeVar("T", bound=ConfigSchema)
+
+
+@dataclass(frozen=True)
+class DocumentFeatures:
+    """Cheap features of the resume file, read locally before the parse call."""
+
+    page_count: int
+    text_chars: int
+    image_count: int
+
+    @property
+    def has_text_layer(self) -> bool:
+        # 스캔 PDF는 텍스트 레이어가 거의 없다. 기준은 pre_classifier.MIN_TEXT_CHARS와 같다.
+        return self.text_chars >= 200
+
+
+@dataclass(frozen=True)
+class ParsePolicy:
+    """The model and budgets of one parse call."""
+
+    tier: Literal["light", "standard", "heavy"]
+    model: str
+    thinking_budget: int
+    max_output_tokens: int
+    timeout: int
+    reason: str = ""
+
+
+# tier별 (thinking_budget, max_output_tokens, timeout). heavy는 정책 도입 전의 고정값과 같다.
+PARSE_TIERS: dict[str, tuple[int, int, int]] = {
+    "light": (1024, 4096, 30),
+    "standard": (4096, 8192, 60),
+    "heavy": (8192, 8192, 100),
+}
+TIER_ORDER = ("light", "standard", "heavy")
+
+
+def select_parse_policy(features: Optional[DocumentFeatures], configurable: ConfigSchema, attempt: int = 0) -> ParsePolicy:
+    """
+    Pick the parse tier from the document features.
+
+    짧고 텍스트 레이어가 있는 이력서는 light, 긴 포트폴리오는 heavy, 나머지는 standard로 보낸다.
+    특징을 읽지 못했거나 정책이 꺼져 있으면 heavy를 쓰고, 재시도할 때마다 한 단계씩 올린다.
+    """
+    if not configurable.adaptive_parse_policy or features is None:
+        tier, reason = "heavy", "no document features" if configurable.adaptive_parse_policy else "adaptive policy disabled"
+    elif features.page_count >= configurable.heavy_parse_min_pages:
+        tier, reason = "heavy", f"{features.page_count} pages >= {configurable.heavy_parse_min_pages}"
+    elif (
+        features.page_count <= configurable.light_parse_max_pages
+        and features.has_text_layer
+        and features.text_chars <= configurable.light_parse_max_text_chars
+        and features.image_count <= configurable.light_parse_max_images
+    ):
+        tier, reason = "light", f"{features.page_count} pages, {features.text_chars} chars, {features.image_count} images"
+    else:
+        tier, reason = "standard", f"{features.page_count} pages, {features.text_chars} chars, {features.image_count} images"
+
+    if attempt:
+        escalated = TIER_ORDER[min(TIER_ORDER.index(tier) + attempt, len(TIER_ORDER) - 1)]
+        if escalated != tier:
+            tier, reason = escalated, f"{reason}; escalated on retry {attempt}"
+
+    thinking_budget, max_output_tokens, timeout = PARSE_TIERS[tier]
+    model = configurable.light_parse_model if tier == "light" else configurable.career_relevant_document_parse_model
+    return ParsePolicy(
+        tier=tier,
+        model=model,
+        thinking_budget=thinking_budget,
+        max_output_tokens=max_output_tokens,
+        timeout=timeout,
+        reason=reason,
+    )
\ No newline at end of file
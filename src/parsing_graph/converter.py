@@ -1,4 +1,6 @@
 from __future__ import annotations
+import hashlib
+import json
 from langchain_core.documents import Document
 
 from parsing_graph.schema.schema import (
@@ -135,6 +137,21 @@ def _convert_project_exp_to_document(
     return Document(page_content=page_content, metadata=metadata)
 
 
+def compute_content_hash(document: Document) -> str:
+    """
+    Hashes the page content and metadata of a chunk.
+    Any change to either (including user_id or api_version) yields a new hash, so the chunk is re-embedded.
+    """
+    metadata = {k: v for k, v in document.metadata.items() if k != "content_hash"}
+    payload = json.dumps(
+        {"page_content": document.page_content, "metadata": metadata},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
 def convert_resume_to_documents(
     parsed_result: ResumeParseResult
 ) -> list[Document]:
@@ -162,4 +179,12 @@ def convert_resume_to_documents(
             _convert_project_exp_to_document(project, candidate_name)
         )
 
-    return documents 
\ No newline at end of file
+    return documents 
+
+def convert_experience_to_document(
+    experience: CareerExperience | ProjectExperience, candidate_name: str
+) -> Document:
+    """Converts a single career or project experience, as soon as it is parsed, to a Document."""
+    if isinstance(experience, CareerExperience):
+        return _convert_career_exp_to_document(experience, candidate_name)
+    return _convert_project_exp_to_document(experience, candidate_name)
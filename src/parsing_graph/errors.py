@@ -0,0 +1,57 @@
+"""
+Error categories produced by the parsing graph nodes.
+
+노드는 `ParsingState.error`에 "<카테고리 메시지>: <원본 오류>" 형태의 문자열을 남긴다.
+배치 리포트 등에서 실패 원인을 집계할 수 있도록 카테고리와 메시지를 한곳에서 관리한다.
+"""
+from typing import Literal, Optional
+
+ErrorCategory = Literal[
+    "file_not_found",
+    "file_access",
+    "file_download",
+    "quota",
+    "auth",
+    "timeout",
+    "is_resume",
+    "parse",
+    "convert",
+    "no_documents",
+    "vector_db_connection",
+    "vector_db_auth",
+    "embedding",
+    "vector_store",
+    "unknown",
+]
+
+ERROR_MESSAGES: dict[ErrorCategory, str] = {
+    "file_not_found": "이력서 파일을 찾을 수 없습니다",
+    "file_access": "이력서 파일에 접근할 수 없습니다(만료되었거나 권한이 없는 URL)",
+    "file_download": "이력서 파일 다운로드 중 오류가 발생했습니다",
+    "quota": "AI 모델 할당량 초과 또는 요청 제한",
+    "auth": "AI 모델 인증 오류",
+    "timeout": "AI 모델 요청 시간 초과",
+    "is_resume": "이력서 여부 판단 중 오류가 발생했습니다",
+    "parse": "문서 파싱 중 오류가 발생했습니다",
+    "convert": "파싱 결과를 문서로 변환하는 중 오류가 발생했습니다",
+    "no_documents": "벡터 스토어에 추가할 문서가 없습니다.",
+    "vector_db_connection": "벡터 데이터베이스 연결 오류",
+    "vector_db_auth": "벡터 데이터베이스 인증 오류",
+    "embedding": "문서 임베딩 생성 오류",
+    "vector_store": "벡터 스토어에 문서 추가 중 오류가 발생했습니다",
+}
+
+
+def format_error(category: ErrorCategory, detail: str) -> str:
+    """Format an error message of the given category."""
+    return f"{ERROR_MESSAGES[category]}: {detail}"
+
+
+def classify_error(error: Optional[str]) -> Optional[ErrorCategory]:
+    """Return the category of an error message produced by the parsing graph."""
+    if not error:
+        return None
+    for category, message in ERROR_MESSAGES.items():
+        if error.startswith(message):
+            return category
+    return "unknown"
@@ -0,0 +1,166 @@
+"""
+Page-window parsing helpers.
+
+30~60 페이지 포트폴리오는 한 번의 호출로 파싱하면 타임아웃과 `max_output_tokens` 한도에 걸린다.
+PDF를 페이지 구간(window)으로 나누어 각각 같은 `ResumeParseResult` 스키마로 동시에 파싱한 뒤 결과를 병합한다.
+구간 경계에 걸친 경험이 잘리지 않도록 인접 구간은 페이지를 겹치게 나누고, 병합 시 중복된 경험을 하나로 합친다.
+"""
+import io
+import re
+from dataclasses import dataclass
+from typing import Optional, TypeVar
+
+from parsing_graph.schema.schema import (
+    BaseExperience,
+    CareerExperience,
+    CandidateEducation,
+    ResumeParseResult,
+)
+
+E = TypeVar("E", bound=BaseExperience)
+
+
+@dataclass(frozen=True)
+class PageWindow:
+    """A range of pages [start, end) of the original PDF and its bytes."""
+
+    start: int
+    end: int
+    total_pages: int
+    data: bytes
+
+    @property
+    def label(self) -> str:
+        return f"pages {self.start + 1}-{self.end} of {self.total_pages}"
+
+
+def count_pages(data: bytes) -> int:
+    from pypdf import PdfReader
+
+    return len(PdfReader(io.BytesIO(data)).pages)
+
+
+def split_into_page_windows(data: bytes, window_size: int, overlap: int = 1) -> list[PageWindow]:
+    """Split a PDF into overlapping page windows. A document that fits in one window is returned as is."""
+    from pypdf import PdfReader, PdfWriter
+
+    if window_size <= overlap:
+        raise ValueError("window_size must be larger than overlap")
+
+    reader = PdfReader(io.BytesIO(data))
+    total_pages = len(reader.pages)
+    if total_pages <= window_size:
+        return [PageWindow(start=0, end=total_pages, total_pages=total_pages, data=data)]
+
+    windows = []
+    start = 0
+    while True:
+        end = min(start + window_size, total_pages)
+        writer = PdfWriter()
+        for page in reader.pages[start:end]:
+            writer.add_page(page)
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        windows.append(PageWindow(start=start, end=end, total_pages=total_pages, data=buffer.getvalue()))
+        if end == total_pages:
+            return windows
+        start = end - overlap
+
+
+def _normalize(name: Optional[str]) -> str:
+    # "(주)카카오", "주식회사 카카오", "Kakao Corp." 같은 표기 차이를 무시한다.
+    name = (name or "").lower()
+    name = re.sub(r"\(주\)|주식회사|\b(inc|corp|co|ltd|llc)\b\.?", "", name)
+    return re.sub(r"[\W_]+", "", name)
+
+
+def _same_period(a: BaseExperience, b: BaseExperience) -> bool:
+    # 한쪽 구간에서 날짜를 읽지 못했을 수 있으므로, 둘 다 있을 때만 비교한다.
+    for date_a, date_b in ((a.start_date, b.start_date), (a.end_date, b.end_date)):
+        if date_a and date_b and date_a != date_b:
+            return False
+    if a.start_date and b.start_date:
+        return True
+    # 시작일을 비교할 수 없으면 역할이라도 겹쳐야 같은 경험으로 본다(같은 회사의 다른 재직 기간을 합치지 않도록).
+    return not (a.position and b.position and not set(a.position) & set(b.position))
+
+
+def _experience_name(experience: BaseExperience) -> str:
+    if isinstance(experience, CareerExperience):
+        return _normalize(experience.company)
+    return _normalize(experience.project_name)
+
+
+def _union(a: list, b: list) -> list:
+    return list(dict.fromkeys([*a, *b]))
+
+
+def _longer(a: Optional[str], b: Optional[str]) -> Optional[str]:
+    return a if len(a or "") >= len(b or "") else b
+
+
+def _merge_experience(a: E, b: E) -> E:
+    """Merge two partial views of the same experience, keeping every detail found in either window."""
+    merged = a.model_dump()
+    for name, value in b.model_dump().items():
+        current = merged.get(name)
+        if isinstance(current, list):
+            merged[name] = _union(current, value)
+        elif isinstance(current, str) and isinstance(value, str):
+            merged[name] = _longer(current, value)
+        elif current is None:
+            merged[name] = value
+    return type(a).model_validate(merged)
+
+
+def merge_experiences(windows: list[list[E]]) -> list[E]:
+    """
+    Deduplicate the experiences extracted from consecutive page windows, preserving document order.
+    An experience is merged only into one from the previous window, which shares the overlapping pages,
+    and each experience absorbs at most one experience per window: entries of the same window are always distinct.
+    """
+    merged: list[E] = []
+    # merged의 각 항목이 마지막으로 나온 구간
+    last_window: list[int] = []
+    for window_index, experiences in enumerate(windows):
+        for experience in experiences:
+            for i, existing in enumerate(merged):
+                if (
+                    last_window[i] == window_index - 1
+                    and _experience_name(existing) == _experience_name(experience)
+                    and _same_period(existing, experience)
+                ):
+                    merged[i] = _merge_experience(existing, experience)
+                    last_window[i] = window_index
+                    break
+            else:
+                merged.append(experience)
+                last_window.append(window_index)
+    return merged
+
+
+def _merge_education(educations: list[CandidateEducation]) -> list[CandidateEducation]:
+    merged: dict[tuple[str, str], CandidateEducation] = {}
+    for education in educations:
+        key = (_normalize(education.institution), _normalize(education.degree))
+        merged.setdefault(key, education)
+    return list(merged.values())
+
+
+def merge_parse_results(results: list[ResumeParseResult]) -> ResumeParseResult:
+    """Merge the partial results of the page windows, in page order."""
+    # 인적 사항은 보통 문서 앞쪽에 있으므로 첫 구간의 프로필을 기준으로 하고, 비어 있는 값만 채운다.
+    profile = results[0].candidate_profile.model_copy()
+    for result in results[1:]:
+        other = result.candidate_profile
+        if not profile.experience_years:
+            profile.experience_years = other.experience_years
+        if not profile.objective:
+            profile.objective = other.objective
+    profile.education = _merge_education([education for result in results for education in result.candidate_profile.education])
+
+    return ResumeParseResult(
+        candidate_profile=profile,
+        career_experiences=merge_experiences([result.career_experiences for result in results]),
+        project_experiences=merge_experiences([result.project_experiences for result in results]),
+    )
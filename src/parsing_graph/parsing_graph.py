@@ -1,19 +1,52 @@
+import asyncio
+import dataclasses
 import logging
+import time
 import langsmith
-from uuid import uuid4
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
+from langgraph.config import get_stream_writer
 from langgraph.graph import END, StateGraph, START
 from langchain_core.messages import SystemMessage, HumanMessage
 from langchain_core.runnables import RunnableConfig
 from langchain_google_genai import ChatGoogleGenerativeAI
 
-from parsing_graph.configuration import ConfigSchema
-from parsing_graph.schema.schema import ResumeParseResult
+from constants.fallback import CIRCUIT_OPEN_MESSAGE, afallback, model_chain, quota_retries_for
+from constants.llm_invoke import ainvoke_llm, arate_limited
+from constants.llm_registry import ModelSpec, factory_for, get_chat_model, get_structured_model
+from parsing_graph.cache import build_parse_cache_key, get_parse_cache
+from parsing_graph.configuration import ConfigSchema, ParsePolicy, select_parse_policy
+from parsing_graph.schema.schema import CandidateProfile, CareerExperiences, ProjectExperiences, ResumeParseResult
 from parsing_graph.schema.is_resume import IsResumeResult
 from parsing_graph.state import ParsingState
-from parsing_graph.converter import convert_resume_to_documents
-from parsing_graph.vector_store import apply_docs_vector_store, delete_docs_by
+from parsing_graph.converter import compute_content_hash, convert_experience_to_document, convert_resume_to_documents
+from parsing_graph.errors import ERROR_MESSAGES, classify_error, format_error
+from parsing_graph.pdf_slim import SlimOptions, slim_pdf, slim_stats
+from parsing_graph.page_windows import PageWindow, count_pages, merge_parse_results, split_into_page_windows
+from parsing_graph.pre_classifier import extract_document_features, pre_classifier_stats, pre_classify
+from parsing_graph.prompts import PAGE_WINDOW_INSTRUCTION, PARSE_INSTRUCTION, SCHEMA_SPLIT_INSTRUCTIONS
+from parsing_graph.repair import StructuredOutputError, arepair, raw_output_text, repair_stats
+from parsing_graph.resume_file import (
+    ResumeFile,
+    afetch_resume_file,
+    aget_resume_data_uri,
+    aget_resume_file,
+    resume_file_store,
+    to_data_uri_from_bytes,
+)
+from parsing_graph.streaming import StreamingParseExtractor, item_title
+from parsing_graph.supabase_utils import FileAccessError, FileNotFoundError as ResumeFileNotFoundError, SupabaseError
+from parsing_graph.speculative import speculation_stats
+from parsing_graph.vector_store import (
+    aget_current_generation,
+    aset_current_generation,
+    astage_documents,
+    aunstage_documents_except,
+    anew_generation,
+    document_point_id,
+    embedding_cache_stats,
+    schedule_generation_gc,
+)
 
 langsmith_logger = logging.getLogger("langsmith")
 langsmith_logger.setLevel(logging.DEBUG)
@@ -21,30 +54,217 @@ langsmith_logger.setLevel(logging.DEBUG)
 MAX_PARSE_RETRIES = 2
 
 
-def is_resume_node(state: ParsingState, config: RunnableConfig) -> Dict[str, Any]:
+def _get_parse_cache(configurable: ConfigSchema):
+    return get_parse_cache(
+        backend=configurable.parse_cache_backend,
+        ttl_seconds=configurable.parse_cache_ttl_seconds,
+        max_entries=configurable.parse_cache_max_entries,
+    )
+
+
+def _model_file_key(state: ParsingState) -> Optional[str]:
+    return state.model_file_key or state.resume_file_hash
+
+
+async def fetch_resume_file_node(state: ParsingState, config: RunnableConfig) -> Dict[str, Any]:
+    """
+    Downloads the resume file once. Later nodes, LLM calls and retries reuse the stored bytes.
+    """
+    try:
+        resume_file = await afetch_resume_file(state.resume_file_path)
+    except ResumeFileNotFoundError as e:
+        return {"error": format_error("file_not_found", str(e))}
+    except FileAccessError as e:
+        return {"error": format_error("file_access", str(e))}
+    except SupabaseError as e:
+        return {"error": format_error("file_download", str(e))}
+
+    langsmith_logger.info(f"Fetched resume file {resume_file.sha256[:12]} ({len(resume_file.data)} bytes).")
+    return {"resume_file_hash": resume_file.sha256, "error": None}
+
+
+def should_continue_after_fetch(state: ParsingState) -> str:
+    """
+    Ends the run when the resume file could not be downloaded.
+    """
+    if state.error:
+        langsmith_logger.error(state.error)
+        return "clean_up"
+    return "check_parse_cache"
+
+
+async def check_parse_cache_node(state: ParsingState, config: RunnableConfig) -> Dict[str, Any]:
+    """
+    Looks up the parse cache with the hash of the resume file bytes.
+    """
+    configurable = ConfigSchema.from_runnable_config(config)
+    if not configurable.parse_cache_enabled:
+        return {"parse_cache_key": None, "parse_cache_hit": False}
+
+    try:
+        file_hash = state.resume_file_hash or (await aget_resume_file(state.resume_file_path, None)).sha256
+        parse_cache_key = build_parse_cache_key(file_hash, configurable)
+        parse_cache = _get_parse_cache(configurable)
+        # SQLite/파일 I/O가 이벤트 루프를 막지 않도록 스레드에서 실행한다.
+        cached_result = await asyncio.to_thread(parse_cache.get, parse_cache_key)
+    except Exception as e:
+        # 캐시는 최적화일 뿐이므로, 실패하면 캐시 없이 기존 흐름대로 진행한다.
+        langsmith_logger.warning(f"Parse cache lookup failed: {str(e)}")
+        return {"parse_cache_key": None, "parse_cache_hit": False}
+
+    # 크기 집계(SELECT SUM)는 이벤트 루프를 막으므로, 요청 경로에서는 메모리 카운터만 기록한다.
+    langsmith_logger.info(f"Parse cache {'hit' if cached_result else 'miss'}. stats={parse_cache.backend.stats.as_dict()}")
+    if cached_result:
+        return {
+            "parse_cache_key": parse_cache_key,
+            "parse_cache_hit": True,
+            "parsed_result": cached_result,
+            "error": None,
+        }
+    return {"parse_cache_key": parse_cache_key, "parse_cache_hit": False}
+
+
+def should_use_parse_cache(state: ParsingState, config: RunnableConfig) -> str:
+    """
+    Skips both LLM nodes when the parsed result was loaded from the cache.
+    """
+    if state.parse_cache_hit and state.parsed_result:
+        return "convert_to_document"
+    return "slim_resume_file"
+
+
+async def slim_resume_file_node(state: ParsingState, config: RunnableConfig) -> Dict[str, Any]:
+    """
+    Stores a slimmed copy of the PDF for the LLM calls.
+    The copy is a separate store entry keyed by the original hash and the slim options; the original entry is left untouched
+    and the parse cache key still uses the original hash.
+    """
+    configurable = ConfigSchema.from_runnable_config(config)
+    if not configurable.pdf_slim_enabled:
+        return {}
+
+    options = SlimOptions.from_config(configurable)
+    try:
+        resume_file = await aget_resume_file(state.resume_file_path, state.resume_file_hash)
+        if resume_file.mime_type != "application/pdf":
+            return {}
+        # 이미지 디코딩/인코딩은 CPU 작업이므로 이벤트 루프를 막지 않도록 스레드에서 실행한다.
+        result = await asyncio.to_thread(slim_pdf, resume_file.data, options)
+    except Exception as e:
+        # 경량화는 최적화일 뿐이므로, 실패하면 원본 파일을 그대로 보낸다.
+        langsmith_logger.warning(f"PDF slimming failed: {str(e)}")
+        return {}
+
+    slim_stats.record(result)
+    update = {}
+    if result.bytes_saved > 0:
+        slim_file = dataclasses.replace(resume_file, data=result.data, variant=options.variant)
+        resume_file_store.put(slim_file)
+        update["model_file_key"] = slim_file.key
+    langsmith_logger.info(
+        f"Slimmed resume file {resume_file.sha256[:12]}: {result.original_bytes} -> {result.slim_bytes} bytes "
+        f"({result.images_recompressed} images recompressed, {result.images_deduplicated} deduplicated, "
+        f"{result.seconds:.2f}s). stats={slim_stats.as_dict()}"
+    )
+    return update
+
+
+async def pre_classify_node(state: ParsingState, config: RunnableConfig) -> Dict[str, Any]:
+    """
+    Classifies the text layer of the document locally and sets `is_resume_result` only for high-confidence resumes.
+    A local rejection is never final: the is_resume model confirms every document the classifier did not accept.
+    """
+    configurable = ConfigSchema.from_runnable_config(config)
+    if not configurable.pre_classify_enabled:
+        return {}
+
+    started_at = time.perf_counter()
+    try:
+        data = (await aget_resume_file(state.resume_file_path, state.resume_file_hash)).data
+        # PDF 텍스트 추출은 CPU 작업이므로 이벤트 루프를 막지 않도록 스레드에서 실행한다.
+        result = await asyncio.to_thread(
+            pre_classify,
+            data,
+            accept_score=configurable.pre_classify_accept_score,
+            reject_score=configurable.pre_classify_reject_score,
+        )
+    except Exception as e:
+        # 사전 분류는 최적화일 뿐이므로, 실패하면 LLM이 판단하도록 넘긴다.
+        langsmith_logger.warning(f"Pre-classification failed: {str(e)}")
+        return {}
+
+    pre_classifier_stats.record(result, seconds=time.perf_counter() - started_at)
+    langsmith_logger.info(f"{result.reason} -> {result.is_resume}. stats={pre_classifier_stats.as_dict()}")
+    # 키워드 점수만으로 실제 이력서를 거절하지 않도록, 이력서로 확신한 경우에만 LLM을 건너뛴다.
+    if result.is_resume is not True:
+        return {}
+    return {
+        "is_resume_result": IsResumeResult(is_resume=result.is_resume, reason=result.reason),
+        "error": None,
+    }
+
+
+def should_call_is_resume(state: ParsingState, config: RunnableConfig) -> str:
+    """
+    Skips the is_resume model when the pre-classification was confident.
+    """
+    if state.is_resume_result is not None:
+        return should_parse_resume(state, config)
+    if ConfigSchema.from_runnable_config(config).speculative_parse:
+        return "speculative_parse"
+    return "is_resume"
+
+
+async def store_parse_cache_node(state: ParsingState, config: RunnableConfig) -> Dict[str, Any]:
+    """
+    Stores the freshly parsed result in the parse cache.
+    """
+    if not state.parse_cache_key or not state.parsed_result:
+        return {}
+
+    configurable = ConfigSchema.from_runnable_config(config)
+    try:
+        await asyncio.to_thread(_get_parse_cache(configurable).put, state.parse_cache_key, state.parsed_result)
+    except Exception as e:
+        langsmith_logger.warning(f"Failed to store parse result in cache: {str(e)}")
+    return {}
+
+
+async def is_resume_node(state: ParsingState, config: RunnableConfig) -> Dict[str, Any]:
     """
     Determines if the document is a resume.
     """
 
     try:
         configurable = ConfigSchema.from_runnable_config(config)
-        model_name = configurable.is_resume_model
-        temperature = configurable.temperature
         system_prompt = configurable.is_resume_system_prompt
-        llm = ChatGoogleGenerativeAI(model=model_name, temperature=temperature, timeout=100)
-        structured_llm = llm.with_structured_output(IsResumeResult)
+        spec = ModelSpec(model=configurable.is_resume_model, temperature=configurable.temperature, timeout=100)
+        models = model_chain(spec.model, configurable.is_resume_fallback_models)
 
         messages = [
             SystemMessage(content=system_prompt),
             HumanMessage(
                 content=[
                     {"type": "text", "text": "Please check if the attached document is a job application related document."},
-                    {"type": "image_url", "image_url": {"url": state.resume_file_path}},
+                    {"type": "image_url", "image_url": {"url": await aget_resume_data_uri(state.resume_file_path, _model_file_key(state))}},
                 ]
             ),
         ]
 
-        is_resume_result = structured_llm.invoke(messages, config)
+        started_at = time.perf_counter()
+        is_resume_result = await afallback(
+            models,
+            lambda model: ainvoke_llm(
+                _structured_model(spec.for_model(model), IsResumeResult),
+                messages,
+                config,
+                model=model,
+                user_id=state.user_id,
+                max_quota_retries=quota_retries_for(models),
+            ),
+            configurable.backoff(),
+        )
+        pre_classifier_stats.record_llm(seconds=time.perf_counter() - started_at)
         return {
             "is_resume_result": is_resume_result,
             "error": None,
@@ -54,47 +274,318 @@ def is_resume_node(state: ParsingState, config: RunnableConfig) -> Dict[str, Any
         if "quota" in error_msg.lower() or "rate limit" in error_msg.lower():
             return {
                 "is_resume_result": None,
-                "error": f"AI 모델 할당량 초과 또는 요청 제한: {error_msg}",
+                "error": format_error("quota", error_msg),
             }
         elif "authentication" in error_msg.lower() or "api key" in error_msg.lower():
             return {
                 "is_resume_result": None,
-                "error": f"AI 모델 인증 오류: {error_msg}",
+                "error": format_error("auth", error_msg),
             }
         else:
             return {
                 "is_resume_result": None,
-                "error": f"이력서 여부 판단 중 오류가 발생했습니다: {error_msg}",
+                "error": format_error("is_resume", error_msg),
             }
 
 
-def parse_resume_node(state: ParsingState, config: RunnableConfig) -> Dict[str, Any]:
+def _parse_messages(system_prompt: str, file_url: str, instruction: str = PARSE_INSTRUCTION) -> list:
+    return [
+        SystemMessage(content=system_prompt),
+        HumanMessage(
+            content=[
+                {"type": "text", "text": instruction},
+                {"type": "image_url", "image_url": {"url": file_url}},
+            ]
+        ),
+    ]
+
+
+def _structured_model(spec: ModelSpec, schema, include_raw: bool = False):
+    # 팩토리는 호출 시점에 모듈 전역에서 읽는다(테스트에서 ChatGoogleGenerativeAI를 교체할 수 있도록).
+    return get_structured_model(spec, schema, include_raw=include_raw, factory=factory_for(spec.model, ChatGoogleGenerativeAI))
+
+
+async def _ainvoke_structured(spec: ModelSpec, schema, messages: list, configurable: ConfigSchema, config: RunnableConfig, user_id: str = ""):
+    """
+    Invokes the model with structured output. Schema-invalid output is repaired by a text-only model;
+    only if the repair fails is the error raised, which leads to a full re-parse.
+    """
+    models = model_chain(spec.model, configurable.parse_fallback_models)
+
+    async def call(model: str):
+        model_spec = spec.for_model(model)
+        hedge_spec = model_spec.for_model(configurable.hedge_model) if configurable.hedge_model and model == spec.model else model_spec
+        return await ainvoke_llm(
+            _structured_model(model_spec, schema, include_raw=True),
+            messages,
+            config,
+            model=model,
+            user_id=user_id,
+            max_output_tokens=model_spec.max_output_tokens or 0,
+            max_quota_retries=quota_retries_for(models),
+            hedge=configurable.hedge_config(),
+            hedge_runnable=_structured_model(hedge_spec, schema, include_raw=True),
+            hedge_model=hedge_spec.model,
+        )
+
+    started_at = time.perf_counter()
+    response = await afallback(models, call, configurable.backoff())
+    if response["parsed"] is not None:
+        return response["parsed"]
+
+    error = StructuredOutputError(
+        schema,
+        raw_output=raw_output_text(response["raw"]),
+        validation_error=str(response.get("parsing_error") or "The model returned no structured output."),
+        parse_seconds=time.perf_counter() - started_at,
+    )
+    return await _arepair_or_raise(error, configurable, config, user_id)
+
+
+async def _arepair_or_raise(error: StructuredOutputError, configurable: ConfigSchema, config: RunnableConfig, user_id: str = ""):
+    schema = error.schema
+    if not configurable.repair_enabled or not error.raw_output:
+        raise error
+
+    repair_started_at = time.perf_counter()
+    try:
+        repair_spec = ModelSpec(
+            model=configurable.repair_model,
+            temperature=0,
+            max_output_tokens=configurable.repair_max_output_tokens,
+            timeout=60,
+        )
+        repaired = await arepair(_structured_model(repair_spec, schema), error, config, model=repair_spec.model, user_id=user_id)
+    except Exception as e:
+        repair_stats.record(False, repair_seconds=time.perf_counter() - repair_started_at, parse_seconds=error.parse_seconds)
+        langsmith_logger.warning(f"Repair failed, falling back to a full re-parse: {str(e)}. stats={repair_stats.as_dict()}")
+        raise error from e
+
+    repair_seconds = time.perf_counter() - repair_started_at
+    repair_stats.record(True, repair_seconds=repair_seconds, parse_seconds=error.parse_seconds)
+    langsmith_logger.info(
+        f"Repaired {schema.__name__} output in {repair_seconds:.2f}s, "
+        f"saving about {error.parse_seconds - repair_seconds:.2f}s of re-parsing. stats={repair_stats.as_dict()}"
+    )
+    return repaired
+
+
+def _get_stream_writer():
+    # 노드 함수를 그래프 밖에서 직접(또는 RunnableLambda로) 호출하는 경우에는 이벤트를 버린다.
+    try:
+        return get_stream_writer()
+    except (RuntimeError, KeyError):
+        return lambda _: None
+
+
+def _with_index_metadata(documents: list, state: ParsingState) -> list:
+    """Adds the metadata used for indexing. Streamed and final documents must get exactly the same metadata."""
+    for doc in documents:
+        doc.metadata["user_id"] = state.user_id
+        doc.metadata["api_version"] = state.api_version
+        doc.metadata["content_hash"] = compute_content_hash(doc)
+    return documents
+
+
+async def _aparse_streaming(spec: ModelSpec, state: ParsingState, configurable: ConfigSchema, config: RunnableConfig, generation: int) -> ResumeParseResult:
+    """
+    Streams the parse output and indexes each career/project experience into `generation` as soon as its JSON is complete.
+    The final result is still validated (and repaired) as a whole; `add_documents_to_qdrant_node` then stages the full
+    result into the same generation, reusing the chunks indexed here.
+    """
+    writer = _get_stream_writer()
+    current_generation = await aget_current_generation(state.user_id)
+    messages = _parse_messages(configurable.system_prompt, await aget_resume_data_uri(state.resume_file_path, _model_file_key(state)))
+    json_llm = get_chat_model(spec, factory=ChatGoogleGenerativeAI).bind(response_mime_type="application/json", response_json_schema=ResumeParseResult.model_json_schema())
+    extractor = StreamingParseExtractor()
+    indexing_tasks: list[asyncio.Task] = []
+    started_at = time.perf_counter()
+
+    async def index_item(key: str, index: int, item, candidate_name: str) -> None:
+        documents = _with_index_metadata([convert_experience_to_document(item, candidate_name)], state)
+        await astage_documents(state.user_id, generation, documents, current_generation=current_generation)
+        writer({"event": "item_indexed", "key": key, "index": index, "elapsed_seconds": round(time.perf_counter() - started_at, 3)})
+
+    def handle_completed(completed) -> None:
+        for key, index, item in completed:
+            writer({"event": "item_parsed", "key": key, "index": index, "title": item_title(item), "elapsed_seconds": round(time.perf_counter() - started_at, 3)})
+            if extractor.candidate_profile is not None:
+                indexing_tasks.append(asyncio.create_task(index_item(key, index, item, extractor.candidate_profile.name)))
+
+    text = ""
+    try:
+        async with arate_limited(spec.model, messages, user_id=state.user_id, max_output_tokens=spec.max_output_tokens or 0):
+            async for chunk in json_llm.astream(messages, config):
+                text += chunk.text
+                handle_completed(extractor.feed(text))
+        handle_completed(extractor.feed(text, final=True))
+    except BaseException:
+        for task in indexing_tasks:
+            task.cancel()
+        # 취소된 인덱싱 작업이 실제로 멈춘 뒤에 반환해, 호출한 쪽이 끝난 뒤에 청크가 기록되지 않게 한다.
+        await asyncio.gather(*indexing_tasks, return_exceptions=True)
+        raise
+    parse_seconds = time.perf_counter() - started_at
+
+    # 미리 인덱싱에 실패한 항목은 마지막 단계에서 다시 기록되므로, 여기서는 로그만 남긴다.
+    for result in await asyncio.gather(*indexing_tasks, return_exceptions=True):
+        if isinstance(result, BaseException):
+            langsmith_logger.warning(f"Early indexing of a streamed item failed: {str(result)}")
+
+    try:
+        parsed_result = ResumeParseResult.model_validate_json(text)
+    except ValueError as e:
+        parsed_result = await _arepair_or_raise(
+            StructuredOutputError(ResumeParseResult, raw_output=text, validation_error=str(e), parse_seconds=parse_seconds),
+            configurable,
+            config,
+            state.user_id,
+        )
+    writer({"event": "parse_completed", "indexed_early": len(indexing_tasks), "elapsed_seconds": round(time.perf_counter() - started_at, 3)})
+    langsmith_logger.info(f"Streamed parse finished in {parse_seconds:.2f}s with {len(indexing_tasks)} items indexed early.")
+    return parsed_result
+
+
+def _prepare_page_windows(data: bytes, configurable: ConfigSchema) -> list[PageWindow]:
+    if count_pages(data) < configurable.page_window_min_pages:
+        return []
+    return split_into_page_windows(data, configurable.page_window_size, configurable.page_window_overlap)
+
+
+async def _aparse_page_windows(spec: ModelSpec, state: ParsingState, configurable: ConfigSchema, config: RunnableConfig) -> Optional[ResumeParseResult]:
+    """
+    Parses the page windows of a long PDF concurrently and merges the results.
+    Returns None when the document is short enough to be parsed in a single call.
+    """
+    data = (await aget_resume_file(state.resume_file_path, _model_file_key(state))).data
+    # PDF 분할은 CPU 작업이므로 이벤트 루프를 막지 않도록 스레드에서 실행한다.
+    windows = await asyncio.to_thread(_prepare_page_windows, data, configurable)
+    if len(windows) <= 1:
+        return None
+
+    semaphore = asyncio.Semaphore(configurable.page_window_concurrency)
+
+    async def parse_window(window: PageWindow) -> ResumeParseResult:
+        instruction = PAGE_WINDOW_INSTRUCTION.format(label=window.label)
+        async with semaphore:
+            messages = _parse_messages(configurable.system_prompt, to_data_uri_from_bytes(window.data), instruction)
+            return await _ainvoke_structured(spec, ResumeParseResult, messages, configurable, config, state.user_id)
+
+    started_at = time.perf_counter()
+    try:
+        # 한 구간이라도 실패하면 나머지 호출을 취소하고 기존 재시도 흐름을 따른다.
+        async with asyncio.TaskGroup() as task_group:
+            tasks = [task_group.create_task(parse_window(window)) for window in windows]
+    except ExceptionGroup as e:
+        raise e.exceptions[0]
+
+    parsed_result = merge_parse_results([task.result() for task in tasks])
+    langsmith_logger.info(
+        f"Parsed {windows[-1].total_pages} pages in {len(windows)} windows in {time.perf_counter() - started_at:.2f}s: "
+        f"{len(parsed_result.career_experiences)} careers, {len(parsed_result.project_experiences)} projects after merge."
+    )
+    return parsed_result
+
+
+# schema_split 전략의 하위 호출: (state 키, 스키마, 설정 필드 접두사, 지시문)
+SCHEMA_SPLIT_PARTS = [
+    ("candidate_profile", CandidateProfile, "profile", SCHEMA_SPLIT_INSTRUCTIONS["profile"]),
+    ("career_experiences", CareerExperiences, "career", SCHEMA_SPLIT_INSTRUCTIONS["career"]),
+    ("project_experiences", ProjectExperiences, "project", SCHEMA_SPLIT_INSTRUCTIONS["project"]),
+]
+
+
+async def _aparse_schema_part(file_url: str, configurable: ConfigSchema, config: RunnableConfig, schema, prefix: str, instruction: str, user_id: str):
+    spec = ModelSpec(
+        model=getattr(configurable, f"{prefix}_parse_model"),
+        temperature=configurable.temperature,
+        thinking_budget=getattr(configurable, f"{prefix}_parse_thinking_budget"),
+        max_output_tokens=getattr(configurable, f"{prefix}_parse_max_output_tokens"),
+        timeout=100,
+    )
+    started_at = time.perf_counter()
+    messages = _parse_messages(configurable.system_prompt, file_url, instruction)
+    result = await _ainvoke_structured(spec, schema, messages, configurable, config, user_id)
+    langsmith_logger.info(f"Schema-split part {prefix} parsed in {time.perf_counter() - started_at:.2f}s.")
+    return result
+
+
+async def _aparse_schema_split(state: ParsingState, configurable: ConfigSchema, config: RunnableConfig, partial_results: dict[str, Any]) -> ResumeParseResult:
+    """
+    Extracts the profile, careers and projects concurrently and assembles them into `ResumeParseResult`.
+    `partial_results` holds the parts that already succeeded; only the missing parts are called, and successes are added to it.
+    """
+    pending = [part for part in SCHEMA_SPLIT_PARTS if part[0] not in partial_results]
+    file_url = await aget_resume_data_uri(state.resume_file_path, _model_file_key(state))
+    results = await asyncio.gather(
+        *[_aparse_schema_part(file_url, configurable, config, schema, prefix, instruction, state.user_id) for _, schema, prefix, instruction in pending],
+        return_exceptions=True,
+    )
+    errors = []
+    for (key, _, prefix, _), result in zip(pending, results):
+        if isinstance(result, BaseException):
+            langsmith_logger.warning(f"Schema-split part {prefix} failed: {str(result)}")
+            errors.append(result)
+        else:
+            # 성공한 부분은 저장해 두고, 재시도 시에는 실패한 부분만 다시 호출한다.
+            partial_results[key] = result if key == "candidate_profile" else getattr(result, key)
+    if errors:
+        raise errors[0]
+    return ResumeParseResult(**partial_results)
+
+
+async def _aselect_parse_policy(state: ParsingState, configurable: ConfigSchema) -> ParsePolicy:
+    features = None
+    if configurable.adaptive_parse_policy:
+        try:
+            resume_file = await aget_resume_file(state.resume_file_path, state.resume_file_hash)
+            if resume_file.mime_type == "application/pdf":
+                features = await asyncio.to_thread(extract_document_features, resume_file.data)
+        except Exception as e:
+            langsmith_logger.warning(f"Failed to read document features: {str(e)}")
+    policy = select_parse_policy(features, configurable, attempt=state.parse_retry_count)
+    # 임계값 조정을 위해 특징과 결정을 함께 남긴다.
+    langsmith_logger.info(
+        f"Parse policy {policy.tier}: model={policy.model} thinking_budget={policy.thinking_budget} "
+        f"max_output_tokens={policy.max_output_tokens} timeout={policy.timeout}s ({policy.reason}). features={features}"
+    )
+    return policy
+
+
+async def parse_resume_node(state: ParsingState, config: RunnableConfig) -> Dict[str, Any]:
     """
     Parses the document using a multimodal LLM.
     """
+    update: Dict[str, Any] = {}
     try:
         configurable = ConfigSchema.from_runnable_config(config)
-        model_name = configurable.career_relevant_document_parse_model
+        policy = await _aselect_parse_policy(state, configurable)
         temperature = configurable.temperature
         system_prompt = configurable.system_prompt
-        llm = ChatGoogleGenerativeAI(model=model_name, temperature=temperature, thinking_budget=8192, max_output_tokens=8192, timeout=100)
-        structured_llm = llm.with_structured_output(ResumeParseResult)
-
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(
-                content=[
-                    {
-                        "type": "text",
-                        "text": "Please parse the attached resume PDF and extract the information based on the `ResumeParseResult` schema.",
-                    },
-                    {"type": "image_url", "image_url": {"url": state.resume_file_path}},
-                ]
-            ),
-        ]
-
-        parsed_result = structured_llm.invoke(messages, config)
+        spec = ModelSpec(
+            model=policy.model,
+            temperature=temperature,
+            thinking_budget=policy.thinking_budget,
+            max_output_tokens=policy.max_output_tokens,
+            timeout=policy.timeout,
+        )
+
+        parsed_result = None
+        if configurable.stream_parse and configurable.parse_strategy == "single":
+            # 재시도하더라도 같은 generation에 기록한다. 실패한 시도에서 미리 기록한 청크는 마지막 단계에서 정리된다.
+            update["index_generation"] = generation = state.index_generation or await anew_generation(state.user_id)
+            parsed_result = await _aparse_streaming(spec, state, configurable, config, generation)
+        elif configurable.parse_strategy == "schema_split":
+            update["partial_parse_results"] = partial_results = dict(state.partial_parse_results)
+            parsed_result = await _aparse_schema_split(state, configurable, config, partial_results)
+            update["partial_parse_results"] = {}
+        elif configurable.parse_strategy == "page_windows":
+            parsed_result = await _aparse_page_windows(spec, state, configurable, config)
+        if parsed_result is None:
+            messages = _parse_messages(system_prompt, await aget_resume_data_uri(state.resume_file_path, _model_file_key(state)))
+            parsed_result = await _ainvoke_structured(spec, ResumeParseResult, messages, configurable, config, state.user_id)
         return {
+            **update,
             "parsed_result": parsed_result,
             "error": None,
         }
@@ -103,27 +594,77 @@ def parse_resume_node(state: ParsingState, config: RunnableConfig) -> Dict[str,
         langsmith_logger.error(f"Error parsing resume: {error_msg}")
         if "quota" in error_msg.lower() or "rate limit" in error_msg.lower():
             return {
+                **update,
                 "parsed_result": None,
-                "error": f"AI 모델 할당량 초과 또는 요청 제한: {error_msg}",
+                "error": format_error("quota", error_msg),
             }
         elif "authentication" in error_msg.lower() or "api key" in error_msg.lower():
             return {
+                **update,
                 "parsed_result": None,
-                "error": f"AI 모델 인증 오류: {error_msg}",
+                "error": format_error("auth", error_msg),
             }
         elif "timeout" in error_msg.lower():
             return {
+                **update,
                 "parsed_result": None,
-                "error": f"AI 모델 요청 시간 초과: {error_msg}",
+                "error": format_error("timeout", error_msg),
             }
         else:
             return {
-        
+                **update,
                 "parsed_result": None,
-                "error": f"문서 파싱 중 오류가 발생했습니다: {error_msg}",
+                "error": format_error("parse", error_msg),
             }
 
 
+async def _timed(node, state: ParsingState, config: RunnableConfig) -> tuple[Dict[str, Any], float]:
+    started_at = time.perf_counter()
+    return await node(state, config), time.perf_counter() - started_at
+
+
+async def _acancel_and_wait(task: asyncio.Task) -> None:
+    """Cancels the task and returns only after it has stopped. Its result or error is discarded."""
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        # 이 노드 자신이 취소된 경우에는 취소를 그대로 전파한다.
+        current_task = asyncio.current_task()
+        if current_task is not None and current_task.cancelling():
+            raise
+    except Exception:
+        pass
+
+
+async def speculative_parse_node(state: ParsingState, config: RunnableConfig) -> Dict[str, Any]:
+    """
+    Runs is_resume and parse_resume at the same time and commits the parse only if the document is a resume.
+    """
+    started_at = time.perf_counter()
+    # create_task는 contextvars를 복사하므로 각 노드에서도 get_config()로 설정을 읽을 수 있다.
+    parse_task = asyncio.create_task(_timed(parse_resume_node, state, config))
+    try:
+        is_resume_update, is_resume_seconds = await _timed(is_resume_node, state, config)
+    except BaseException:
+        await _acancel_and_wait(parse_task)
+        raise
+    is_resume_result = is_resume_update.get("is_resume_result")
+
+    if is_resume_update.get("error") or not (is_resume_result and is_resume_result.is_resume):
+        # 이력서가 아니면 진행 중인 parse 호출을 취소하고, 미리 시작한 인덱싱까지 멈출 때까지 기다린다.
+        await _acancel_and_wait(parse_task)
+        speculation_stats.record_wasted(seconds=time.perf_counter() - started_at)
+        langsmith_logger.info(f"Speculative parse cancelled. stats={speculation_stats.as_dict()}")
+        return {**is_resume_update, "parsed_result": None}
+
+    parse_update, parse_seconds = await parse_task
+    elapsed_seconds = time.perf_counter() - started_at
+    speculation_stats.record_committed(saved_seconds=is_resume_seconds + parse_seconds - elapsed_seconds)
+    langsmith_logger.info(f"Speculative parse committed in {elapsed_seconds:.2f}s. stats={speculation_stats.as_dict()}")
+    return {**is_resume_update, **parse_update}
+
+
 def should_parse_resume(state: ParsingState, config: RunnableConfig) -> str:
     """
     Determines whether to parse the document or end the process.
@@ -134,7 +675,7 @@ def should_parse_resume(state: ParsingState, config: RunnableConfig) -> str:
     if state.is_resume_result and state.is_resume_result.is_resume:
         return "parse_resume"
     else:
-        print(f"Document is not a resume. Reason: {state.is_resume_result.reason if state.is_resume_result else 'Unknown'}")
+        langsmith_logger.info(f"Document is not a resume. Reason: {state.is_resume_result.reason if state.is_resume_result else 'Unknown'}")
         return "clean_up"
 
 
@@ -157,18 +698,33 @@ def should_convert_to_document(state: ParsingState) -> str:
     return "convert_to_document"
 
 
-def handle_parse_failure_node(state: ParsingState) -> Dict[str, Any]:
+def should_commit_speculative_parse(state: ParsingState) -> str:
+    """
+    Routes the result of the speculative parse: non-resumes are cleaned up, parse results go through the usual checks.
+    """
+    if not (state.is_resume_result and state.is_resume_result.is_resume):
+        langsmith_logger.info(f"Document is not a resume. Reason: {state.is_resume_result.reason if state.is_resume_result else state.error}")
+        return "clean_up"
+    return should_convert_to_document(state)
+
+
+async def handle_parse_failure_node(state: ParsingState, config: RunnableConfig) -> Dict[str, Any]:
     """
     파싱 재시도 횟수를 증가시키고 다음 재시도를 위해 상태를 정리합니다.
+    모델 장애(할당량, 시간 초과, 모든 모델의 회로가 열림)로 실패했다면 지수 백오프(jitter 포함) 후에 재시도합니다.
     """
     langsmith_logger.error(f"Error parsing resume: {state.error}. Checking for retries.")
+    if classify_error(state.error) in ("quota", "timeout") or CIRCUIT_OPEN_MESSAGE in (state.error or ""):
+        delay = ConfigSchema.from_runnable_config(config).backoff().delay(state.parse_retry_count)
+        langsmith_logger.info(f"Backing off {delay:.2f}s before parse attempt {state.parse_retry_count + 2}.")
+        await asyncio.sleep(delay)
     return {
         "parse_retry_count": state.parse_retry_count + 1,
         "error": None,  # 이전 오류를 지우고 재시도
     }
 
 
-def parsed_resume_to_document_node(state: ParsingState, config: RunnableConfig) -> Dict[str, Any]:
+async def parsed_resume_to_document_node(state: ParsingState, config: RunnableConfig) -> Dict[str, Any]:
     """
     Converts the parsed result to a langchain document.
     """
@@ -178,11 +734,7 @@ def parsed_resume_to_document_node(state: ParsingState, config: RunnableConfig)
             # This path should not be taken due to the conditional edge, but it remains as a safeguard.
             return {"documents": None, "error": "Defensive check failed: parsed_result is empty in parsed_resume_to_document_node."}
 
-        documents = convert_resume_to_documents(parsed_result=parsed_result)
-
-        for doc in documents:
-            doc.metadata["user_id"] = state.user_id
-            doc.metadata["api_version"] = state.api_version
+        documents = _with_index_metadata(convert_resume_to_documents(parsed_result=parsed_result), state)
 
         return {
             "documents": documents,
@@ -192,26 +744,45 @@ def parsed_resume_to_document_node(state: ParsingState, config: RunnableConfig)
         langsmith_logger.error(f"Error converting parsed result to documents: {str(e)}")
         return {
             "documents": None,
-            "error": f"파싱 결과를 문서로 변환하는 중 오류가 발생했습니다: {str(e)}",
+            "error": format_error("convert", str(e)),
         }
 
 
-def add_documents_to_qdrant_node(state: ParsingState, config: RunnableConfig) -> Dict[str, Any]:
+async def add_documents_to_qdrant_node(state: ParsingState, config: RunnableConfig) -> Dict[str, Any]:
     """
-    Adds the documents to the Qdrant vector store.
+    Adds the documents to the Qdrant vector store as a new index generation.
+    Only chunks whose content hash is new are embedded; unchanged chunks are carried over,
+    and chunks that are no longer in the resume are garbage-collected with the old generation.
     """
     if not state.documents:
         return {
-            "error": "벡터 스토어에 추가할 문서가 없습니다.",
+            "error": ERROR_MESSAGES["no_documents"],
         }
 
     try:
-        # 기존 사용자 문서 삭제
-        delete_docs_by(key="metadata.user_id", value=state.user_id)
-        
-        # 새 문서 추가
-        uuids = [str(uuid4()) for _ in range(len(state.documents))]
-        apply_docs_vector_store.add_documents(documents=state.documents, ids=uuids)
+        current_generation = await aget_current_generation(state.user_id)
+        # 스트리밍 파싱에서 이미 일부 청크를 기록한 generation이 있으면 그대로 이어서 쓴다.
+        generation = state.index_generation or await anew_generation(state.user_id)
+
+        # 새 generation에 청크를 기록한다. 변경되지 않은 청크는 임베딩하지 않고 generation만 추가한다.
+        embedded_count, reused_count = await astage_documents(
+            state.user_id, generation, state.documents, current_generation=current_generation
+        )
+        if state.index_generation is not None:
+            # 미리 기록했지만 최종 결과에는 없는 청크는 전환 전에 이 generation에서 뺀다.
+            keep_ids = [document_point_id(state.user_id, doc.metadata["content_hash"]) for doc in state.documents]
+            await aunstage_documents_except(state.user_id, generation, keep_ids)
+
+        # 포인터를 원자적으로 전환한 뒤, 이전 generation은 백그라운드에서 정리한다.
+        if await aset_current_generation(state.user_id, generation):
+            schedule_generation_gc(state.user_id, generation)
+        else:
+            langsmith_logger.info(f"Generation {generation} of user {state.user_id} was superseded by a newer one.")
+
+        langsmith_logger.info(
+            f"Indexed {len(state.documents)} chunks for user {state.user_id} in generation {generation}: "
+            f"{embedded_count} embedded, {reused_count} unchanged. embedding_cache={embedding_cache_stats(persistent_bytes=False)}"
+        )
         return {
             "error": None,
         }
@@ -221,22 +792,22 @@ def add_documents_to_qdrant_node(state: ParsingState, config: RunnableConfig) ->
         langsmith_logger.error(f"Error adding documents to Qdrant: {error_msg}")
         if "connection" in error_msg.lower() or "timeout" in error_msg.lower():
             return {
-                "error": f"벡터 데이터베이스 연결 오류: {error_msg}",
+                "error": format_error("vector_db_connection", error_msg),
             }
         elif "authentication" in error_msg.lower() or "unauthorized" in error_msg.lower():
             return {
-                "error": f"벡터 데이터베이스 인증 오류: {error_msg}",
+                "error": format_error("vector_db_auth", error_msg),
             }
         elif "embedding" in error_msg.lower():
             return {
-                "error": f"문서 임베딩 생성 오류: {error_msg}",
+                "error": format_error("embedding", error_msg),
             }
         else:
             return {
-                "error": f"벡터 스토어에 문서 추가 중 오류가 발생했습니다: {error_msg}",
+                "error": format_error("vector_store", error_msg),
             }
 
-def clean_up_node(state: ParsingState, config: RunnableConfig) -> Dict[str, Any]:
+async def clean_up_node(state: ParsingState, config: RunnableConfig) -> Dict[str, Any]:
     return {
         "documents": None,
     }
@@ -244,15 +815,51 @@ def clean_up_node(state: ParsingState, config: RunnableConfig) -> Dict[str, Any]
 graph_builder = StateGraph(ParsingState, config_schema=ConfigSchema)
 
 """NODES"""
+graph_builder.add_node("fetch_resume_file", fetch_resume_file_node)
+graph_builder.add_node("check_parse_cache", check_parse_cache_node)
+graph_builder.add_node("slim_resume_file", slim_resume_file_node)
+graph_builder.add_node("pre_classify", pre_classify_node)
 graph_builder.add_node("is_resume", is_resume_node)
 graph_builder.add_node("parse_resume", parse_resume_node)
+graph_builder.add_node("speculative_parse", speculative_parse_node)
+graph_builder.add_node("store_parse_cache", store_parse_cache_node)
 graph_builder.add_node("parsed_resume_to_document", parsed_resume_to_document_node)
 graph_builder.add_node("add_documents_to_qdrant", add_documents_to_qdrant_node)
 graph_builder.add_node("clean_up", clean_up_node)
 graph_builder.add_node("handle_parse_failure", handle_parse_failure_node)
 
 """EDGES"""
-graph_builder.add_edge(START, "is_resume")
+graph_builder.add_edge(START, "fetch_resume_file")
+
+graph_builder.add_conditional_edges(
+    "fetch_resume_file",
+    should_continue_after_fetch,
+    {
+        "check_parse_cache": "check_parse_cache",
+        "clean_up": "clean_up",
+    },
+)
+
+graph_builder.add_conditional_edges(
+    "check_parse_cache",
+    should_use_parse_cache,
+    {
+        "convert_to_document": "parsed_resume_to_document",
+        "slim_resume_file": "slim_resume_file",
+    },
+)
+graph_builder.add_edge("slim_resume_file", "pre_classify")
+
+graph_builder.add_conditional_edges(
+    "pre_classify",
+    should_call_is_resume,
+    {
+        "is_resume": "is_resume",
+        "speculative_parse": "speculative_parse",
+        "parse_resume": "parse_resume",
+        "clean_up": "clean_up",
+    },
+)
 
 graph_builder.add_conditional_edges(
     "is_resume",
@@ -266,12 +873,22 @@ graph_builder.add_conditional_edges(
     "parse_resume",
     should_convert_to_document,
     {
-        "convert_to_document": "parsed_resume_to_document",
+        "convert_to_document": "store_parse_cache",
+        "retry_parse": "handle_parse_failure",
+        "clean_up": "clean_up"
+    }
+)
+graph_builder.add_conditional_edges(
+    "speculative_parse",
+    should_commit_speculative_parse,
+    {
+        "convert_to_document": "store_parse_cache",
         "retry_parse": "handle_parse_failure",
         "clean_up": "clean_up"
     }
 )
 graph_builder.add_edge("handle_parse_failure", "parse_resume")
+graph_builder.add_edge("store_parse_cache", "parsed_resume_to_document")
 graph_builder.add_edge("parsed_resume_to_document", "add_documents_to_qdrant")
 graph_builder.add_edge("add_documents_to_qdrant", "clean_up")
 graph_builder.add_edge("clean_up", END)
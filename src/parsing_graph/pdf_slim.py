@@ -0,0 +1,273 @@
+"""
+PDF slimming before the multimodal upload.
+
+포트폴리오에는 원본 해상도의 스크린샷과 아키텍처 다이어그램이 그대로 들어 있어, 업로드 시간과 요청 크기의 대부분을
+모델이 원본 해상도로 볼 필요가 없는 이미지 바이트가 차지한다. LLM 호출 전에 로컬에서
+  - 임베디드 이미지를 축소하고 JPEG으로 다시 압축하고
+  - 페이지 사이에 중복된 이미지를 하나로 합치고
+  - 메타데이터(및 선택적으로 임베디드 폰트)를 제거한다.
+
+Usage:
+    python -m parsing_graph.pdf_slim fixtures/ [--parse]
+
+디렉터리의 PDF마다 절약한 바이트와 처리 시간을 출력한다. `--parse`를 주면 원본/경량화 파일로 각각
+`parse_resume_node`를 실행해 end-to-end 지연 시간 변화도 측정한다(GOOGLE_API_KEY 필요).
+"""
+import argparse
+import asyncio
+import hashlib
+import io
+import json
+import logging
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+FONT_FILE_KEYS = ("/FontFile", "/FontFile2", "/FontFile3")
+
+
+@dataclass(frozen=True)
+class SlimOptions:
+    max_image_dimension: int = 1600
+    jpeg_quality: int = 75
+    dedupe_images: bool = True
+    strip_metadata: bool = True
+    strip_fonts: bool = False
+
+    @classmethod
+    def from_config(cls, configurable: Any) -> "SlimOptions":
+        """Build the options from the `pdf_slim_*` fields of a parsing graph `ConfigSchema`."""
+        return cls(
+            max_image_dimension=configurable.pdf_slim_max_image_dimension,
+            jpeg_quality=configurable.pdf_slim_jpeg_quality,
+            dedupe_images=configurable.pdf_slim_dedupe_images,
+            strip_metadata=configurable.pdf_slim_strip_metadata,
+            strip_fonts=configurable.pdf_slim_strip_fonts,
+        )
+
+    @property
+    def variant(self) -> str:
+        """The resume file store variant of files slimmed with these options."""
+        return "slim-" + hashlib.sha256(json.dumps(asdict(self), sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+
+@dataclass(frozen=True)
+class SlimResult:
+    data: bytes
+    original_bytes: int
+    slim_bytes: int
+    images_recompressed: int = 0
+    images_deduplicated: int = 0
+    seconds: float = 0.0
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.original_bytes - self.slim_bytes
+
+
+def _recompress_image(pikepdf, raw_image, options: SlimOptions) -> bool:
+    """Downsample and re-encode an image XObject as JPEG in place. Returns False if it was left untouched."""
+    from PIL import Image
+
+    # 알파 마스크가 있는 이미지나 색 공간 변환이 어려운 이미지는 건드리지 않는다.
+    if "/SMask" in raw_image or "/Mask" in raw_image or raw_image.get("/ImageMask", False):
+        return False
+    try:
+        image = pikepdf.PdfImage(raw_image).as_pil_image()
+    except Exception:
+        return False
+
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    image.thumbnail((options.max_image_dimension, options.max_image_dimension), Image.LANCZOS)
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=options.jpeg_quality, optimize=True)
+    encoded = buffer.getvalue()
+    if len(encoded) >= len(raw_image.read_raw_bytes()):
+        return False
+
+    raw_image.write(encoded, filter=pikepdf.Name.DCTDecode)
+    raw_image.Width, raw_image.Height = image.size
+    raw_image.ColorSpace = pikepdf.Name.DeviceGray if image.mode == "L" else pikepdf.Name.DeviceRGB
+    raw_image.BitsPerComponent = 8
+    for key in ("/DecodeParms", "/Decode"):
+        if key in raw_image:
+            del raw_image[key]
+    return True
+
+
+def _strip_font_files(pikepdf, pdf) -> None:
+    # 텍스트 레이어(ToUnicode)는 남기고 폰트 프로그램만 제거한다. 렌더링은 대체 폰트로 이루어진다.
+    for obj in pdf.objects:
+        if isinstance(obj, pikepdf.Dictionary) and obj.get("/Type") == pikepdf.Name.FontDescriptor:
+            for key in FONT_FILE_KEYS:
+                if key in obj:
+                    del obj[key]
+
+
+def slim_pdf(data: bytes, options: SlimOptions = SlimOptions()) -> SlimResult:
+    """Return a slimmer copy of the PDF. Files that cannot be processed, or do not get smaller, are returned as is."""
+    import pikepdf
+
+    started_at = time.perf_counter()
+    try:
+        pdf = pikepdf.open(io.BytesIO(data))
+    except Exception as e:
+        logger.debug(f"Not slimming an unreadable PDF: {str(e)}")
+        return SlimResult(data=data, original_bytes=len(data), slim_bytes=len(data), seconds=time.perf_counter() - started_at)
+
+    with pdf:
+        images_by_digest: dict[str, Any] = {}
+        processed: set[tuple[int, int]] = set()
+        recompressed = deduplicated = 0
+        for page in pdf.pages:
+            xobjects = page.obj.get("/Resources", {}).get("/XObject", {})
+            for name in list(xobjects.keys()):
+                raw_image = xobjects[name]
+                if raw_image.get("/Subtype") != pikepdf.Name.Image:
+                    continue
+                if options.dedupe_images:
+                    digest = hashlib.sha256(raw_image.read_raw_bytes()).hexdigest()
+                    first = images_by_digest.setdefault(digest, raw_image)
+                    if first.objgen != raw_image.objgen:
+                        # 같은 이미지를 참조하도록 바꾸면, 저장 시 참조되지 않는 사본은 빠진다.
+                        xobjects[name] = first
+                        deduplicated += 1
+                        continue
+                if raw_image.objgen in processed:
+                    continue
+                processed.add(raw_image.objgen)
+                recompressed += _recompress_image(pikepdf, raw_image, options)
+
+        if options.strip_metadata:
+            if "/Metadata" in pdf.Root:
+                del pdf.Root.Metadata
+            for key in list(pdf.docinfo.keys()):
+                del pdf.docinfo[key]
+        if options.strip_fonts:
+            _strip_font_files(pikepdf, pdf)
+
+        buffer = io.BytesIO()
+        pdf.save(buffer, compress_streams=True, object_stream_mode=pikepdf.ObjectStreamMode.generate)
+        slimmed = buffer.getvalue()
+
+    if len(slimmed) >= len(data):
+        slimmed = data
+    return SlimResult(
+        data=slimmed,
+        original_bytes=len(data),
+        slim_bytes=len(slimmed),
+        images_recompressed=recompressed,
+        images_deduplicated=deduplicated,
+        seconds=time.perf_counter() - started_at,
+    )
+
+
+@dataclass
+class SlimStats:
+    """Process-wide counters of the slimming stage."""
+
+    files: int = 0
+    original_bytes: int = 0
+    slim_bytes: int = 0
+    seconds: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, result: SlimResult) -> None:
+        with self._lock:
+            self.files += 1
+            self.original_bytes += result.original_bytes
+            self.slim_bytes += result.slim_bytes
+            self.seconds += result.seconds
+
+    def as_dict(self) -> dict[str, float]:
+        with self._lock:
+            return {
+                "files": self.files,
+                "bytes_saved": self.original_bytes - self.slim_bytes,
+                "size_ratio": round(self.slim_bytes / self.original_bytes, 4) if self.original_bytes else 1.0,
+                "slim_seconds": round(self.seconds, 3),
+            }
+
+
+slim_stats = SlimStats()
+
+
+async def _parse_seconds(data: bytes, configurable: Optional[dict[str, Any]]) -> float:
+    import sys
+
+    from parsing_graph.resume_file import ResumeFile, resume_file_store
+    from parsing_graph.state import ParsingState
+
+    import parsing_graph.parsing_graph  # noqa: F401
+
+    # 패키지의 `parsing_graph` 속성은 컴파일된 그래프이므로 모듈은 sys.modules에서 꺼낸다.
+    graph_module = sys.modules["parsing_graph.parsing_graph"]
+    resume_file = ResumeFile(sha256=hashlib.sha256(data).hexdigest(), data=data)
+    resume_file_store.put(resume_file)
+    state = ParsingState(resume_file_path="benchmark.pdf", resume_file_hash=resume_file.sha256)
+    started_at = time.perf_counter()
+    update = await graph_module.parse_resume_node(state, {"configurable": configurable or {}})
+    if update.get("error"):
+        raise RuntimeError(update["error"])
+    return time.perf_counter() - started_at
+
+
+def run_benchmark(paths: list[Path], options: SlimOptions, parse: bool = False, configurable: Optional[dict[str, Any]] = None) -> dict[str, Any]:
+    """Slim every file and report bytes saved, and optionally the end-to-end parse latency change."""
+    files = []
+    for path in paths:
+        data = path.read_bytes()
+        result = slim_pdf(data, options)
+        report = {
+            "file": path.name,
+            **{k: v for k, v in asdict(result).items() if k != "data"},
+            "bytes_saved": result.bytes_saved,
+        }
+        if parse:
+            report["parse_seconds_original"] = round(asyncio.run(_parse_seconds(data, configurable)), 3)
+            report["parse_seconds_slim"] = round(asyncio.run(_parse_seconds(result.data, configurable)), 3)
+            report["latency_change_seconds"] = round(
+                report["parse_seconds_slim"] + result.seconds - report["parse_seconds_original"], 3
+            )
+        files.append(report)
+
+    original_bytes = sum(f["original_bytes"] for f in files)
+    slim_bytes = sum(f["slim_bytes"] for f in files)
+    summary = {
+        "files": len(files),
+        "original_bytes": original_bytes,
+        "slim_bytes": slim_bytes,
+        "size_ratio": round(slim_bytes / original_bytes, 4) if original_bytes else 1.0,
+        "slim_seconds": round(sum(f["seconds"] for f in files), 3),
+    }
+    if parse:
+        summary["latency_change_seconds"] = round(sum(f["latency_change_seconds"] for f in files), 3)
+    return {"summary": summary, "files": files}
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Measure PDF slimming on a directory of PDFs.")
+    parser.add_argument("corpus", type=Path, help="Directory of PDF files.")
+    parser.add_argument("--max-image-dimension", type=int, default=SlimOptions.max_image_dimension)
+    parser.add_argument("--jpeg-quality", type=int, default=SlimOptions.jpeg_quality)
+    parser.add_argument("--strip-fonts", action="store_true", help="Also remove embedded font programs.")
+    parser.add_argument("--parse", action="store_true", help="Also measure parse_resume_node latency with and without slimming.")
+    parser.add_argument("--configurable", type=json.loads, default={}, help="JSON object of ConfigSchema overrides for --parse.")
+    args = parser.parse_args(argv)
+
+    options = SlimOptions(
+        max_image_dimension=args.max_image_dimension,
+        jpeg_quality=args.jpeg_quality,
+        strip_fonts=args.strip_fonts,
+    )
+    report = run_benchmark(sorted(args.corpus.glob("*.pdf")), options, parse=args.parse, configurable=args.configurable)
+    print(json.dumps(report, ensure_ascii=False, indent=2))  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
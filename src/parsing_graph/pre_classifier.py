@@ -0,0 +1,228 @@
+"""
+Local text-layer pre-classification of resumes.
+
+대부분의 업로드는 텍스트 레이어가 있는 PDF인데, 예/아니오 판단 하나를 위해 매번 멀티모달 LLM을 호출한다.
+이 모듈은 PDF의 텍스트 레이어를 로컬에서 추출해 `IS_RESUME_SYSTEM_PROMPT`의 판단 기준
+(개인 식별 정보, 학력, 경력, 프로젝트, 기술 스택)과 대조하고, 이력서라고 확신한 경우에만 LLM 호출을 건너뛴다.
+점수가 낮은(이력서가 아닌 것으로 보이는) 문서, 텍스트 레이어가 없거나(스캔 PDF 등) 점수가 애매한 문서는 기존대로 `is_resume_node`에서 판단한다.
+키워드 점수는 "requirements" 같은 단어를 쓰는 실제 이력서를 거절할 수 있으므로, 거절은 항상 LLM이 확인한다.
+수락은 LLM이 확인하지 않으므로 `pre_classify_enabled`로 켠 경우에만 동작한다(기본값은 꺼짐).
+"""
+import io
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from parsing_graph.configuration import DocumentFeatures
+
+logger = logging.getLogger(__name__)
+
+# 이력서는 보통 앞쪽 페이지에 판단 근거가 모두 나오므로, 추출 비용을 줄이기 위해 앞 페이지만 읽는다.
+MAX_PAGES = 3
+# 이보다 짧은 텍스트는 텍스트 레이어가 없는 것으로 보고 LLM에 맡긴다.
+MIN_TEXT_CHARS = 200
+
+# IS_RESUME_SYSTEM_PROMPT의 판단 기준과 대응하는 신호. 시각 자료 기준은 텍스트로 판단할 수 없으므로 제외한다.
+RESUME_SIGNALS: dict[str, list[str]] = {
+    "contact": [
+        r"[\w.+-]+@[\w-]+\.[\w.]+",
+        r"\b01[016789][-. ]?\d{3,4}[-. ]?\d{4}\b",
+        r"github\.com/",
+        r"linkedin\.com/",
+    ],
+    "education": [r"학력", r"대학교", r"대학원", r"학사", r"석사", r"\beducation\b", r"\buniversity\b", r"\bbachelor", r"\bmaster'?s\b"],
+    "experience": [r"경력", r"재직", r"근무", r"인턴", r"\bwork experience\b", r"\bexperience\b", r"\bintern(ship)?\b"],
+    "projects": [r"프로젝트", r"포트폴리오", r"\bprojects?\b", r"\bportfolio\b"],
+    "skills": [r"기술\s?스택", r"보유\s?기술", r"\bskills\b", r"\btech stack\b"],
+    "application": [r"이력서", r"경력기술서", r"자기소개서", r"지원\s?동기", r"\bresume\b", r"\bcurriculum vitae\b"],
+}
+# 문서 종류를 직접 밝히는 신호는 다른 신호보다 강한 근거이다.
+SIGNAL_WEIGHTS = {"application": 2}
+
+# 채용 공고처럼 같은 단어를 많이 쓰지만 지원 문서가 아닌 문서의 신호. 일치하면 점수를 깎는다.
+NON_RESUME_SIGNALS: dict[str, list[str]] = {
+    "job_posting": [r"채용\s?공고", r"모집\s?요강", r"자격\s?요건", r"우대\s?사항", r"담당\s?업무", r"\bjob description\b", r"\brequirements\b"],
+    "contract": [r"계약서", r"갑과\s?을", r"\bagreement\b"],
+    "invoice": [r"영수증", r"청구서", r"세금\s?계산서", r"\binvoice\b"],
+}
+NON_RESUME_PENALTY = 4
+
+_COMPILED_RESUME_SIGNALS = {
+    name: [re.compile(pattern, re.IGNORECASE) for pattern in patterns] for name, patterns in RESUME_SIGNALS.items()
+}
+_COMPILED_NON_RESUME_SIGNALS = {
+    name: [re.compile(pattern, re.IGNORECASE) for pattern in patterns] for name, patterns in NON_RESUME_SIGNALS.items()
+}
+
+
+@dataclass(frozen=True)
+class PreClassification:
+    """The local verdict. `is_resume` is None when the document is ambiguous and the LLM should decide."""
+
+    is_resume: Optional[bool]
+    score: int
+    matched_signals: tuple[str, ...]
+    text_chars: int
+
+    @property
+    def reason(self) -> str:
+        signals = ", ".join(self.matched_signals) or "없음"
+        return f"텍스트 레이어 사전 분류 (점수 {self.score}, 일치한 신호: {signals})"
+
+
+def extract_text_layer(data: bytes, max_pages: int = MAX_PAGES) -> str:
+    """Extract the text layer of the first pages of a PDF. Returns an empty string if it cannot be read."""
+    from pypdf import PdfReader
+
+    try:
+        reader = PdfReader(io.BytesIO(data))
+        return "\n".join(page.extract_text() or "" for page in reader.pages[:max_pages])
+    except Exception as e:
+        logger.debug(f"Failed to extract the text layer: {str(e)}")
+        return ""
+
+
+def extract_document_features(data: bytes, max_text_pages: int = 6) -> Optional[DocumentFeatures]:
+    """Read the page count, text layer length and image count of a PDF without rendering it. Returns None if it cannot be read."""
+    from pypdf import PdfReader
+
+    try:
+        reader = PdfReader(io.BytesIO(data))
+        text_chars = sum(len((page.extract_text() or "").strip()) for page in reader.pages[:max_text_pages])
+        image_count = 0
+        for page in reader.pages:
+            # 이미지를 디코딩하지 않고 페이지 리소스의 이미지 XObject 수만 센다.
+            xobjects = (page.get("/Resources") or {}).get("/XObject") or {}
+            image_count += sum(1 for xobject in xobjects.values() if xobject.get_object().get("/Subtype") == "/Image")
+        return DocumentFeatures(page_count=len(reader.pages), text_chars=text_chars, image_count=image_count)
+    except Exception as e:
+        logger.debug(f"Failed to read the document features: {str(e)}")
+        return None
+
+
+def _matched(compiled_signals: dict[str, list[re.Pattern]], text: str) -> list[str]:
+    return [name for name, patterns in compiled_signals.items() if any(p.search(text) for p in patterns)]
+
+
+def classify_text(text: str, accept_score: int = 4, reject_score: int = 1) -> PreClassification:
+    """
+    Score the text against the resume signals.
+    score >= accept_score 이면 이력서, 충분한 텍스트가 있는데 score <= reject_score 이면 이력서가 아닌 것으로 판단한다.
+    """
+    text = text.strip()
+    if len(text) < MIN_TEXT_CHARS:
+        return PreClassification(is_resume=None, score=0, matched_signals=(), text_chars=len(text))
+
+    resume_signals = _matched(_COMPILED_RESUME_SIGNALS, text)
+    non_resume_signals = _matched(_COMPILED_NON_RESUME_SIGNALS, text)
+    score = sum(SIGNAL_WEIGHTS.get(name, 1) for name in resume_signals) - NON_RESUME_PENALTY * len(non_resume_signals)
+
+    if score >= accept_score:
+        is_resume = True
+    elif score <= reject_score:
+        is_resume = False
+    else:
+        is_resume = None
+    return PreClassification(
+        is_resume=is_resume,
+        score=score,
+        matched_signals=tuple(resume_signals + [f"-{name}" for name in non_resume_signals]),
+        text_chars=len(text),
+    )
+
+
+def pre_classify(data: bytes, accept_score: int = 4, reject_score: int = 1) -> PreClassification:
+    """Extract the text layer of the file and classify it."""
+    return classify_text(extract_text_layer(data), accept_score=accept_score, reject_score=reject_score)
+
+
+@dataclass
+class PreClassifierStats:
+    """Process-wide counters of the pre-classification stage."""
+
+    accepted: int = 0
+    rejected: int = 0
+    ambiguous: int = 0
+    pre_classify_seconds: float = 0.0
+    llm_calls: int = 0
+    llm_seconds: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, result: PreClassification, seconds: float) -> None:
+        with self._lock:
+            if result.is_resume is True:
+                self.accepted += 1
+            elif result.is_resume is False:
+                self.rejected += 1
+            else:
+                self.ambiguous += 1
+            self.pre_classify_seconds += seconds
+
+    def record_llm(self, seconds: float) -> None:
+        with self._lock:
+            self.llm_calls += 1
+            self.llm_seconds += seconds
+
+    def as_dict(self) -> dict[str, float]:
+        with self._lock:
+            total = self.accepted + self.rejected + self.ambiguous
+            # 거절로 판정한 문서도 LLM이 확인하므로, LLM 호출을 건너뛴 것은 수락한 문서뿐이다.
+            skipped = self.accepted
+            average_llm_seconds = self.llm_seconds / self.llm_calls if self.llm_calls else 0.0
+            return {
+                "accepted": self.accepted,
+                "rejected": self.rejected,
+                "ambiguous": self.ambiguous,
+                "skip_rate": round(skipped / total, 4) if total else 0.0,
+                "average_llm_seconds": round(average_llm_seconds, 3),
+                # 건너뛴 LLM 호출의 예상 시간에서 모든 사전 분류에 든 시간을 뺀 값.
+                "latency_saved_seconds": round(skipped * average_llm_seconds - self.pre_classify_seconds, 3),
+            }
+
+
+pre_classifier_stats = PreClassifierStats()
+
+
+def evaluate(
+    samples: Iterable[tuple[str, bool]],
+    accept_score: int = 4,
+    reject_score: int = 1,
+    llm_seconds: float = 3.0,
+) -> dict[str, float]:
+    """
+    Evaluate the classifier against labeled (text, is_resume) samples.
+    precision/recall은 "이력서" 판정 기준이며, 애매한 문서는 LLM이 판단하므로 recall 계산에서 놓친 것으로 센다.
+    `llm_seconds`는 건너뛴 is_resume 호출 하나의 예상 지연 시간이다. 거절 판정은 LLM이 확인하므로 절약 시간에 넣지 않는다.
+    """
+    total = true_positive = false_positive = false_negative = true_negative = ambiguous = 0
+    wrong_rejections = 0
+    elapsed = 0.0
+    for text, label in samples:
+        total += 1
+        started_at = time.perf_counter()
+        result = classify_text(text, accept_score=accept_score, reject_score=reject_score)
+        elapsed += time.perf_counter() - started_at
+        if result.is_resume is None:
+            ambiguous += 1
+            false_negative += label
+        elif result.is_resume:
+            true_positive += label
+            false_positive += not label
+        else:
+            true_negative += not label
+            false_negative += label
+            wrong_rejections += label
+
+    decided = total - ambiguous
+    return {
+        "samples": total,
+        "decided": decided,
+        "coverage": round(decided / total, 4) if total else 0.0,
+        "precision": round(true_positive / (true_positive + false_positive), 4) if true_positive + false_positive else 1.0,
+        "recall": round(true_positive / (true_positive + false_negative), 4) if true_positive + false_negative else 1.0,
+        "rejection_precision": round(true_negative / (true_negative + wrong_rejections), 4) if true_negative + wrong_rejections else 1.0,
+        "latency_saved_seconds": round((true_positive + false_positive) * llm_seconds - elapsed, 3),
+    }
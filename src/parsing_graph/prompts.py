@@ -32,4 +32,28 @@ IS_RESUME_SYSTEM_PROMPT = """
 - 수행한 프로젝트(Project) 경험 및 구체적인 역할과 성과
 - 보유 기술 스택(Skills)
 - 프로젝트 아키텍처 다이어그램, 서비스 화면 캡처, 성능 테스트 결과 그래프 등 시각 자료
-"""
\ No newline at end of file
+"""
+REPAIR_SYSTEM_PROMPT = """You repair structured output that failed JSON schema validation.
+You are given the JSON schema, the raw output of another model, and the validation errors.
+
+INSTRUCTIONS:
+- Return the same content as the raw output, fixed so that it conforms to the schema.
+- Fix only what the validation errors point at: broken JSON syntax, truncated brackets, wrong types, invalid enum values, wrong date formats (YYYY-MM).
+- Do not add any information that is not present in the raw output. If a required value cannot be recovered, drop the object that contains it.
+- Keep the language of the text values as they are.
+"""
+
+PARSE_INSTRUCTION = "Please parse the attached resume PDF and extract the information based on the `ResumeParseResult` schema."
+
+# page_windows 전략의 구간별 지시문. `{label}`은 "pages 1-8 of 20" 형태다.
+PAGE_WINDOW_INSTRUCTION = (
+    PARSE_INSTRUCTION + " The attached PDF contains {label} of a longer document. "
+    "Extract only the experiences that appear in these pages."
+)
+
+# schema_split 전략의 하위 호출 지시문 (설정 필드 접두사 -> 지시문)
+SCHEMA_SPLIT_INSTRUCTIONS = {
+    "profile": "Extract only the candidate profile (`CandidateProfile`) from the attached resume PDF.",
+    "career": "Extract only the professional work experiences (`career_experiences`) from the attached resume PDF.",
+    "project": "Extract only the independent project experiences (`project_experiences`) from the attached resume PDF.",
+}
@@ -0,0 +1,217 @@
+"""
+Resume file helpers.
+
+`ParsingState.resume_file_path`는 Supabase Storage의 signed URL 또는 data URI이다.
+그래프 입력은 공개되어 있으므로 로컬 경로나 다른 호스트의 URL은 읽지 않는다. 로컬 파일은 호출하는 쪽(예: 배치 CLI)에서 data URI로 바꿔 넘긴다.
+파일은 실행마다 `fetch_resume_file` 단계에서 한 번만 내려받아 프로세스 내 저장소에 해시로 보관하고,
+이후의 캐시 조회, 사전 분류, LLM 호출과 재시도는 모두 저장된 바이트(data URI)를 재사용한다.
+"""
+import asyncio
+import base64
+import hashlib
+import mimetypes
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from constants import supabase
+from parsing_graph import supabase_utils
+
+DOWNLOAD_TIMEOUT_SECONDS = 30
+CHUNK_SIZE = 64 * 1024
+# Gemini의 inline 데이터 한도(요청당 20MB)를 넘는 파일은 어차피 보낼 수 없으므로 내려받지 않는다.
+MAX_RESUME_FILE_BYTES = int(os.getenv("MAX_RESUME_FILE_BYTES", 20 * 1024 * 1024))
+RESUME_FILE_STORE_MAX_BYTES = int(os.getenv("RESUME_FILE_STORE_MAX_BYTES", 256 * 1024 * 1024))
+SIGNED_URL_PATH = "/storage/v1/object/sign/"
+
+# httpx.AsyncClient의 커넥션 풀은 이벤트 루프에 묶이므로 루프마다 하나씩 공유한다.
+_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the pooled HTTP client of the running event loop."""
+    loop = asyncio.get_running_loop()
+    http_client = _http_clients.get(loop)
+    if http_client is None or http_client.is_closed:
+        http_client = httpx.AsyncClient(
+            timeout=DOWNLOAD_TIMEOUT_SECONDS,
+            # 리다이렉트를 따라가면 허용한 호스트 밖으로 요청이 나갈 수 있다.
+            follow_redirects=False,
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+        )
+        _http_clients[loop] = http_client
+    return http_client
+
+
+def _too_large(size: int, max_bytes: int) -> supabase_utils.FileDownloadError:
+    return supabase_utils.FileDownloadError(f"Resume file is larger than {max_bytes} bytes ({size} bytes).")
+
+
+async def _aiter_http_chunks(url: str, max_bytes: int) -> AsyncIterator[bytes]:
+    try:
+        async with get_http_client().stream("GET", url) as response:
+            if response.status_code == 404:
+                raise supabase_utils.FileNotFoundError(f"Resume file not found: HTTP {response.status_code}")
+            if response.status_code in (400, 401, 403):
+                # Supabase는 만료되었거나 잘못된 signed URL에 400/401/403을 반환한다.
+                raise supabase_utils.FileAccessError(f"Resume file is not accessible: HTTP {response.status_code}")
+            if response.status_code >= 300:
+                raise supabase_utils.FileDownloadError(f"Resume file download failed: HTTP {response.status_code}")
+            content_length = int(response.headers.get("content-length") or 0)
+            if content_length > max_bytes:
+                raise _too_large(content_length, max_bytes)
+            received = 0
+            async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                received += len(chunk)
+                if received > max_bytes:
+                    raise _too_large(received, max_bytes)
+                yield chunk
+    except httpx.HTTPError as e:
+        raise supabase_utils.FileDownloadError(f"Resume file download failed: {str(e)}") from e
+
+
+def is_signed_storage_url(resume_file_path: str) -> bool:
+    """Whether the path is a signed URL of the configured Supabase Storage (`SUPABASE_URL`)."""
+    storage = urlsplit(supabase.supabase_url or "")
+    url = urlsplit(resume_file_path)
+    if not storage.netloc or (url.scheme, url.netloc) != (storage.scheme, storage.netloc):
+        return False
+    return url.path.startswith(storage.path.rstrip("/") + SIGNED_URL_PATH)
+
+
+async def aiter_resume_file_chunks(resume_file_path: str, max_bytes: int = MAX_RESUME_FILE_BYTES) -> AsyncIterator[bytes]:
+    """Stream the resume file in chunks from a Supabase Storage signed URL or a data URI."""
+    if resume_file_path.startswith("data:"):
+        _, encoded = resume_file_path.split(",", 1)
+        data = base64.b64decode(encoded)
+        if len(data) > max_bytes:
+            raise _too_large(len(data), max_bytes)
+        yield data
+    elif is_signed_storage_url(resume_file_path):
+        async for chunk in _aiter_http_chunks(resume_file_path, max_bytes):
+            yield chunk
+    else:
+        raise supabase_utils.FileAccessError("Resume file path must be a Supabase Storage signed URL or a data URI.")
+
+
+async def ahash_resume_file(resume_file_path: str) -> str:
+    """Return the sha256 hex digest of the resume file bytes."""
+    digest = hashlib.sha256()
+    async for chunk in aiter_resume_file_chunks(resume_file_path):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _guess_mime_type(resume_file_path: str) -> str:
+    if resume_file_path.startswith("data:"):
+        return resume_file_path[len("data:"):].split(";", 1)[0] or "application/pdf"
+    path = resume_file_path.split("?", 1)[0]
+    return mimetypes.guess_type(path)[0] or "application/pdf"
+
+
+@dataclass(frozen=True)
+class ResumeFile:
+    # 원본 파일의 해시. 경량화된 파일도 원본의 해시를 유지한다.
+    sha256: str
+    data: bytes
+    mime_type: str = "application/pdf"
+    # 원본에서 만든 변형(예: 경량화 설정)의 식별자. 원본은 빈 문자열이다.
+    variant: str = ""
+
+    @property
+    def key(self) -> str:
+        """The store key: the original hash, plus the variant for derived copies."""
+        return f"{self.sha256}:{self.variant}" if self.variant else self.sha256
+
+
+class ResumeFileStore:
+    """
+    Process-local, size-bounded LRU of resume files keyed by `ResumeFile.key`.
+    Entries are never modified in place: a derived copy (e.g. a slimmed PDF) is a separate entry under its own key,
+    so concurrent runs of the same file with different settings never see each other's bytes.
+    """
+
+    def __init__(self, max_bytes: int = RESUME_FILE_STORE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._files: OrderedDict[str, ResumeFile] = OrderedDict()
+        self._data_uris: dict[str, str] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def put(self, resume_file: ResumeFile) -> None:
+        key = resume_file.key
+        with self._lock:
+            if key in self._files:
+                self._files.move_to_end(key)
+                return
+            self._files[key] = resume_file
+            self._size += len(resume_file.data)
+            while self._size > self.max_bytes and len(self._files) > 1:
+                evicted_key, evicted = self._files.popitem(last=False)
+                self._data_uris.pop(evicted_key, None)
+                self._size -= len(evicted.data)
+
+    def get(self, key: Optional[str]) -> Optional[ResumeFile]:
+        with self._lock:
+            resume_file = self._files.get(key) if key else None
+            if resume_file is not None:
+                self._files.move_to_end(key)
+            return resume_file
+
+    def data_uri(self, resume_file: ResumeFile) -> str:
+        # base64 인코딩은 파일당 한 번만 한다. 재시도와 여러 LLM 호출이 같은 문자열을 공유한다.
+        key = resume_file.key
+        with self._lock:
+            data_uri = self._data_uris.get(key)
+        if data_uri is None:
+            data_uri = to_data_uri_from_bytes(resume_file.data, resume_file.mime_type)
+            with self._lock:
+                if key in self._files:
+                    self._data_uris[key] = data_uri
+        return data_uri
+
+
+resume_file_store = ResumeFileStore()
+
+
+async def afetch_resume_file(resume_file_path: str, max_bytes: int = MAX_RESUME_FILE_BYTES) -> ResumeFile:
+    """Download the resume file once and keep its bytes in the process-local store."""
+    digest = hashlib.sha256()
+    chunks = []
+    async for chunk in aiter_resume_file_chunks(resume_file_path, max_bytes):
+        digest.update(chunk)
+        chunks.append(chunk)
+    resume_file = ResumeFile(sha256=digest.hexdigest(), data=b"".join(chunks), mime_type=_guess_mime_type(resume_file_path))
+    resume_file_store.put(resume_file)
+    return resume_file
+
+
+async def aget_resume_file(resume_file_path: str, key: Optional[str]) -> ResumeFile:
+    """
+    Return the stored file of this run, downloading it again only if it was evicted from the store.
+    An evicted derived copy falls back to the original file.
+    """
+    return resume_file_store.get(key) or await afetch_resume_file(resume_file_path)
+
+
+async def aget_resume_data_uri(resume_file_path: str, key: Optional[str]) -> str:
+    """Return the data URI that LLM calls send in place of the signed URL."""
+    return resume_file_store.data_uri(await aget_resume_file(resume_file_path, key))
+
+
+def to_data_uri_from_bytes(data: bytes, mime_type: str = "application/pdf") -> str:
+    """Encode file bytes into a data URI that multimodal models accept in place of a URL."""
+    return f"data:{mime_type};base64,{base64.b64encode(data).decode('ascii')}"
+
+
+def to_data_uri(local_file_path: str) -> str:
+    """Read a local file into a data URI that multimodal models accept in place of a URL."""
+    mime_type = mimetypes.guess_type(local_file_path)[0] or "application/pdf"
+    with open(local_file_path, "rb") as f:
+        return to_data_uri_from_bytes(f.read(), mime_type)
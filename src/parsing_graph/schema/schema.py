@@ -50,3 +50,11 @@ class ResumeParseResult(BaseModel):
     career_experiences: list[CareerExperience] = Field(default=[], description="Professional work experiences at companies including full-time, part-time, contract, and internship positions")
     project_experiences: list[ProjectExperience] = Field(default=[], description="Independent project experience including personal projects, team projects, open source contributions, and academic projects that are NOT part of regular employment")
 
+
+class CareerExperiences(BaseModel):
+    """The career part of `ResumeParseResult`, extracted on its own in the schema-split parse strategy."""
+    career_experiences: list[CareerExperience] = Field(default=[], description="Professional work experiences at companies including full-time, part-time, contract, and internship positions")
+
+class ProjectExperiences(BaseModel):
+    """The project part of `ResumeParseResult`, extracted on its own in the schema-split parse strategy."""
+    project_experiences: list[ProjectExperience] = Field(default=[], description="Independent project experience including personal projects, team projects, open source contributions, and academic projects that are NOT part of regular employment")
@@ -0,0 +1,44 @@
+"""
+Speculative parsing metrics.
+
+speculative 모드에서는 `is_resume`과 `parse_resume`을 동시에 실행한다.
+이력서로 판정되면 순차 실행 대비 wall-clock 시간을 절약하고, 아니면 진행 중이던 parse 호출을 취소(낭비)한다.
+이 모듈은 그 trade-off를 판단할 수 있도록 프로세스 단위로 누적 지표를 기록한다.
+"""
+import threading
+from dataclasses import dataclass, field
+
+
+@dataclass
+class SpeculationStats:
+    """Process-wide counters of the speculative parse mode."""
+
+    committed_parses: int = 0
+    wasted_parses: int = 0
+    time_saved_seconds: float = 0.0
+    wasted_parse_seconds: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record_committed(self, saved_seconds: float) -> None:
+        with self._lock:
+            self.committed_parses += 1
+            self.time_saved_seconds += max(saved_seconds, 0.0)
+
+    def record_wasted(self, seconds: float) -> None:
+        with self._lock:
+            self.wasted_parses += 1
+            self.wasted_parse_seconds += seconds
+
+    def as_dict(self) -> dict[str, float]:
+        with self._lock:
+            total = self.committed_parses + self.wasted_parses
+            return {
+                "committed_parses": self.committed_parses,
+                "wasted_parses": self.wasted_parses,
+                "waste_rate": round(self.wasted_parses / total, 4) if total else 0.0,
+                "time_saved_seconds": round(self.time_saved_seconds, 3),
+                "wasted_parse_seconds": round(self.wasted_parse_seconds, 3),
+            }
+
+
+speculation_stats = SpeculationStats()
@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Any, Optional
 from parsing_graph.schema.schema import ResumeParseResult
 from parsing_graph.schema.is_resume import IsResumeResult
 from langchain_core.documents import Document
@@ -33,6 +33,28 @@ class ParsingState:
         metadata={"description": "Supabase Storage 내 파일 경로"},
     )
 
+    resume_file_hash: Optional[str] = field(
+        default=None,
+        metadata={"description": "The sha256 of the downloaded resume file. Its bytes are kept in the process-local resume file store."},
+    )
+    model_file_key: Optional[str] = field(
+        default=None,
+        metadata={
+            "description": "The resume file store key of the bytes sent to the models: the slimmed copy when slimming saved bytes. "
+            "None sends the original file."
+        },
+    )
+
+    parse_cache_key: Optional[str] = field(
+        default=None,
+        metadata={"description": "The content-addressed parse cache key of the resume file."},
+    )
+
+    parse_cache_hit: bool = field(
+        default=False,
+        metadata={"description": "Whether the parsed result was loaded from the parse cache."},
+    )
+
     is_resume_result: Optional[IsResumeResult] = field(
         default=None,
         metadata={"description": "The result of checking if the document is a resume."},
@@ -47,10 +69,20 @@ class ParsingState:
         metadata={"description": "The parsed resume converted to documents."},
     )
     
+    index_generation: Optional[int] = field(
+        default=None,
+        metadata={"description": "The index generation that streamed items were written to before the parse finished."},
+    )
+
     error: Optional[str] = field(
         default=None, metadata={"description": "Any error that occurred during parsing."}
     )
 
+    partial_parse_results: dict[str, Any] = field(
+        default_factory=dict,
+        metadata={"description": "The sub-results that already succeeded in the schema-split parse strategy, reused on retry."},
+    )
+
     parse_retry_count: int = field(
         default=0, metadata={"description": "The number of parsing attempts."}
     )
@@ -0,0 +1,69 @@
+"""
+Streaming parse helpers.
+
+스트리밍 모드에서는 파싱 모델의 JSON 출력을 토큰 단위로 받으면서, `career_experiences`/`project_experiences`의
+각 항목이 완성되는 즉시 꺼내어 문서 변환과 임베딩을 시작한다. 나머지 생성과 인덱싱이 겹쳐서 진행된다.
+"""
+from typing import Any, Optional, Type
+
+from langchain_core.utils.json import parse_partial_json
+from pydantic import ValidationError
+
+from parsing_graph.schema.schema import BaseExperience, CareerExperience, CandidateProfile, ProjectExperience
+
+ITEM_SCHEMAS: dict[str, Type[BaseExperience]] = {
+    "career_experiences": CareerExperience,
+    "project_experiences": ProjectExperience,
+}
+
+
+class StreamingParseExtractor:
+    """
+    Finds the experiences whose JSON is complete in a growing `ResumeParseResult` JSON text.
+    목록의 마지막 항목은 아직 생성 중일 수 있으므로, 뒤에 다른 항목이나 다른 키가 나온 뒤에야 완성된 것으로 본다.
+    """
+
+    def __init__(self):
+        self.emitted = {key: 0 for key in ITEM_SCHEMAS}
+        self.candidate_profile: Optional[CandidateProfile] = None
+
+    def feed(self, text: str, final: bool = False) -> list[tuple[str, int, BaseExperience]]:
+        """Return the (key, index, item) of the items completed since the last call."""
+        try:
+            partial = parse_partial_json(text)
+        except Exception:
+            return []
+        if not isinstance(partial, dict):
+            return []
+
+        keys = list(partial)
+        completed_keys = set(keys if final else keys[:-1])
+        if self.candidate_profile is None and "candidate_profile" in completed_keys:
+            self.candidate_profile = _validate(CandidateProfile, partial["candidate_profile"])
+
+        completed = []
+        for key, schema in ITEM_SCHEMAS.items():
+            items = partial.get(key)
+            if not isinstance(items, list):
+                continue
+            complete_count = len(items) if key in completed_keys else len(items) - 1
+            for index in range(self.emitted[key], complete_count):
+                item = _validate(schema, items[index])
+                if item is not None:
+                    completed.append((key, index, item))
+            self.emitted[key] = max(self.emitted[key], complete_count)
+        return completed
+
+
+def _validate(schema: Type[Any], value: Any) -> Optional[Any]:
+    # 스키마에 맞지 않는 항목은 미리 인덱싱하지 않는다. 최종 결과의 검증/수리 단계에서 처리된다.
+    try:
+        return schema.model_validate(value)
+    except ValidationError:
+        return None
+
+
+def item_title(item: BaseExperience) -> str:
+    if isinstance(item, CareerExperience):
+        return item.company
+    return item.project_name
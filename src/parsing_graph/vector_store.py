@@ -1,17 +1,39 @@
 from constants.vector_store import (
-    client,
-    embeddings,
-    apply_docs_vector_store,
+    get_client,
+    get_async_client,
+    get_embeddings,
+    embedding_cache_stats,
+    get_apply_docs_vector_store,
     delete_docs_by,
+    adelete_docs_by,
+    aadd_documents,
+    aget_current_generation,
+    aset_current_generation,
+    astage_documents,
+    aunstage_documents_except,
+    document_point_id,
+    anew_generation,
+    schedule_generation_gc,
     get_filter_condition,
-    apply_docs_collection_name,
+    get_apply_docs_collection_name,
 )
 
 __all__ = [
-    "client",
-    "embeddings",
-    "apply_docs_vector_store",
+    "get_client",
+    "get_async_client",
+    "get_embeddings",
+    "embedding_cache_stats",
+    "get_apply_docs_vector_store",
     "delete_docs_by",
+    "adelete_docs_by",
+    "aadd_documents",
+    "aget_current_generation",
+    "aset_current_generation",
+    "astage_documents",
+    "aunstage_documents_except",
+    "document_point_id",
+    "anew_generation",
+    "schedule_generation_gc",
     "get_filter_condition",
-    "apply_docs_collection_name",
+    "get_apply_docs_collection_name",
 ]
@@ -0,0 +1,95 @@
+"""
+Batch problem generation.
+
+`problem_gen_graph`를 배치 모드(`all_experiences` 또는 `experience_ids`)로 한 번 실행해 한 사용자의 모든 경험에 대한 문제를 생성한다.
+`--compare`를 주면 경험마다 그래프를 한 번씩 실행하는 기존 방식(프론트엔드의 경험별 루프)도 실행해 사용자당 지연 시간을 비교한다.
+공정한 비교를 위해 두 실행 모두 문제 캐시를 끈다.
+
+Usage:
+    python -m problem_gen.batch <user_id> [--experience-id ID ...] [--max-concurrency 6] [--compare]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Optional
+
+from constants.vector_store import aget_user_apply_docs
+from problem_gen.graph import problem_gen_graph
+from problem_gen.state import Document_with_Id
+
+logger = logging.getLogger(__name__)
+
+
+async def run_batch(user_id: str, experience_ids: Optional[list[str]] = None, configurable: Optional[dict[str, Any]] = None) -> dict[str, Any]:
+    """Generate the problems of all (or the given) experiences of the user in one graph run."""
+    started_at = time.perf_counter()
+    result = await problem_gen_graph.ainvoke(
+        {"user_id": user_id, "experience_ids": experience_ids or [], "all_experiences": not experience_ids},
+        {"configurable": configurable or {}},
+    )
+    return {**result["batch_report"], "wall_seconds": round(time.perf_counter() - started_at, 2)}
+
+
+async def run_per_experience(user_id: str, experience_ids: Optional[list[str]] = None, configurable: Optional[dict[str, Any]] = None) -> dict[str, Any]:
+    """Generate the problems with one graph run per experience, one after another, like the frontend does."""
+    docs = await aget_user_apply_docs(user_id)
+    profile_id = next(doc.id for doc in docs if doc.metadata.get("apply_doc_type") == "candidate_profile")
+    experience_ids = experience_ids or [doc.id for doc in docs if "experience" in doc.metadata.get("apply_doc_type", "")]
+
+    started_at = time.perf_counter()
+    seconds_per_run = []
+    for experience_id in experience_ids:
+        run_started_at = time.perf_counter()
+        await problem_gen_graph.ainvoke(
+            {
+                "user_id": user_id,
+                "candidate_profile": Document_with_Id(id=profile_id, page_content="", metadata={}),
+                "experience": Document_with_Id(id=experience_id, page_content="", metadata={}),
+            },
+            {"configurable": configurable or {}},
+        )
+        seconds_per_run.append(time.perf_counter() - run_started_at)
+    seconds = time.perf_counter() - started_at
+    return {
+        "user_id": user_id,
+        "experiences": len(experience_ids),
+        "seconds": round(seconds, 2),
+        "seconds_per_experience": round(seconds / len(experience_ids), 2),
+        "slowest_run_seconds": round(max(seconds_per_run), 2),
+    }
+
+
+def _parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate problems for all experiences of a user in one problem_gen_graph run.")
+    parser.add_argument("user_id")
+    parser.add_argument("--experience-id", dest="experience_ids", action="append", default=None, help="Limit the run to these experiences.")
+    parser.add_argument("--max-concurrency", type=int, default=None, help="batch_max_concurrency of the run.")
+    parser.add_argument("--configurable", type=json.loads, default={}, help="JSON object of ConfigSchema overrides.")
+    parser.add_argument("--compare", action="store_true", help="Also run the per-experience loop and compare the latency.")
+    return parser.parse_args(argv)
+
+
+async def _amain(args: argparse.Namespace) -> dict[str, Any]:
+    configurable = dict(args.configurable)
+    if args.max_concurrency:
+        configurable["batch_max_concurrency"] = args.max_concurrency
+    if args.compare:
+        configurable["problem_cache_enabled"] = False
+
+    report: dict[str, Any] = {"batch": await run_batch(args.user_id, args.experience_ids, configurable)}
+    if args.compare:
+        report["per_experience"] = await run_per_experience(args.user_id, args.experience_ids, configurable)
+        report["speedup"] = round(report["per_experience"]["seconds"] / report["batch"]["wall_seconds"], 2)
+    return report
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    report = asyncio.run(_amain(_parse_args(argv)))
+    print(json.dumps(report, ensure_ascii=False, indent=2))  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
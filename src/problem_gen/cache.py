@@ -0,0 +1,115 @@
+"""
+Problem-set cache.
+
+경험 내용, 프롬프트, 모델이 지난 실행과 같으면 `problem_gen`은 LLM을 호출하지 않고 저장된 `Problem_Contents`를 재사용한다.
+캐시 키는 문제 유형 + 완성된 시스템 프롬프트(경험 `page_content`와 지원자 정보가 들어간 BASE_SYSTEM_PROMPT + 유형별 프롬프트)의 해시
++ 모델/temperature + `API_VERSION`으로 만들어지므로, 이 중 하나라도 바뀌면 자동으로 무효화된다.
+단일 호출 모드(`problem_gen_mode="single_call"`)의 `Problem_Set`은 유형 "all_types"로 같은 캐시에 저장된다.
+결과는 실제로 생성한 모델의 키로 저장되므로, 대체 모델이 만든 문제는 첫 모델의 결과로 재사용되지 않는다.
+캐시를 쓰면 같은 경험을 다시 생성해도 TTL 동안 같은 문제가 반환되므로 `problem_cache_enabled`로 켜야 한다(기본값 꺼짐).
+"""
+import json
+import logging
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Optional
+
+from pydantic import BaseModel
+
+from constants.cache import CacheBackend, CacheBackendKind, create_cache_backend, sha256_hex
+from constants.metadata import API_VERSION
+from problem_gen.schema import Problem_Contents
+
+logger = logging.getLogger(__name__)
+
+PROBLEM_CACHE_NAMESPACE = "problem_cache"
+
+
+def build_problem_cache_key(problem_type: str, system_prompt: str, user_prompt: str, model: str, temperature: float) -> str:
+    """Build the cache key from every input that affects the generated problems."""
+    key_parts = {
+        "problem_type": problem_type,
+        "system_prompt_sha256": sha256_hex(system_prompt),
+        "user_prompt_sha256": sha256_hex(user_prompt),
+        "model": model,
+        "temperature": temperature,
+        "api_version": API_VERSION,
+    }
+    return sha256_hex(json.dumps(key_parts, sort_keys=True))
+
+
+@dataclass
+class ProblemCacheStats:
+    """Hit/miss counters per problem type."""
+
+    hits: Counter = field(default_factory=Counter)
+    misses: Counter = field(default_factory=Counter)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, problem_type: str, hit: bool) -> None:
+        with self._lock:
+            (self.hits if hit else self.misses)[problem_type] += 1
+
+    def as_dict(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            problem_types = sorted(set(self.hits) | set(self.misses))
+            return {
+                problem_type: {
+                    "hits": self.hits[problem_type],
+                    "misses": self.misses[problem_type],
+                    "hit_rate": round(self.hits[problem_type] / (self.hits[problem_type] + self.misses[problem_type]), 4),
+                }
+                for problem_type in problem_types
+            }
+
+
+class ProblemCache:
+    """Stores `Problem_Contents` objects as JSON in a cache backend."""
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self.type_stats = ProblemCacheStats()
+
+    def get(self, key: str, problem_type: str, schema: type[BaseModel] = Problem_Contents) -> Optional[BaseModel]:
+        raw = self.backend.get(key)
+        problem_contents = None
+        if raw is not None:
+            try:
+                problem_contents = schema.model_validate_json(raw)
+            except ValueError:
+                # 스키마가 바뀌어 더 이상 읽을 수 없는 엔트리는 버린다.
+                logger.warning(f"Dropping unreadable problem cache entry: {key}")
+                self.backend.delete(key)
+        self.type_stats.record(problem_type, hit=problem_contents is not None)
+        return problem_contents
+
+    def put(self, key: str, problem_contents: BaseModel) -> None:
+        self.backend.set(key, problem_contents.model_dump_json().encode("utf-8"))
+
+    def stats(self) -> dict:
+        return {**self.backend.stats.as_dict(), "bytes": self.backend.size_bytes(), "by_problem_type": self.type_stats.as_dict()}
+
+
+_problem_caches: dict[tuple, ProblemCache] = {}
+_problem_caches_lock = threading.Lock()
+
+
+def get_problem_cache(
+    backend: CacheBackendKind = "sqlite",
+    ttl_seconds: Optional[float] = None,
+    max_entries: Optional[int] = None,
+) -> ProblemCache:
+    """Return the process-wide problem cache for the given backend settings."""
+    cache_key = (backend, ttl_seconds, max_entries)
+    with _problem_caches_lock:
+        if cache_key not in _problem_caches:
+            _problem_caches[cache_key] = ProblemCache(
+                create_cache_backend(
+                    backend,
+                    PROBLEM_CACHE_NAMESPACE,
+                    ttl_seconds=ttl_seconds,
+                    max_entries=max_entries,
+                )
+            )
+        return _problem_caches[cache_key]
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field, fields
-from typing import Annotated, Optional, Type, TypeVar
+from typing import Annotated, Literal, Optional, Type, TypeVar
 
 from langchain_core.runnables import RunnableConfig, ensure_config
 from langgraph.config import get_config
 
+from constants.fallback import Backoff
+from constants.hedging import HedgeConfig
 from problem_gen.prompts import EXPERIENCE_PROBLEM_GEN_SYSTEM_PROMPT, TECH_PROBLEM_GEN_SYSTEM_PROMPT, COWORK_PROBLEM_GEN_SYSTEM_PROMPT, BASE_SYSTEM_PROMPT
     
 
@@ -37,6 +39,22 @@ class ConfigSchema:
         },
     )
 
+    problem_gen_mode: Literal["per_type", "single_call"] = field(
+        default="per_type",
+        metadata={
+            "description": "per_type: 문제 유형마다 별도의 호출을 병렬로 실행. "
+            "single_call: 이력서 토큰을 한 번만 보내도록 한 번의 호출로 모든 유형의 문제를 생성 (Problem_Set 스키마)"
+        },
+    )
+
+    single_call_problem_gen_model: Annotated[str, {"__template_metadata__": {"kind": "llm"}}] = field(
+        default='google_genai:gemini-2.5-flash',
+        metadata={
+            "description": "single_call 모드에서 모든 유형의 문제를 한 번에 생성할 때 사용되는 모델"
+            "Should be in the form = provider:model-name."
+        },
+    )
+
     base_system_prompt: str = field(
         default=BASE_SYSTEM_PROMPT,
         metadata={
@@ -86,6 +104,122 @@ class ConfigSchema:
         },
     )
 
+    batch_max_concurrency: int = field(
+        default=6,
+        metadata={
+            "description": "한 지원자에 대해 동시에 실행되는 problem_gen 워커의 최대 수 (배치 모드는 경험 수 x 문제 유형 수만큼 워커를 보냄)"
+        },
+    )
+
+    problem_cache_enabled: bool = field(
+        default=False,
+        metadata={
+            "description": "경험 내용, 프롬프트, 모델이 지난 실행과 같으면 LLM을 호출하지 않고 저장된 문제를 재사용. "
+            "켜면 같은 경험을 다시 생성해도 problem_cache_ttl_seconds 동안 같은 문제가 반환됨"
+        },
+    )
+
+    problem_cache_backend: Literal["sqlite", "filesystem"] = field(
+        default="sqlite",
+        metadata={
+            "description": "문제 캐시의 로컬 백엔드"
+        },
+    )
+
+    problem_cache_ttl_seconds: int = field(
+        default=30 * 24 * 60 * 60,
+        metadata={
+            "description": "문제 캐시 엔트리의 유효 기간(초)"
+        },
+    )
+
+    problem_cache_max_entries: int = field(
+        default=10_000,
+        metadata={
+            "description": "문제 캐시의 최대 엔트리 수. 가장 오래 사용되지 않은 엔트리부터 지움"
+        },
+    )
+
+    context_cache_enabled: bool = field(
+        default=False,
+        metadata={
+            "description": "유형별 워커가 공유하는 <resume> prefix(BASE_SYSTEM_PROMPT)를 provider context cache에 한 번 올리고, 각 워커는 캐시를 참조. "
+            "Gemini 모델에만 적용되며, context_cache_min_tokens보다 짧은 prefix는 캐시하지 않음"
+        },
+    )
+
+    context_cache_backend: Literal["gemini", "local"] = field(
+        default="gemini",
+        metadata={
+            "description": "gemini: Gemini API의 context cache. local: 테스트용 메모리 대역"
+        },
+    )
+
+    context_cache_ttl_seconds: int = field(
+        default=600,
+        metadata={
+            "description": "context cache의 유효 기간(초). 같은 경험의 재실행이 이 시간 안에 오면 캐시를 재사용"
+        },
+    )
+
+    context_cache_min_tokens: int = field(
+        default=1024,
+        metadata={
+            "description": "context cache에 올리는 prefix의 최소 토큰 수 (provider의 최소 캐시 크기)"
+        },
+    )
+
+    problem_gen_fallback_models: list[str] = field(
+        default_factory=list,
+        metadata={
+            "description": "문제 생성 모델이 실패하거나(할당량, timeout 등) 회로가 열려 있을 때 순서대로 사용하는 대체 모델 목록"
+            "Should be in the form = provider:model-name."
+        },
+    )
+
+    fallback_backoff_base_seconds: float = field(
+        default=1.0,
+        metadata={
+            "description": "대체 모델까지 모두 실패했을 때 다시 시도하기 전 지수 백오프(jitter 포함)의 기본 대기 시간"
+        },
+    )
+
+    fallback_max_rounds: int = field(
+        default=2,
+        metadata={
+            "description": "대체 모델 목록 전체를 시도하는 최대 횟수"
+        },
+    )
+
+    hedge_enabled: bool = field(
+        default=False,
+        metadata={
+            "description": "문제 생성 호출이 최근 호출의 hedge_percentile보다 오래 걸리면 같은 요청을 한 번 더 보내고, 먼저 끝난 결과를 사용"
+        },
+    )
+
+    hedge_percentile: float = field(
+        default=0.95,
+        metadata={
+            "description": "hedge 요청을 보내는 기준이 되는 최근 지연 시간의 백분위"
+        },
+    )
+
+    hedge_max_extra_load: float = field(
+        default=0.1,
+        metadata={
+            "description": "전체 호출 대비 hedge 요청의 최대 비율 (0.1이면 요청이 최대 약 10% 늘어남)"
+        },
+    )
+
+    hedge_model: Optional[str] = field(
+        default=None,
+        metadata={
+            "description": "hedge 요청에 사용되는 모델. 없으면 원래 호출과 같은 모델을 사용"
+            "Should be in the form = provider:model-name."
+        },
+    )
+
     @classmethod
     def from_runnable_config(cls: Type[T], config: Optional[RunnableConfig] = None) -> T:
         """Create a Configuration instance from a RunnableConfig object."""
@@ -97,6 +231,14 @@ class ConfigSchema:
         configurable = config.get("configurable") or {}
         _fields = {f.name for f in fields(cls) if f.init}
         return cls(**{k: v for k, v in configurable.items() if k in _fields})
+
+    def backoff(self) -> Backoff:
+        return Backoff(base_seconds=self.fallback_backoff_base_seconds, max_rounds=self.fallback_max_rounds)
+
+    def hedge_config(self) -> Optional[HedgeConfig]:
+        if not self.hedge_enabled:
+            return None
+        return HedgeConfig(percentile=self.hedge_percentile, max_extra_load=self.hedge_max_extra_load)
     
 
 T = TypeVar("T", bound=ConfigSchema)
\ No newline at end of file
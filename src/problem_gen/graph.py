@@ -1,28 +1,89 @@
 
+import asyncio
 import langsmith
 import logging
+import threading
+import time
+import weakref
 from typing import Dict, Any
 from uuid import uuid4
 from langgraph.graph import END, StateGraph, START
 from langgraph.types import Send
 from langchain_core.runnables import RunnableConfig
 from langchain_core.documents import Document
-from langchain.chat_models import init_chat_model
 from langchain_core.messages import SystemMessage, HumanMessage
-from problem_gen.schema import Problem_Contents
-from problem_gen.state import ProblemGenState, Problem_Type, Problems
+from pydantic import BaseModel
+from problem_gen.prompts import MULTI_TYPE_PROBLEM_GEN_SYSTEM_PROMPT
+from problem_gen.schema import Problem_Contents, Problem_Set
+from problem_gen.state import PROBLEM_TYPES, Document_with_Id, ProblemGenState, Problem_Type, Problems
+from problem_gen.cache import build_problem_cache_key, get_problem_cache
 from problem_gen.config import ConfigSchema
-from constants.vector_store import personalized_problems_vector_store, apply_docs_vector_store, delete_docs_by, personalized_problems_collection_name
+from constants.context_cache import get_context_cache
+from constants.fallback import afallback, model_chain, quota_retries_for
+from constants.llm_invoke import ainvoke_llm
+from constants.llm_registry import ModelSpec, get_structured_model
+from constants.vector_store import aadd_documents, adelete_docs_by_any, aget_docs_by_ids, aget_user_apply_docs, get_apply_docs_collection_name, get_personalized_problems_collection_name
 
 # Loggers are hierarchical, so setting the log level on "langsmith" will
 # set it on all modules inside the "langsmith" package
 langsmith_logger = logging.getLogger("langsmith")
 langsmith_logger.setLevel(level=logging.DEBUG)
 
-def load_documents(state: ProblemGenState, config: RunnableConfig) -> Dict[str, Any]:
+def _get_problem_cache(configuration: ConfigSchema):
+    return get_problem_cache(
+        backend=configuration.problem_cache_backend,
+        ttl_seconds=configuration.problem_cache_ttl_seconds,
+        max_entries=configuration.problem_cache_max_entries,
+    )
+
+# 같은 지원자의 problem_gen 워커가 동시에 실행되는 수를 제한한다. 사용 중인 세마포어만 남도록 약한 참조로 보관한다.
+# asyncio 세마포어는 처음 사용한 이벤트 루프에 묶이므로 루프마다 따로 둔다.
+_worker_semaphores: weakref.WeakValueDictionary[tuple[asyncio.AbstractEventLoop, str, int], asyncio.BoundedSemaphore] = weakref.WeakValueDictionary()
+_worker_semaphores_lock = threading.Lock()
+
+def _worker_semaphore(candidate_profile_id: str, max_concurrency: int) -> asyncio.BoundedSemaphore:
+    key = (asyncio.get_running_loop(), candidate_profile_id, max_concurrency)
+    with _worker_semaphores_lock:
+        semaphore = _worker_semaphores.get(key)
+        if semaphore is None:
+            semaphore = _worker_semaphores[key] = asyncio.BoundedSemaphore(max_concurrency)
+        return semaphore
+
+def _is_batch(state: ProblemGenState) -> bool:
+    return bool(state.experience_ids) or state.all_experiences
+
+def _to_document_with_id(doc: Document) -> Document_with_Id:
+    return Document_with_Id(id=doc.id, page_content=doc.page_content, metadata=doc.metadata)
+
+async def load_batch_documents(state: ProblemGenState) -> Dict[str, Any]:
+    """
+    배치 모드: 사용자의 문서를 한 번 조회해 프로필과 대상 경험들을 찾는다.
+    """
+    docs = await aget_user_apply_docs(state.user_id)
+    profile_docs = [doc for doc in docs if doc.metadata.get("apply_doc_type") == "candidate_profile"]
+    experience_docs = [doc for doc in docs if "experience" in doc.metadata.get("apply_doc_type", "")]
+    if state.experience_ids:
+        experience_docs_by_id = {doc.id: doc for doc in experience_docs}
+        missing = [experience_id for experience_id in state.experience_ids if experience_id not in experience_docs_by_id]
+        if missing:
+            raise ValueError(f"Experiences not found: {missing}")
+        experience_docs = [experience_docs_by_id[experience_id] for experience_id in state.experience_ids]
+
+    if not profile_docs or not experience_docs:
+        raise ValueError("Candidate profile or experience not found")
+
+    return {
+        "candidate_profile": _to_document_with_id(profile_docs[0]),
+        "experiences": [_to_document_with_id(doc) for doc in experience_docs],
+    }
+
+async def load_documents(state: ProblemGenState, config: RunnableConfig) -> Dict[str, Any]:
     """
     Load documents from vector store.
     """
+    if _is_batch(state):
+        return {**(await load_batch_documents(state)), "started_at": time.time()}
+
     """
         TODO: 문서 load logic 구현
         - vector_store.get_by_id() 사용
@@ -30,8 +91,8 @@ def load_documents(state: ProblemGenState, config: RunnableConfig) -> Dict[str,
         - 조회된 문서를 state.candidate_profile, state.experience에 저장(id로 매핑해서)
             - 조회된 문서는 id 순서대로 오는 것이 아니기에, id를 매핑해서 할당해야 함   
     """
-    docs: list[Document] = apply_docs_vector_store.get_by_ids(
-        [state.candidate_profile.id, state.experience.id]
+    docs: list[Document] = await aget_docs_by_ids(
+        [state.candidate_profile.id, state.experience.id], get_apply_docs_collection_name()
     )
 
     # 문서를 유형별로 분류
@@ -58,7 +119,8 @@ def load_documents(state: ProblemGenState, config: RunnableConfig) -> Dict[str,
 
     return {
         "candidate_profile": profile,
-        "experience": experience
+        "experience": experience,
+        "started_at": time.time(),
     }
 
 def assign_workers(state: ProblemGenState, config: RunnableConfig) -> Dict[str, Any]:
@@ -66,13 +128,118 @@ def assign_workers(state: ProblemGenState, config: RunnableConfig) -> Dict[str,
     Assign workers.
     """
 
+    configuration = ConfigSchema.from_runnable_config(config)
+
     # list of problem_gen_configs
-    problem_gen_configs: list[Problem_Type] = ["experience", "tech", "cowork"]
+    problem_gen_configs: list[Problem_Type] = list(PROBLEM_TYPES)
+
+    # 배치 모드는 경험 x 문제 유형마다 워커를 보낸다. 동시에 실행되는 워커 수는 batch_max_concurrency로 제한된다.
+    experiences = state.experiences if _is_batch(state) else [state.experience]
+    if configuration.problem_gen_mode == "single_call":
+        # 경험마다 한 번의 호출로 모든 유형의 문제를 생성한다.
+        return [
+            Send("problem_gen_all_types", {"candidate_profile": state.candidate_profile, "experience": experience})
+            for experience in experiences
+        ]
+    return [
+        Send("problem_gen", {"problem_type": problem_type, "candidate_profile": state.candidate_profile, "experience": experience})
+        for experience in experiences
+        for problem_type in problem_gen_configs
+    ]
+
+def _base_system_prompt(configuration: ConfigSchema, candidate_profile: Document_with_Id, experience: Document_with_Id) -> str:
+    return configuration.base_system_prompt.format(
+        candidate_name=candidate_profile.metadata.get("candidate_name", ""),
+        position=candidate_profile.metadata.get("position", ""),
+        objective=candidate_profile.metadata.get("objective", ""),
+        experience=experience.page_content
+    )
+
+def _get_context_cache(configuration: ConfigSchema):
+    return get_context_cache(
+        backend=configuration.context_cache_backend,
+        ttl_seconds=configuration.context_cache_ttl_seconds,
+        min_tokens=configuration.context_cache_min_tokens,
+    )
+
+async def _agenerate(configuration: ConfigSchema, model: str, base_prompt: str, instructions: str, schema: type[BaseModel], cache_label: str, candidate_profile: Document_with_Id, config: RunnableConfig):
+    """
+    문제 생성 LLM 호출. 캐시 조회, 대체 모델 체인, hedging, 지원자별 동시 실행 제한을 함께 처리한다.
+    context cache를 쓰면 공통 prefix(base_prompt)는 캐시에서 읽고, 유형별 지시(instructions)는 사용자 메시지로 보낸다.
+    """
+    model_spec = ModelSpec(model=model, temperature=configuration.problem_gen_temperature, timeout=configuration.timeout, max_retries=configuration.max_retries)
+    models = model_chain(model, configuration.problem_gen_fallback_models)
+
+    system_prompt = base_prompt + instructions
+    user_prompt = "Please generate problems based on the following resume. Response in Korean."
+    messages= [
+        SystemMessage(content=system_prompt),
+        HumanMessage(content=[
+            {"type": "text", "text": user_prompt},
+        ])
+    ]
+    # 캐시된 content와 system instruction은 함께 보낼 수 없다.
+    context_cached_messages = [
+        HumanMessage(content=[
+            {"type": "text", "text": instructions},
+            {"type": "text", "text": user_prompt},
+        ])
+    ]
+
+    def problem_cache_key(model_name: str) -> str:
+        return build_problem_cache_key(cache_label, system_prompt, user_prompt, model_name, configuration.problem_gen_temperature)
+
+    problem_cache = None
+    if configuration.problem_cache_enabled:
+        problem_cache = _get_problem_cache(configuration)
+        # 첫 모델의 결과만 재사용한다. 대체 모델이 만든 결과는 그 모델의 키로 저장되므로 여기서 읽히지 않는다.
+        # SQLite/파일 I/O가 이벤트 루프를 막지 않도록 스레드에서 실행한다.
+        cached = await asyncio.to_thread(problem_cache.get, problem_cache_key(model), cache_label, schema)
+        if cached is not None:
+            langsmith_logger.info(f"Problem cache hit for {cache_label}, skipping the LLM call. stats={problem_cache.stats()}")
+            return cached
+
+    context_cache = _get_context_cache(configuration) if configuration.context_cache_enabled else None
 
-    return [Send("problem_gen", {"problem_type": problem_type, "candidate_profile": state.candidate_profile, "experience": state.experience}) for problem_type in problem_gen_configs]
+    async def generate(model_name: str):
+        spec = model_spec.for_model(model_name)
+        cached_content = await asyncio.to_thread(context_cache.get_or_create, model_name, base_prompt) if context_cache is not None else None
+        if cached_content:
+            # 컨텍스트 캐시를 쓰는 요청에는 tools/tool_config를 함께 보낼 수 없으므로, function calling이 아닌
+            # response schema(json_schema)로 구조화한다. 이전 버전의 기본값은 function calling이므로 명시한다.
+            # 캐시 이름은 호출마다 바뀌므로 레지스트리 키(ModelSpec)가 아니라 호출 인자로 넘긴다.
+            runnable = get_structured_model(spec, schema, method="json_schema").bind(cached_content=cached_content)
+            # hedge 요청도 같은 캐시를 참조해야 하므로 같은 모델로 hedge한다.
+            hedge_spec, hedge_runnable = spec, runnable
+        else:
+            runnable = get_structured_model(spec, schema)
+            # hedge_model은 체인의 첫 모델에만 적용하고, 대체 모델은 같은 모델로 hedge한다.
+            hedge_spec = spec.for_model(configuration.hedge_model) if configuration.hedge_model and model_name == model else spec
+            hedge_runnable = get_structured_model(hedge_spec, schema)
+        result = await ainvoke_llm(
+            runnable,
+            context_cached_messages if cached_content else messages,
+            config,
+            model=model_name,
+            user_id=candidate_profile.metadata.get("user_id", ""),
+            max_quota_retries=quota_retries_for(models),
+            hedge=configuration.hedge_config(),
+            hedge_runnable=hedge_runnable,
+            hedge_model=hedge_spec.model,
+        )
+        # 다른 모델로 hedge하면 어느 모델의 결과인지 알 수 없다.
+        produced_by = model_name if hedge_spec.model == spec.model or configuration.hedge_config() is None else None
+        return produced_by, result
 
-# TODO: 특정 LLM 모델이 사용량 초과로 인해 문제 생성 실패 시, 다른 모델로 대체하는 로직 추가
-def problem_gen(state: ProblemGenState, config: RunnableConfig) -> Dict[str, Any]:
+    async with _worker_semaphore(candidate_profile.id, configuration.batch_max_concurrency):
+        produced_by, result = await afallback(models, generate, configuration.backoff())
+    if context_cache is not None:
+        langsmith_logger.info(f"Context cache stats={context_cache.stats()}")
+    if problem_cache is not None and produced_by is not None:
+        await asyncio.to_thread(problem_cache.put, problem_cache_key(produced_by), result)
+    return result
+
+async def problem_gen(state: ProblemGenState, config: RunnableConfig) -> Dict[str, Any]:
     """
     Generate problem.
     """
@@ -82,13 +249,6 @@ def problem_gen(state: ProblemGenState, config: RunnableConfig) -> Dict[str, Any
     candidate_profile = state.get('candidate_profile')
     experience = state.get('experience')
 
-    base_system_prompt = configuration.base_system_prompt.format(
-        candidate_name=candidate_profile.metadata.get("candidate_name", ""),
-        position=candidate_profile.metadata.get("position", ""),
-        objective=candidate_profile.metadata.get("objective", ""),
-        experience=experience.page_content
-    )
-
     problem_type_system_prompt = ""
     
     match problem_type:
@@ -104,32 +264,39 @@ def problem_gen(state: ProblemGenState, config: RunnableConfig) -> Dict[str, Any
         case _:
             raise ValueError(f"Invalid problem type: {problem_type}")
         
-    system_prompt = base_system_prompt + problem_type_system_prompt
-        
-    problem_gen_model = init_chat_model(model=model, temperature=configuration.problem_gen_temperature, timeout=configuration.timeout, max_retries=configuration.max_retries)
-    structured_problem_gen_model = problem_gen_model.with_structured_output(Problem_Contents)
-
-    messages= [
-        SystemMessage(content=system_prompt),
-        HumanMessage(content=[
-            {"type": "text", "text": "Please generate problems based on the following resume. Response in Korean."},
-        ])
-    ]
-    
-    problem_contents = structured_problem_gen_model.invoke(messages)
-    
+    base_prompt = _base_system_prompt(configuration, candidate_profile, experience)
+    problem_contents = await _agenerate(configuration, model, base_prompt, problem_type_system_prompt, Problem_Contents, problem_type, candidate_profile, config)
 
     return {
-        "problems": [Problems(problem_type=problem_type, content=problem_contents.contents)]
+        "problems": [Problems(problem_type=problem_type, content=problem_contents.contents, experience_id=experience.id)]
     }
 
-
-def gather_all_problems(state: ProblemGenState, config: RunnableConfig) -> Dict[str, Any]:
+async def problem_gen_all_types(state: ProblemGenState, config: RunnableConfig) -> Dict[str, Any]:
     """
-    Gather all problems.
+    Generate the problems of every problem type in one structured-output call.
     """
-    personalized_problems_vector_store.delete(ids=[state.experience.id])
+    configuration = ConfigSchema.from_runnable_config(config)
+
+    candidate_profile = state.get('candidate_profile')
+    experience = state.get('experience')
+
+    base_prompt = _base_system_prompt(configuration, candidate_profile, experience)
+    instructions = MULTI_TYPE_PROBLEM_GEN_SYSTEM_PROMPT.format(
+        experience_instructions=configuration.experience_problem_gen_system_prompt,
+        tech_instructions=configuration.tech_problem_gen_system_prompt,
+        cowork_instructions=configuration.cowork_problem_gen_system_prompt,
+    )
+    problem_set = await _agenerate(configuration, configuration.single_call_problem_gen_model, base_prompt, instructions, Problem_Set, "all_types", candidate_profile, config)
+
+    return {
+        "problems": [
+            Problems(problem_type=problem_type, content=getattr(problem_set, problem_type), experience_id=experience.id)
+            for problem_type in PROBLEM_TYPES
+        ]
+    }
 
+
+def _problem_docs(state: ProblemGenState) -> list[Document]:
     problem_docs = []
     for problems_with_type in state.problems:
         for problem_content in problems_with_type['content']:
@@ -139,13 +306,49 @@ def gather_all_problems(state: ProblemGenState, config: RunnableConfig) -> Dict[
                     "problem_type": problems_with_type['problem_type'],
                     "user_id": state.user_id,
                     "api_version": state.api_version,
-                    "experience_id": state.experience.id,
+                    "experience_id": problems_with_type.get('experience_id', state.experience.id),
                 }
             )
             problem_docs.append(problem_doc)
+    return problem_docs
+
+async def gather_batch_problems(state: ProblemGenState) -> Dict[str, Any]:
+    """
+    배치 모드: 이전 문제를 한 번의 필터 삭제로 지우고, 모든 경험의 문제를 한 번에 업서트한다.
+    """
+    experience_ids = [experience.id for experience in state.experiences]
+    await adelete_docs_by_any("metadata.experience_id", experience_ids, collection_name=get_personalized_problems_collection_name())
+
+    problem_docs = _problem_docs(state)
+    await aadd_documents(problem_docs, [str(uuid4()) for _ in problem_docs], collection_name=get_personalized_problems_collection_name())
+
+    seconds = time.time() - state.started_at if state.started_at else None
+    batch_report = {
+        "user_id": state.user_id,
+        "experiences": len(experience_ids),
+        "problems": len(problem_docs),
+        "seconds": round(seconds, 2) if seconds is not None else None,
+        "seconds_per_experience": round(seconds / len(experience_ids), 2) if seconds is not None else None,
+    }
+    langsmith_logger.info(f"Generated problems for {len(experience_ids)} experiences in one run. report={batch_report}")
+    return {
+        "batch_report": batch_report
+    }
+
+async def gather_all_problems(state: ProblemGenState, config: RunnableConfig) -> Dict[str, Any]:
+    """
+    Gather all problems.
+    """
+    if _is_batch(state):
+        return await gather_batch_problems(state)
+
+    # 문제 포인트의 id는 새로 만든 uuid이므로, 배치 모드와 같이 experience_id 필터로 이전 문제를 지운다.
+    await adelete_docs_by_any("metadata.experience_id", [state.experience.id], collection_name=get_personalized_problems_collection_name())
+
+    problem_docs = _problem_docs(state)
 
     uuids = [str(uuid4()) for _ in range(len(problem_docs))]
-    personalized_problems_vector_store.add_documents(documents=problem_docs, ids=uuids)
+    await aadd_documents(problem_docs, uuids, collection_name=get_personalized_problems_collection_name())
 
     return {
         "problems": state.problems
@@ -157,12 +360,14 @@ graph_builder = StateGraph(ProblemGenState, config_schema=ConfigSchema)
 """NODES"""
 graph_builder.add_node("load_documents", load_documents)
 graph_builder.add_node("problem_gen", problem_gen)
+graph_builder.add_node("problem_gen_all_types", problem_gen_all_types)
 graph_builder.add_node("gather_all_problems", gather_all_problems)
 
 """EDGES"""
 graph_builder.add_edge(START, "load_documents")
-graph_builder.add_conditional_edges("load_documents", assign_workers, ["problem_gen"])
+graph_builder.add_conditional_edges("load_documents", assign_workers, ["problem_gen", "problem_gen_all_types"])
 graph_builder.add_edge("problem_gen", "gather_all_problems")
+graph_builder.add_edge("problem_gen_all_types", "gather_all_problems")
 graph_builder.add_edge("gather_all_problems", END)
 
 """COMPILE"""
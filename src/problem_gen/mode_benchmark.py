@@ -0,0 +1,94 @@
+"""
+per_type vs single_call 문제 생성 모드 비교.
+
+fixture의 이력서 텍스트마다 두 모드로 문제를 생성하고, 경험당 지연 시간과 입력/출력 토큰을 비교한다.
+- per_type: 유형별 3개의 호출을 병렬로 실행한다(그래프의 fan-out과 같다). 지연 시간은 가장 느린 호출이 결정한다.
+- single_call: 한 번의 호출로 `Problem_Set`을 생성한다. 이력서 토큰을 한 번만 보내지만, 출력이 한 호출에 몰린다.
+공정한 비교를 위해 문제 캐시는 끈다.
+
+Usage:
+    python -m problem_gen.mode_benchmark fixtures.jsonl [--limit 5]
+
+fixture는 `text` 키(이력서/경험 텍스트)를 가진 JSONL 파일이며, `is_resume`가 false인 줄은 건너뛴다.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from langchain_core.callbacks import get_usage_metadata_callback
+from langchain_core.runnables import RunnableLambda
+
+from problem_gen.graph import problem_gen, problem_gen_all_types
+from problem_gen.state import PROBLEM_TYPES, Document_with_Id
+
+logger = logging.getLogger(__name__)
+
+
+def load_fixtures(path: Path, limit: Optional[int] = None) -> list[str]:
+    with path.open(encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    return [row["text"] for row in rows if row.get("is_resume", True)][:limit]
+
+
+async def _run(mode: str, text: str, index: int) -> dict[str, Any]:
+    config = {"configurable": {"problem_gen_mode": mode, "problem_cache_enabled": False}}
+    candidate_profile = Document_with_Id(id=f"benchmark-{index}", page_content="", metadata={})
+    experience = Document_with_Id(id=f"benchmark-{index}", page_content=text, metadata={})
+
+    started_at = time.perf_counter()
+    with get_usage_metadata_callback() as usage:
+        if mode == "single_call":
+            await RunnableLambda(problem_gen_all_types).ainvoke({"candidate_profile": candidate_profile, "experience": experience}, config)
+        else:
+            # 그래프의 fan-out처럼 유형별 호출을 동시에 실행한다.
+            await RunnableLambda(problem_gen).abatch(
+                [{"problem_type": problem_type, "candidate_profile": candidate_profile, "experience": experience} for problem_type in PROBLEM_TYPES],
+                config,
+            )
+    seconds = time.perf_counter() - started_at
+    return {
+        "seconds": seconds,
+        "input_tokens": sum(model_usage["input_tokens"] for model_usage in usage.usage_metadata.values()),
+        "output_tokens": sum(model_usage["output_tokens"] for model_usage in usage.usage_metadata.values()),
+    }
+
+
+def _summary(runs: list[dict[str, Any]]) -> dict[str, float]:
+    return {
+        "mean_seconds": round(statistics.mean(run["seconds"] for run in runs), 2),
+        "max_seconds": round(max(run["seconds"] for run in runs), 2),
+        "mean_input_tokens": round(statistics.mean(run["input_tokens"] for run in runs)),
+        "mean_output_tokens": round(statistics.mean(run["output_tokens"] for run in runs)),
+    }
+
+
+async def run_benchmark(texts: list[str]) -> dict[str, Any]:
+    runs: dict[str, list[dict[str, Any]]] = {"per_type": [], "single_call": []}
+    for index, text in enumerate(texts):
+        for mode in runs:
+            result = await _run(mode, text, index)
+            runs[mode].append(result)
+            logger.info(f"[{index + 1}/{len(texts)}] {mode}: {result['seconds']:.1f}s, {result['input_tokens']} input tokens")
+    report = {mode: _summary(mode_runs) for mode, mode_runs in runs.items()}
+    report["input_token_savings"] = round(1 - report["single_call"]["mean_input_tokens"] / report["per_type"]["mean_input_tokens"], 3)
+    report["latency_ratio"] = round(report["single_call"]["mean_seconds"] / report["per_type"]["mean_seconds"], 2)
+    return report
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    parser = argparse.ArgumentParser(description="Compare the per_type and single_call problem generation modes.")
+    parser.add_argument("fixtures", type=Path, help="A JSONL file of resume/experience texts (`text` key).")
+    parser.add_argument("--limit", type=int, default=None, help="Use at most this many fixtures.")
+    args = parser.parse_args(argv)
+
+    print(json.dumps(asyncio.run(run_benchmark(load_fixtures(args.fixtures, args.limit))), ensure_ascii=False, indent=2))  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -48,4 +48,23 @@ COWORK_PROBLEM_GEN_SYSTEM_PROMPT="""
     - Assess the candidate's teamwork, communication skills, and problem-solving abilities in a group setting
     - Ask about team communication, conflict resolution, cross-functional collaboration, project management methodologies, and code review experiences
 </problem_gen_instructions>
-"""
\ No newline at end of file
+"""
+
+MULTI_TYPE_PROBLEM_GEN_SYSTEM_PROMPT="""
+<problem_gen_instructions>
+    - Generate three separate groups of questions in one response: `experience`, `tech` and `cowork`
+    - Follow the instructions of each group below, and do not repeat the same question across groups
+</problem_gen_instructions>
+
+<experience_problem_gen_instructions>
+{experience_instructions}
+</experience_problem_gen_instructions>
+
+<tech_problem_gen_instructions>
+{tech_instructions}
+</tech_problem_gen_instructions>
+
+<cowork_problem_gen_instructions>
+{cowork_instructions}
+</cowork_problem_gen_instructions>
+"""
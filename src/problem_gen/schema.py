@@ -7,7 +7,10 @@ class Problem_Content(BaseModel):
 
 class Problem_Contents(BaseModel):
     contents: Annotated[list[Problem_Content], operator.add] = Field(description="The problems to be solved.")
-    
-    
-    
 
+
+class Problem_Set(BaseModel):
+    """Problems of every Problem_Type, generated in one call. The field names are the Problem_Type values."""
+    experience: list[Problem_Content] = Field(description="Questions about the candidate's project comprehension and personal contributions, following <experience_problem_gen_instructions>.")
+    tech: list[Problem_Content] = Field(description="Questions about the technologies and skills in the resume, following <tech_problem_gen_instructions>.")
+    cowork: list[Problem_Content] = Field(description="Questions about teamwork, communication and collaboration, following <cowork_problem_gen_instructions>.")
@@ -1,9 +1,10 @@
 from dataclasses import dataclass, field
-from typing import Optional, Literal, Annotated, operator, TypedDict
+from typing import Optional, Literal, Annotated, operator, TypedDict, get_args
 import os
 from problem_gen.schema import Problem_Content
 from constants.metadata import API_VERSION
 Problem_Type = Literal["experience", "tech", "cowork"]
+PROBLEM_TYPES: tuple[Problem_Type, ...] = get_args(Problem_Type)
 
 
 @dataclass(kw_only=True)
@@ -22,6 +23,7 @@ class Document_with_Id():
 class Problems(TypedDict):
     problem_type: Problem_Type
     content: Annotated[list[Problem_Content], operator.add]
+    experience_id: str
 
 @dataclass(kw_only=True)
 class ProblemGenState:
@@ -38,6 +40,26 @@ class ProblemGenState:
         default_factory=lambda: Document_with_Id(id="0cdc466b-ecd6-4010-87d9-70cfc3370016", page_content="", metadata={}), metadata={"description": "The experience."}
     )
 
+    experience_ids: list[str] = field(
+        default_factory=list, metadata={"description": "배치 모드: 문제를 생성할 경험 id 목록. 프로필은 한 번만 조회한다."}
+    )
+
+    all_experiences: bool = field(
+        default=False, metadata={"description": "배치 모드: user_id의 모든 경험에 대해 문제를 생성한다."}
+    )
+
+    experiences: list[Document_with_Id] = field(
+        default_factory=list, metadata={"description": "배치 모드에서 조회된 경험 문서."}
+    )
+
+    started_at: Optional[float] = field(
+        default=None, metadata={"description": "The time the run started loading documents, for the latency report."}
+    )
+
+    batch_report: Optional[dict] = field(
+        default=None, metadata={"description": "배치 모드의 경험 수, 문제 수, 전체 지연 시간."}
+    )
+
     api_version: str = field(
         default=API_VERSION, metadata={"description": "The api version of the schema."}
     )
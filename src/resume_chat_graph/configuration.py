@@ -7,6 +7,7 @@ from typing import Annotated, Optional, Type, TypeVar
 
 from langchain_core.runnables import RunnableConfig, ensure_config
 
+from constants.fallback import Backoff
 from resume_chat_graph.prompts import RESPONSE_SYSTEM_PROMPT, QUERY_SYSTEM_PROMPT, SYSTEM_PROMPT
 
 
@@ -65,6 +66,14 @@ class ConfigSchema:
         },
     )
 
+    fallback_models: list[str] = field(
+        default_factory=list,
+        metadata={
+            "description": "Models tried in order when the response or query model fails or its circuit is open. "
+            "Bare names are Gemini models; other providers use the provider:model-name form."
+        },
+    )
+
     @classmethod
     def from_runnable_config(
         cls: Type[T], config: Optional[RunnableConfig] = None
@@ -83,5 +92,9 @@ class ConfigSchema:
         _fields = {f.name for f in fields(cls) if f.init}
         return cls(**{k: v for k, v in configurable.items() if k in _fields})
 
+    def backoff(self) -> Backoff:
+        # 대화 중에는 체인을 한 번만 시도하고, 모두 실패하면 기다리지 않고 오류를 돌려준다.
+        return Backoff(max_rounds=1)
+
 
 T = TypeVar("T", bound=ConfigSchema)
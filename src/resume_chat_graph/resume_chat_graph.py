@@ -4,6 +4,9 @@ from langgraph.graph import StateGraph, START, END
 from langchain_core.runnables import RunnableConfig
 from langgraph.prebuilt import tools_condition, ToolNode
 
+from constants.fallback import afallback, fallback, model_chain, quota_retries_for
+from constants.llm_invoke import ainvoke_llm, invoke_llm
+from constants.llm_registry import ModelSpec, factory_for, get_chat_model, get_structured_model, get_tool_model
 from resume_chat_graph.state import State, InputState
 from resume_chat_graph.configuration import ConfigSchema
 from resume_chat_graph.utils import get_message_text
@@ -16,7 +19,7 @@ tools=[retreive_user_apply_docs_tool]
 async def chat_node(state: State, config: RunnableConfig) -> dict:
     """Chat with the user."""
     configuration = ConfigSchema.from_runnable_config(config)
-    response_llm = ChatGoogleGenerativeAI(model=configuration.response_model, temperature=0.1).bind_tools(tools)
+    models = model_chain(configuration.response_model, configuration.fallback_models)
     system_prompt = configuration.response_system_prompt
     
     system_prompt = system_prompt.format(user_id=state.user_id, system_time=datetime.now().isoformat())
@@ -26,7 +29,18 @@ async def chat_node(state: State, config: RunnableConfig) -> dict:
         *state.messages,
     ]
     
-    response = await response_llm.ainvoke(messages, config)
+    response = await afallback(
+        models,
+        lambda model: ainvoke_llm(
+            get_tool_model(ModelSpec(model=model, temperature=0.1), tools, factory=factory_for(model, ChatGoogleGenerativeAI)),
+            messages,
+            config,
+            model=model,
+            user_id=state.user_id,
+            max_quota_retries=quota_retries_for(models),
+        ),
+        configuration.backoff(),
+    )
     messages.append(response)
     
     return {"messages": messages}
@@ -37,9 +51,7 @@ def transform_query_node(state: State, config: RunnableConfig) -> dict:
     
     configuration = ConfigSchema.from_runnable_config(config)
 
-    query_gen_llm = ChatGoogleGenerativeAI(
-        model=configuration.query_model, temperature=0
-    ).with_structured_output(GeneratedQueries)
+    models = model_chain(configuration.query_model, configuration.fallback_models)
 
     user_question = get_message_text(state.messages[-1])
     system_prompt = configuration.query_system_prompt
@@ -50,7 +62,18 @@ def transform_query_node(state: State, config: RunnableConfig) -> dict:
             content=f"Generate search queries for the following user question: {user_question}"
         ),
     ]
-    generated_queries = query_gen_llm.invoke(prompt, config)
+    generated_queries = fallback(
+        models,
+        lambda model: invoke_llm(
+            get_structured_model(ModelSpec(model=model, temperature=0), GeneratedQueries, factory=factory_for(model, ChatGoogleGenerativeAI)),
+            prompt,
+            config,
+            model=model,
+            user_id=state.user_id,
+            max_quota_retries=quota_retries_for(models),
+        ),
+        configuration.backoff(),
+    )
     
     return {"queries": generated_queries.queries}
 
@@ -59,7 +82,7 @@ def transform_query_node(state: State, config: RunnableConfig) -> dict:
 def generate_response_node(state: State, config: RunnableConfig) -> dict:
     """Generates a response based on the retrieved documents and user query.""" 
     configuration = ConfigSchema.from_runnable_config(config)
-    response_llm = ChatGoogleGenerativeAI(model=configuration.response_model, temperature=0.1)
+    models = model_chain(configuration.response_model, configuration.fallback_models)
 
     system_prompt = configuration.response_system_prompt
     user_question = get_message_text(state.messages[-1])
@@ -69,7 +92,18 @@ def generate_response_node(state: State, config: RunnableConfig) -> dict:
     
     prompt = f"{system_prompt}\n\nHere is the retrieved context:\n\n{context}\n\nUser Question: {user_question}"
     
-    response = response_llm.invoke([HumanMessage(content=prompt)], config)
+    response = fallback(
+        models,
+        lambda model: invoke_llm(
+            get_chat_model(ModelSpec(model=model, temperature=0.1), factory=factory_for(model, ChatGoogleGenerativeAI)),
+            [HumanMessage(content=prompt)],
+            config,
+            model=model,
+            user_id=state.user_id,
+            max_quota_retries=quota_retries_for(models),
+        ),
+        configuration.backoff(),
+    )
     return {"messages": [response]}
 
 
@@ -1,25 +1,30 @@
+import logging
+
 from langchain_core.messages import SystemMessage, HumanMessage
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langgraph.graph import StateGraph, START, END
 from langgraph.checkpoint.sqlite import SqliteSaver
 from langchain_core.runnables import RunnableConfig
 
+from constants.fallback import fallback, model_chain, quota_retries_for
+from constants.llm_invoke import invoke_llm
+from constants.llm_registry import ModelSpec, factory_for, get_chat_model, get_structured_model
 from resume_chat_graph.state import State, InputState
 from resume_chat_graph.configuration import ConfigSchema
 from resume_chat_graph.retriever import get_retriever_for_user
 from resume_chat_graph.utils import get_message_text
 from resume_chat_graph.schema import GeneratedQueries
 
+logger = logging.getLogger(__name__)
+
 
 def transform_query_node(state: State, config: RunnableConfig) -> dict:
     """Transforms the user's query into a set of optimized search queries."""
     
     configuration = ConfigSchema.from_runnable_config(config)
-    print(f"DEBUG: configuration: {configuration}")
+    logger.debug(f"configuration: {configuration}")
 
-    query_gen_llm = ChatGoogleGenerativeAI(
-        model=configuration.query_model, temperature=0
-    ).with_structured_output(GeneratedQueries)
+    models = model_chain(configuration.query_model, configuration.fallback_models)
 
     user_question = get_message_text(state.messages[-1])
     system_prompt = configuration.query_system_prompt
@@ -30,8 +35,19 @@ def transform_query_node(state: State, config: RunnableConfig) -> dict:
             content=f"Generate search queries for the following user question: {user_question}"
         ),
     ]
-    generated_queries = query_gen_llm.invoke(prompt, config)
-    print(f"DEBUG: generated_queries: {generated_queries}")
+    generated_queries = fallback(
+        models,
+        lambda model: invoke_llm(
+            get_structured_model(ModelSpec(model=model, temperature=0), GeneratedQueries, factory=factory_for(model, ChatGoogleGenerativeAI)),
+            prompt,
+            config,
+            model=model,
+            user_id=state.user_id,
+            max_quota_retries=quota_retries_for(models),
+        ),
+        configuration.backoff(),
+    )
+    logger.debug(f"generated_queries: {generated_queries}")
     return {"queries": generated_queries.queries}
 
 
@@ -47,7 +63,7 @@ def retrieve_docs_node(state: State, config: RunnableConfig) -> dict:
 def generate_response_node(state: State, config: RunnableConfig) -> dict:
     """Generates a response based on the retrieved documents and user query.""" 
     configuration = ConfigSchema.from_runnable_config(config)
-    response_llm = ChatGoogleGenerativeAI(model=configuration.response_model, temperature=0.1)
+    models = model_chain(configuration.response_model, configuration.fallback_models)
 
     system_prompt = configuration.response_system_prompt
     user_question = get_message_text(state.messages[-1])
@@ -57,7 +73,18 @@ def generate_response_node(state: State, config: RunnableConfig) -> dict:
     
     prompt = f"{system_prompt}\n\nHere is the retrieved context:\n\n{context}\n\nUser Question: {user_question}"
     
-    response = response_llm.invoke([HumanMessage(content=prompt)], config)
+    response = fallback(
+        models,
+        lambda model: invoke_llm(
+            get_chat_model(ModelSpec(model=model, temperature=0.1), factory=factory_for(model, ChatGoogleGenerativeAI)),
+            [HumanMessage(content=prompt)],
+            config,
+            model=model,
+            user_id=state.user_id,
+            max_quota_retries=quota_retries_for(models),
+        ),
+        configuration.backoff(),
+    )
     return {"messages": [response]}
 
 
@@ -1,11 +1,11 @@
 from langchain_core.vectorstores import VectorStoreRetriever
 
-from constants.vector_store import apply_docs_vector_store, get_filter_condition
+from constants.vector_store import get_apply_docs_vector_store, get_user_docs_filter
 
 
 def get_retriever_for_user(user_id: str) -> VectorStoreRetriever:
     """
-    Creates a retriever for a specific user, filtering by user_id in the metadata.
+    Creates a retriever for a specific user, reading only the user's current index generation.
     Args:
         user_id (str): The ID of the user whose documents should be retrieved.
     Returns:
@@ -13,7 +13,7 @@ def get_retriever_for_user(user_id: str) -> VectorStoreRetriever:
     """
 
     search_kwargs = {
-        "filter": get_filter_condition(key="metadata.user_id", value=user_id),
+        "filter": get_user_docs_filter(user_id),
         "k": 10,
     }
-    return apply_docs_vector_store.as_retriever(search_kwargs=search_kwargs)
\ No newline at end of file
+    return get_apply_docs_vector_store().as_retriever(search_kwargs=search_kwargs)
\ No newline at end of file
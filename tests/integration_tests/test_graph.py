@@ -1,12 +1,149 @@
+"""End-to-end runs of the async parsing graph against stub models and an in-memory Qdrant."""
+import asyncio
+import functools
+import importlib
+import io
+import sys
+
 import pytest
+from qdrant_client import AsyncQdrantClient
 
-from agent import graph
+from constants import vector_store
 
 pytestmark = pytest.mark.anyio
 
 
-@pytest.mark.langsmith
-async def test_agent_simple_passthrough() -> None:
-    inputs = {"changeme": "some_val"}
-    res = await graph.ainvoke(inputs)
-    assert res is not None
+class FakeEmbeddings:
+    def __init__(self):
+        self.embedded: list[str] = []
+
+    async def aembed_documents(self, texts):
+        self.embedded.extend(texts)
+        return [[1.0] * 1536 for _ in texts]
+
+    def stats(self, persistent_bytes=True):
+        return {"embedded": len(self.embedded)}
+
+
+@pytest.fixture
+def embeddings(monkeypatch):
+    client = AsyncQdrantClient(location=":memory:")
+    embeddings = FakeEmbeddings()
+    monkeypatch.setattr(vector_store, "apply_docs_collection_name", "apply_docs")
+    monkeypatch.setattr(vector_store, "personalized_problems_collection_name", "problems")
+    monkeypatch.setattr(vector_store, "index_generations_collection_name", "apply_docs_generations")
+    monkeypatch.setattr(vector_store, "_collections_ready", False)
+    monkeypatch.setattr(vector_store, "get_async_client", lambda: client)
+    monkeypatch.setattr(vector_store, "get_embeddings", functools.cache(lambda: embeddings))
+    return embeddings
+
+
+@pytest.fixture
+def parsing_graph_module(monkeypatch):
+    monkeypatch.setenv("GOOGLE_API_KEY", "test")
+    importlib.import_module("parsing_graph.parsing_graph")
+    return sys.modules["parsing_graph.parsing_graph"]
+
+
+@pytest.fixture
+def resume_data_uri():
+    from pypdf import PdfWriter
+
+    from parsing_graph.resume_file import to_data_uri_from_bytes
+
+    writer = PdfWriter()
+    writer.add_blank_page(width=612, height=792)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return to_data_uri_from_bytes(buffer.getvalue())
+
+
+def _stub_models(monkeypatch, pg, summaries: dict[str, str]):
+    from parsing_graph.schema.is_resume import IsResumeResult
+    from parsing_graph.schema.schema import CandidateProfile, CareerExperience, ResumeParseResult
+
+    class StubStructuredLLM:
+        def __init__(self, schema, include_raw):
+            self.schema = schema
+            self.include_raw = include_raw
+
+        def invoke(self, *args, **kwargs):
+            raise AssertionError("Synchronous invoke blocks the event loop.")
+
+        async def ainvoke(self, messages, config=None):
+            await asyncio.sleep(0.01)
+            if self.schema is IsResumeResult:
+                return IsResumeResult(is_resume=True, reason="stub")
+            career = CareerExperience(
+                company="Acme",
+                company_description="Payments",
+                employee_type="EMPLOYEE",
+                start_date="2020-01",
+                end_date=None,
+                tech_stack=["Python"],
+                summary=summaries["career"],
+            )
+            parsed = ResumeParseResult(
+                candidate_profile=CandidateProfile(name="Kim", position="BE", objective="backend"),
+                career_experiences=[career],
+            )
+            if self.include_raw:
+                return {"raw": None, "parsed": parsed, "parsing_error": None}
+            return parsed
+
+    class StubChatModel:
+        def __init__(self, model, **kwargs):
+            pass
+
+        def with_structured_output(self, schema, include_raw=False):
+            return StubStructuredLLM(schema, include_raw)
+
+    monkeypatch.setattr(pg, "ChatGoogleGenerativeAI", StubChatModel)
+
+
+async def _run(pg, user_ids, resume_data_uri):
+    config = {"configurable": {"parse_cache_enabled": False}}
+    results = await asyncio.gather(
+        *[pg.parsing_graph.ainvoke({"user_id": user_id, "resume_file_path": resume_data_uri}, config) for user_id in user_ids]
+    )
+    # 이전 세대 정리는 백그라운드 태스크로 돈다.
+    await asyncio.gather(*list(vector_store._background_tasks))
+    return results
+
+
+async def _points_by_user() -> dict[str, set[str]]:
+    points, _ = await vector_store.get_async_client().scroll("apply_docs", limit=100, with_payload=True)
+    by_user: dict[str, set[str]] = {}
+    for point in points:
+        by_user.setdefault(point.payload["metadata"]["user_id"], set()).add(point.payload["page_content"])
+    return by_user
+
+
+async def test_concurrent_runs_index_each_users_resume(parsing_graph_module, embeddings, resume_data_uri, monkeypatch):
+    _stub_models(monkeypatch, parsing_graph_module, {"career": "Built a payment service."})
+
+    results = await _run(parsing_graph_module, ["u1", "u2"], resume_data_uri)
+
+    assert all(result["error"] is None and result["documents"] is None for result in results)
+    points = await _points_by_user()
+    assert set(points) == {"u1", "u2"}
+    assert points["u1"] == points["u2"] and len(points["u1"]) == 2
+    for user_id in ("u1", "u2"):
+        assert await vector_store.aget_current_generation(user_id) is not None
+
+
+async def test_a_reupload_replaces_only_the_changed_chunks(parsing_graph_module, embeddings, resume_data_uri, monkeypatch):
+    summaries = {"career": "Built a payment service."}
+    _stub_models(monkeypatch, parsing_graph_module, summaries)
+    await _run(parsing_graph_module, ["u1"], resume_data_uri)
+    before = (await _points_by_user())["u1"]
+
+    embeddings.embedded.clear()
+    summaries["career"] = "Built a ledger."
+    [result] = await _run(parsing_graph_module, ["u1"], resume_data_uri)
+
+    assert result["error"] is None
+    after = (await _points_by_user())["u1"]
+    assert len(after) == 2 and len(before & after) == 1
+    assert any("Built a ledger." in content for content in after)
+    assert len(embeddings.embedded) == 1
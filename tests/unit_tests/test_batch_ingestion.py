@@ -0,0 +1,120 @@
+import asyncio
+import base64
+import importlib
+import json
+import sys
+import types
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeParsingGraph:
+    """Answers by file name and records how many runs overlap."""
+
+    def __init__(self):
+        self.calls: list[str] = []
+        self.running = 0
+        self.max_running = 0
+
+    async def ainvoke(self, state, config=None):
+        from parsing_graph.errors import format_error
+
+        # 로컬 파일은 data URI로 넘어오며, 테스트 파일의 내용은 파일 이름이다.
+        path = base64.b64decode(state["resume_file_path"].split(",", 1)[1]).decode()
+        self.calls.append(path)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(0.02)
+        finally:
+            self.running -= 1
+        if path.startswith("ok"):
+            return {"error": None, "parsed_result": object()}
+        if path.startswith("letter"):
+            return {"error": None, "parsed_result": None}
+        if path.startswith("quota"):
+            return {"error": format_error("quota", "429"), "parsed_result": None}
+        raise RuntimeError("graph crashed")
+
+
+@pytest.fixture
+def graph():
+    return FakeParsingGraph()
+
+
+@pytest.fixture
+def batch(graph, monkeypatch):
+    # 실제 그래프 대신 가짜 그래프 모듈을 넣어, 벡터 스토어나 모델 없이 배치 로직만 검증한다.
+    fake_parsing_graph = types.ModuleType("parsing_graph.parsing_graph")
+    fake_parsing_graph.parsing_graph = graph
+    monkeypatch.setitem(sys.modules, "parsing_graph.parsing_graph", fake_parsing_graph)
+    monkeypatch.delitem(sys.modules, "parsing_graph.batch", raising=False)
+    return importlib.import_module("parsing_graph.batch")
+
+
+def _manifest(batch, tmp_path, paths):
+    for path in paths:
+        (tmp_path / path).write_text(path)
+    manifest = tmp_path / "manifest.jsonl"
+    manifest.write_text(
+        "".join(json.dumps({"user_id": f"u{i}", "resume_file_path": str(tmp_path / path)}) + "\n" for i, path in enumerate(paths)),
+        encoding="utf-8",
+    )
+    return batch.load_manifest(manifest)
+
+
+async def test_batch_reports_every_outcome_and_checkpoints_it(batch, graph, tmp_path):
+    items = _manifest(batch, tmp_path, ["ok-1.pdf", "ok-2.pdf", "letter.pdf", "quota.pdf", "crash.pdf"])
+    checkpoint = batch.ProgressCheckpoint(tmp_path / "progress.jsonl")
+
+    report = await batch.run_batch(items, checkpoint, concurrency=2)
+
+    assert graph.max_running == 2
+    assert report["processed"] == 5 and report["skipped"] == 0
+    assert report["status"] == {"succeeded": 2, "not_resume": 1, "failed": 2}
+    assert report["failures"] == {"quota": 1, "exception": 1}
+    assert report["latency_p50_seconds"] is not None
+    assert set(checkpoint.load()) == {item.key for item in items}
+
+
+async def test_an_interrupted_batch_resumes_from_the_checkpoint(batch, graph, tmp_path):
+    items = _manifest(batch, tmp_path, ["ok-1.pdf", "quota.pdf", "ok-2.pdf"])
+    checkpoint = batch.ProgressCheckpoint(tmp_path / "progress.jsonl")
+    await batch.run_batch(items[:2], checkpoint)
+    # 크래시로 잘린 마지막 줄은 무시한다.
+    with checkpoint.path.open("a", encoding="utf-8") as f:
+        f.write('{"key": "u2\\tok-2')
+    graph.calls.clear()
+
+    report = await batch.run_batch(items, checkpoint)
+    assert graph.calls == ["ok-2.pdf"]
+    assert (report["processed"], report["skipped"]) == (1, 2)
+
+    graph.calls.clear()
+    report = await batch.run_batch(items, checkpoint, retry_failed=True)
+    assert graph.calls == ["quota.pdf"]
+    assert (report["processed"], report["skipped"]) == (1, 2)
+
+
+def test_rpm_flags_configure_shared_model_rate_limiters(batch, monkeypatch):
+    from constants import rate_limiter
+
+    monkeypatch.setattr(rate_limiter, "_limiters", {})
+
+    batch.configure_rate_limits(
+        {"is_resume_model": "model-a", "career_relevant_document_parse_model": "model-b"},
+        is_resume_rpm=60,
+        parse_rpm=30,
+    )
+    assert rate_limiter.get_rate_limiter("model-a").rpm == 60
+    assert rate_limiter.get_rate_limiter("model-b").rpm == 30
+
+    # 두 모델이 같으면 더 엄격한 제한을 따른다.
+    batch.configure_rate_limits(
+        {"is_resume_model": "model-c", "career_relevant_document_parse_model": "model-c"},
+        is_resume_rpm=60,
+        parse_rpm=30,
+    )
+    assert rate_limiter.get_rate_limiter("model-c").rpm == 30
@@ -0,0 +1,35 @@
+from constants.cache import SqliteCacheBackend
+
+
+def test_sqlite_backend_evicts_the_least_recently_used_entries_over_its_limits(tmp_path):
+    backend = SqliteCacheBackend(tmp_path / "cache.sqlite3", max_entries=2, max_bytes=10)
+
+    backend.set("a", b"1234")
+    backend.set("b", b"1234")
+    assert backend.get("a") == b"1234"
+    backend.set("c", b"1234")
+    assert backend.get("b") is None
+    assert (backend.get("a"), backend.get("c")) == (b"1234", b"1234")
+
+    backend.set("a", b"123456")
+    assert backend.size_bytes() == 10
+    backend.set("d", b"12")
+    assert backend.get("c") is None
+    assert backend.size_bytes() == 8
+    assert backend.stats.evictions == 2
+
+
+def test_sqlite_backend_counters_survive_replace_delete_and_reopen(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    backend = SqliteCacheBackend(path)
+    backend.set("a", b"123")
+    backend.set("a", b"12345")
+    backend.set("b", b"12")
+    backend.delete("b")
+    backend.delete("missing")
+    assert backend.size_bytes() == 5
+
+    # 다시 열면 테이블에서 카운터를 다시 집계한다.
+    assert SqliteCacheBackend(path).size_bytes() == 5
+    backend.clear()
+    assert backend.size_bytes() == 0
@@ -0,0 +1,108 @@
+import pytest
+from qdrant_client import AsyncQdrantClient
+
+from constants import vector_store
+from parsing_graph.converter import compute_content_hash, convert_resume_to_documents
+from parsing_graph.schema.schema import CandidateProfile, CareerExperience, ProjectExperience, ResumeParseResult
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.embedded = []
+
+    async def aembed_documents(self, texts):
+        self.embedded.extend(texts)
+        return [[1.0] * 1536 for _ in texts]
+
+
+@pytest.fixture
+def embeddings(monkeypatch):
+    client = AsyncQdrantClient(location=":memory:")
+    embeddings = FakeEmbeddings()
+    monkeypatch.setattr(vector_store, "apply_docs_collection_name", "apply_docs")
+    monkeypatch.setattr(vector_store, "personalized_problems_collection_name", "problems")
+    monkeypatch.setattr(vector_store, "index_generations_collection_name", "apply_docs_generations")
+    monkeypatch.setattr(vector_store, "_collections_ready", False)
+    monkeypatch.setattr(vector_store, "get_async_client", lambda: client)
+    monkeypatch.setattr(vector_store, "get_embeddings", lambda: embeddings)
+    return embeddings
+
+
+def _resume(career_summary: str = "Built a payment service.", with_project: bool = True) -> ResumeParseResult:
+    career = CareerExperience(
+        company="Acme",
+        company_description="Payments",
+        employee_type="EMPLOYEE",
+        start_date="2020-01",
+        end_date="2022-12",
+        tech_stack=["Python"],
+        summary=career_summary,
+    )
+    project = ProjectExperience(project_name="Side", project_type="PERSONAL", start_date="2021-01", end_date=None, tech_stack=["Go"], summary="A CLI.")
+    return ResumeParseResult(
+        candidate_profile=CandidateProfile(name="Kim", position="BE", objective="backend"),
+        career_experiences=[career],
+        project_experiences=[project] if with_project else [],
+    )
+
+
+def _documents(parsed_result: ResumeParseResult, user_id: str = "u1"):
+    documents = convert_resume_to_documents(parsed_result)
+    for doc in documents:
+        doc.metadata["user_id"] = user_id
+        doc.metadata["api_version"] = "v1"
+        doc.metadata["content_hash"] = compute_content_hash(doc)
+    return documents
+
+
+async def _index(documents, user_id: str = "u1"):
+    current = await vector_store.aget_current_generation(user_id)
+    generation = await vector_store.anew_generation(user_id)
+    counts = await vector_store.astage_documents(user_id, generation, documents, current_generation=current)
+    assert await vector_store.aset_current_generation(user_id, generation)
+    await vector_store.agc_generations(user_id, generation)
+    return counts
+
+
+async def _point_ids() -> set[str]:
+    points, _ = await vector_store.get_async_client().scroll("apply_docs", limit=100)
+    return {str(point.id) for point in points}
+
+
+def test_content_hashes_change_only_for_changed_chunks():
+    before, after = _documents(_resume()), _documents(_resume(career_summary="Built a ledger."))
+
+    assert [doc.metadata["content_hash"] for doc in _documents(_resume())] == [doc.metadata["content_hash"] for doc in before]
+    changed = [a.metadata["apply_doc_type"] for a, b in zip(before, after) if a.metadata["content_hash"] != b.metadata["content_hash"]]
+    assert changed == ["career_experience"]
+    # user_id도 해시에 들어가므로 다른 사용자의 같은 청크는 다른 포인트가 된다.
+    assert _documents(_resume(), user_id="u2")[0].metadata["content_hash"] != before[0].metadata["content_hash"]
+
+
+async def test_reupload_embeds_only_changed_chunks_and_drops_removed_ones(embeddings):
+    first = _documents(_resume())
+    assert await _index(first) == (3, 0)
+    first_ids = await _point_ids()
+
+    embeddings.embedded.clear()
+    second = _documents(_resume(career_summary="Built a ledger.", with_project=False))
+    assert await _index(second) == (1, 1)
+
+    # 바뀐 경력 청크만 다시 임베딩하고, 바뀌지 않은 프로필 청크는 같은 포인트 id를 유지한다.
+    assert len(embeddings.embedded) == 1 and "Built a ledger." in embeddings.embedded[0]
+    second_ids = await _point_ids()
+    assert second_ids == {vector_store.document_point_id("u1", doc.metadata["content_hash"]) for doc in second}
+    assert len(first_ids & second_ids) == 1
+
+
+async def test_unstaging_removes_chunks_missing_from_the_final_result(embeddings):
+    documents = _documents(_resume())
+    generation = await vector_store.anew_generation("u1")
+    await vector_store.astage_documents("u1", generation, documents)
+
+    keep_ids = [vector_store.document_point_id("u1", doc.metadata["content_hash"]) for doc in documents[:2]]
+    await vector_store.aunstage_documents_except("u1", generation, keep_ids)
+
+    assert await _point_ids() == set(keep_ids)
@@ -0,0 +1,99 @@
+import threading
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.messages import SystemMessage
+
+from constants.context_cache import ContextCacheManager, LocalContextCacheBackend
+from problem_gen import graph as problem_gen_graph
+from problem_gen.schema import Problem_Content, Problem_Contents
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_prefix_is_cached_once_and_replaced_before_it_expires():
+    clock = FakeClock()
+    backend = LocalContextCacheBackend(clock=clock)
+    manager = ContextCacheManager(backend, ttl_seconds=600, min_tokens=10, refresh_margin_seconds=60, clock=clock)
+    prefix = "<resume>" + "Built a payment service. " * 10 + "</resume>"
+
+    names = []
+    threads = [threading.Thread(target=lambda: names.append(manager.get_or_create("google_genai:gemini-2.5-flash", prefix))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert backend.creates == 1 and len(set(names)) == 1
+    assert backend.get(names[0]) == prefix
+    # 같은 모델이면 provider 접두어가 없어도 같은 캐시를 쓴다.
+    assert manager.get_or_create("gemini-2.5-flash", prefix) == names[0]
+
+    clock.now += 550
+    refreshed = manager.get_or_create("gemini-2.5-flash", prefix)
+    assert refreshed != names[0] and backend.creates == 2
+
+    assert manager.get_or_create("gemini-2.5-flash", "short") is None
+    assert manager.get_or_create("anthropic:claude-sonnet-4-20250514", prefix) is None
+    assert manager.stats() == {"entries": 1, "created": 2, "reused": 3, "refreshed": 1, "skipped": 2, "failed": 0, "reuse_rate": 0.6}
+
+
+@pytest.mark.anyio
+async def test_problem_gen_workers_share_one_context_cache(monkeypatch):
+    docs = [
+        Document(id="profile", page_content="profile", metadata={"apply_doc_type": "candidate_profile"}),
+        Document(id="career", page_content="Built a payment service. " * 20, metadata={"apply_doc_type": "career_experience"}),
+    ]
+    backend = LocalContextCacheBackend()
+    manager = ContextCacheManager(backend, min_tokens=10)
+    specs, methods, sent, cache_names = [], [], [], []
+
+    class RecordingModel:
+        def __init__(self, cached_content=None):
+            self.cached_content = cached_content
+
+        def bind(self, cached_content=None):
+            return RecordingModel(cached_content)
+
+        async def ainvoke(self, messages, config=None):
+            sent.append(messages)
+            cache_names.append(self.cached_content)
+            return Problem_Contents(contents=[Problem_Content(question="question", explanation="why")])
+
+    async def aget_user_apply_docs(user_id):
+        return docs
+
+    async def anoop(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr(problem_gen_graph, "aget_user_apply_docs", aget_user_apply_docs)
+    monkeypatch.setattr(problem_gen_graph, "adelete_docs_by_any", anoop)
+    monkeypatch.setattr(problem_gen_graph, "aadd_documents", anoop)
+    monkeypatch.setattr(problem_gen_graph, "get_personalized_problems_collection_name", lambda: "problems")
+    monkeypatch.setattr(problem_gen_graph, "get_context_cache", lambda **kwargs: manager)
+    def get_structured_model(spec, schema, method=None):
+        specs.append(spec)
+        methods.append(method)
+        return RecordingModel()
+
+    monkeypatch.setattr(problem_gen_graph, "get_structured_model", get_structured_model)
+
+    await problem_gen_graph.problem_gen_graph.ainvoke(
+        {"user_id": "u1", "experience_ids": ["career"]},
+        {"configurable": {"problem_cache_enabled": False, "context_cache_enabled": True}},
+    )
+
+    assert backend.creates == 1
+    # 캐시 이름은 호출마다 넘기고, 레지스트리 키(ModelSpec)에는 들어가지 않는다.
+    assert len(set(cache_names)) == 1 and "Built a payment service." in backend.get(cache_names[0])
+    assert len(set(specs)) == 1
+    # 컨텍스트 캐시와 함께 쓸 수 없는 function calling 대신 response schema로 구조화한다.
+    assert set(methods) == {"json_schema"}
+    assert len(sent) == 3
+    assert not any(isinstance(message, SystemMessage) for messages in sent for message in messages)
@@ -0,0 +1,80 @@
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from constants.cache import SqliteCacheBackend
+from constants.embedding_cache import CachedEmbeddings
+
+
+class CountingEmbeddings(Embeddings):
+    def __init__(self):
+        self.embedded: list[str] = []
+
+    def _vector(self, text: str) -> list[float]:
+        return [len(text) / 3, 0.1, -1.5]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.embedded.extend(texts)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        self.embedded.append(text)
+        return self._vector(text)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.embed_documents(texts)
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return self.embed_query(text)
+
+
+def test_lru_tier_serves_repeats_and_evicts_the_least_recently_used():
+    underlying = CountingEmbeddings()
+    embeddings = CachedEmbeddings(underlying, "text-embedding-3-small", lru_size=2)
+
+    embeddings.embed_documents(["a", "b", "a"])
+    embeddings.embed_documents(["a"])
+    embeddings.embed_documents(["c"])  # "b"가 가장 오래 쓰이지 않았으므로 밀려난다.
+    embeddings.embed_documents(["a", "b"])
+
+    # 같은 배치 안의 중복은 한 번만 임베딩한다.
+    assert underlying.embedded == ["a", "b", "c", "b"]
+    stats = embeddings.stats()
+    assert (stats["lru_hits"], stats["persistent_hits"], stats["misses"]) == (2, 0, 4)
+    assert stats["lru_entries"] == 2 and stats["lru_bytes"] == 2 * 3 * 4
+
+
+@pytest.mark.anyio
+async def test_persistent_tier_round_trips_float32_vectors(tmp_path):
+    backend = SqliteCacheBackend(tmp_path / "embedding_cache.sqlite")
+    first = CachedEmbeddings(CountingEmbeddings(), "text-embedding-3-small", backend=backend)
+    vectors = await first.aembed_documents(["section one", "section two"])
+    query = await first.aembed_query("section one")
+
+    # 새 프로세스처럼 LRU가 빈 인스턴스도 SQLite에서 같은 벡터를 읽는다.
+    underlying = CountingEmbeddings()
+    second = CachedEmbeddings(underlying, "text-embedding-3-small", backend=backend)
+
+    assert await second.aembed_documents(["section one", "section two"]) == vectors
+    assert await second.aembed_query("section one") == query
+    assert underlying.embedded == []
+    assert second.stats()["persistent_hits"] == 3
+    assert second.stats()["persistent_bytes"] > 0
+    assert "persistent_bytes" not in second.stats(persistent_bytes=False)
+    # float32로 저장되므로 값은 float32 정밀도로 보존된다.
+    assert vectors[0] == pytest.approx([11 / 3, 0.1, -1.5], rel=1e-6)
+    assert vectors[0][2] == -1.5
+
+
+def test_entries_are_isolated_by_model_and_kind(tmp_path):
+    backend = SqliteCacheBackend(tmp_path / "embedding_cache.sqlite")
+    small_underlying, large_underlying = CountingEmbeddings(), CountingEmbeddings()
+    small = CachedEmbeddings(small_underlying, "text-embedding-3-small", backend=backend)
+    large = CachedEmbeddings(large_underlying, "text-embedding-3-large", backend=backend)
+
+    small.embed_documents(["same text"])
+    large.embed_documents(["same text"])
+    small.embed_query("same text")
+
+    assert small_underlying.embedded == ["same text", "same text"]
+    assert large_underlying.embedded == ["same text"]
+    assert small.stats()["persistent_hits"] == 0 and large.stats()["persistent_hits"] == 0
@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from constants.fallback import Backoff, CircuitBreaker, CircuitOpenError, afallback, configure_circuit_breaker, fallback, is_model_failure
+
+pytestmark = pytest.mark.anyio
+
+NO_RETRY = Backoff(base_seconds=0.01, max_rounds=1)
+
+
+class FakeAPIError(Exception):
+    """Like google-genai's APIError: the HTTP status is in `code`."""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(f"{code} {message}")
+        self.code = code
+
+
+class FakeModels:
+    def __init__(self, failing: set[str], error: Exception = FakeAPIError(503, "UNAVAILABLE: The model is overloaded.")):
+        self.failing = failing
+        self.error = error
+        self.calls: list[str] = []
+
+    def invoke(self, model: str) -> str:
+        self.calls.append(model)
+        if model in self.failing:
+            # LangChain 통합은 SDK 오류를 감싸서 다시 던진다.
+            raise RuntimeError(f"Error calling model '{model}'") from self.error
+        return model
+
+    async def ainvoke(self, model: str) -> str:
+        await asyncio.sleep(0)
+        return self.invoke(model)
+
+
+async def test_open_circuit_sends_calls_to_the_next_model_right_away():
+    for model in ("fake-pro", "fake-flash"):
+        configure_circuit_breaker(model, failure_threshold=2, recovery_seconds=60)
+    models = FakeModels(failing={"fake-pro"})
+
+    results = await asyncio.gather(*[afallback(["fake-pro", "fake-flash"], models.ainvoke, NO_RETRY) for _ in range(2)])
+    results += [await afallback(["fake-pro", "fake-flash"], models.ainvoke, NO_RETRY) for _ in range(3)]
+
+    assert results == ["fake-flash"] * 5
+    # 두 번 실패한 뒤에는 회로가 열려 fake-pro를 더 호출하지 않는다.
+    assert models.calls.count("fake-pro") == 2
+
+
+def test_all_circuits_open_fails_fast():
+    for model in ("fake-down", "fake-down-too"):
+        configure_circuit_breaker(model, failure_threshold=1, recovery_seconds=60)
+    models = FakeModels(failing={"fake-down", "fake-down-too"})
+
+    with pytest.raises(RuntimeError, match="fake-down-too"):
+        fallback(["fake-down", "fake-down-too"], models.invoke, Backoff(base_seconds=0.01, max_rounds=3))
+    with pytest.raises(CircuitOpenError):
+        fallback(["fake-down", "fake-down-too"], models.invoke, NO_RETRY)
+    assert models.calls == ["fake-down", "fake-down-too"]
+
+
+def test_single_model_chain_never_opens_a_circuit():
+    configure_circuit_breaker("fake-solo", failure_threshold=1, recovery_seconds=60)
+    models = FakeModels(failing={"fake-solo"})
+
+    for _ in range(3):
+        with pytest.raises(RuntimeError, match="fake-solo"):
+            fallback(["fake-solo"], models.invoke, NO_RETRY)
+    models.failing.clear()
+
+    assert fallback(["fake-solo"], models.invoke, NO_RETRY) == "fake-solo"
+    assert models.calls == ["fake-solo"] * 4
+
+
+def test_bad_requests_are_not_retried_on_other_models():
+    models = FakeModels(failing={"fake-strict"}, error=ValueError("1 validation error for Problem_Contents: internal connection timeout"))
+
+    with pytest.raises(RuntimeError, match="fake-strict"):
+        fallback(["fake-strict", "fake-lenient"], models.invoke, NO_RETRY)
+    assert models.calls == ["fake-strict"]
+
+
+def test_failures_are_classified_by_type_and_status_not_by_message():
+    assert is_model_failure(TimeoutError())
+    assert is_model_failure(FakeAPIError(429, "RESOURCE_EXHAUSTED"))
+    assert not is_model_failure(FakeAPIError(400, "INVALID_ARGUMENT: deadline, timeout, unavailable"))
+    assert not is_model_failure(RuntimeError("The internal connection timed out, says the resume."))
+
+
+def test_half_open_circuit_lets_one_probe_through():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=10, clock=lambda: now[0])
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    now[0] = 11
+    assert breaker.allow() and not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.stats()["opened"] == 1
@@ -0,0 +1,112 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from constants.hedging import HedgeConfig, Hedger, get_hedger
+from constants.llm_invoke import ainvoke_llm, invoke_llm
+
+pytestmark = pytest.mark.anyio
+
+HEDGE = HedgeConfig(percentile=0.9, max_extra_load=0.5, min_delay_seconds=0.02, min_samples=5)
+
+
+class TailLatencyModel:
+    """Answers in 5ms, except that every call listed in `slow_calls` hangs for 2s."""
+
+    def __init__(self, name: str, slow_calls: set[int] = frozenset()):
+        self.name = name
+        self.slow_calls = slow_calls
+        self.calls = 0
+        self.cancelled = 0
+        self._lock = threading.Lock()
+
+    def _next_delay(self) -> float:
+        with self._lock:
+            self.calls += 1
+            return 2.0 if self.calls in self.slow_calls else 0.005
+
+    async def ainvoke(self, messages, config=None):
+        try:
+            await asyncio.sleep(self._next_delay())
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return self.name
+
+    def invoke(self, messages, config=None):
+        time.sleep(self._next_delay())
+        return self.name
+
+
+async def test_slow_calls_are_hedged_and_the_loser_is_cancelled():
+    primary = TailLatencyModel("primary", slow_calls={8})
+    backup = TailLatencyModel("backup")
+
+    results = []
+    started_at = time.perf_counter()
+    for i in range(10):
+        results.append(
+            await ainvoke_llm(primary, "hi", model="fake-hedge-model", hedge=HEDGE, hedge_runnable=backup, hedge_model="fake-hedge-backup")
+        )
+    await asyncio.sleep(0.01)
+
+    assert results[7] == "backup"
+    assert results.count("primary") == 9
+    assert primary.cancelled == 1
+    assert time.perf_counter() - started_at < 1.0
+    stats = get_hedger("fake-hedge-model").stats()
+    assert stats["hedges_fired"] == 1 and stats["hedges_won"] == 1
+
+
+def test_sync_calls_are_hedged_within_the_budget():
+    primary = TailLatencyModel("primary", slow_calls={6, 8})
+    hedge = HedgeConfig(percentile=0.9, max_extra_load=0.01, min_delay_seconds=0.02, min_samples=5)
+
+    started_at = time.perf_counter()
+    results = [invoke_llm(primary, "hi", model="fake-hedge-sync-model", hedge=hedge) for _ in range(7)]
+
+    # 6번째 호출은 같은 모델로 보낸 hedge가 이긴다. 7번째 호출은 예산을 다 써서 hedge하지 않고 끝까지 기다린다.
+    stats = get_hedger("fake-hedge-sync-model").stats()
+    assert results == ["primary"] * 7
+    assert stats["hedges_fired"] == 1 and stats["hedges_won"] == 1
+    assert stats["skipped_for_budget"] == 1
+    assert time.perf_counter() - started_at > 2.0
+
+
+def test_no_hedge_before_enough_samples():
+    assert Hedger().hedge_delay(HEDGE) is None
+
+
+async def test_queue_wait_is_not_counted_as_latency_and_the_hedge_waits_for_its_own_slot(monkeypatch):
+    from constants import llm_invoke
+
+    acquired = []
+
+    class QueuedLimiter:
+        """Every slot is granted after 100ms in the queue."""
+
+        def __init__(self, model):
+            self.model = model
+
+        async def acquire(self, user="", tokens=1):
+            await asyncio.sleep(0.1)
+            acquired.append(self.model)
+            return 0.1
+
+    monkeypatch.setattr(llm_invoke, "get_rate_limiter", QueuedLimiter)
+    primary = TailLatencyModel("primary", slow_calls={8})
+    backup = TailLatencyModel("backup")
+
+    results = []
+    for _ in range(10):
+        results.append(
+            await ainvoke_llm(primary, "hi", model="fake-queued-model", hedge=HEDGE, hedge_runnable=backup, hedge_model="fake-queued-backup")
+        )
+
+    # 대기열 대기(100ms)는 지연 시간에 들어가지 않으므로 hedge 지연은 최소값에 머문다.
+    assert get_hedger("fake-queued-model").hedge_delay(HEDGE) == HEDGE.min_delay_seconds
+    assert results[7] == "backup"
+    assert acquired.count("fake-queued-model") == 10
+    assert acquired.count("fake-queued-backup") == 1
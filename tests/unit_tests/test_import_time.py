@@ -0,0 +1,71 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+# 그래프 모듈 import는 네트워크 연결이나 입력 대기 없이 이 시간 안에 끝나야 한다.
+IMPORT_TIME_BUDGET_SECONDS = float(os.getenv("IMPORT_TIME_BUDGET_SECONDS", "5"))
+
+GRAPH_MODULES = [
+    "constants.vector_store",
+    "constants.supabase",
+    "parsing_graph.parsing_graph",
+    "resume_chat_graph.resume_chat_graph",
+    "problem_gen.graph",
+]
+
+# 외부 연결을 시도하면 바로 실패하도록 socket.connect를 막고 모듈을 import한다.
+IMPORT_SCRIPT = textwrap.dedent(
+    """
+    import importlib
+    import json
+    import socket
+    import sys
+    import time
+
+    def blocked_connect(*args, **kwargs):
+        raise AssertionError(f"Network connection at import time: {args}")
+
+    socket.socket.connect = blocked_connect
+    socket.create_connection = blocked_connect
+
+    started_at = time.perf_counter()
+    importlib.import_module(sys.argv[1])
+    elapsed = time.perf_counter() - started_at
+    print(json.dumps({
+        "elapsed": elapsed,
+        "heavy_modules": [name for name in ["langchain_qdrant", "langchain_openai", "supabase"] if name in sys.modules],
+    }))
+    """
+)
+
+
+def _import_in_subprocess(module_name: str) -> dict:
+    env = {
+        key: value
+        for key, value in os.environ.items()
+        if not key.endswith(("_API_KEY", "_COLLECTION_NAME", "_URL", "_KEY"))
+    }
+    env["PYTHONPATH"] = os.pathsep.join(sys.path)
+    completed = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT, module_name],
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        text=True,
+        env=env,
+        timeout=IMPORT_TIME_BUDGET_SECONDS * 6,
+    )
+    assert completed.returncode == 0, completed.stderr
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize("module_name", GRAPH_MODULES)
+def test_import_has_no_side_effects_and_is_fast(module_name):
+    result = _import_in_subprocess(module_name)
+
+    assert result["elapsed"] < IMPORT_TIME_BUDGET_SECONDS
+    # 클라이언트/임베딩 모델은 처음 사용할 때 만들어진다.
+    assert result["heavy_modules"] == []
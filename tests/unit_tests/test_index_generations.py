@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+from langchain_core.documents import Document
+from qdrant_client import AsyncQdrantClient
+
+from constants import vector_store
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.embedded = []
+
+    async def aembed_documents(self, texts):
+        self.embedded.extend(texts)
+        return [[1.0] * 1536 for _ in texts]
+
+
+@pytest.fixture
+def embeddings(monkeypatch):
+    # 로컬(in-memory) 모드의 AsyncQdrantClient는 필터, 조건부 쓰기, 배치 업데이트를 서버와 같은 의미로 처리한다.
+    client = AsyncQdrantClient(location=":memory:")
+    embeddings = FakeEmbeddings()
+    monkeypatch.setattr(vector_store, "apply_docs_collection_name", "apply_docs")
+    monkeypatch.setattr(vector_store, "personalized_problems_collection_name", "problems")
+    monkeypatch.setattr(vector_store, "index_generations_collection_name", "apply_docs_generations")
+    monkeypatch.setattr(vector_store, "_collections_ready", False)
+    monkeypatch.setattr(vector_store, "get_async_client", lambda: client)
+    monkeypatch.setattr(vector_store, "get_embeddings", lambda: embeddings)
+    return embeddings
+
+
+def _doc(text: str) -> Document:
+    return Document(page_content=text, metadata={"user_id": "u1", "content_hash": text})
+
+
+async def _current_texts(user_id: str = "u1") -> list[str]:
+    points, _ = await vector_store.get_async_client().scroll(
+        "apply_docs", scroll_filter=await vector_store.aget_user_docs_filter(user_id), limit=100, with_payload=True
+    )
+    return sorted(point.payload["page_content"] for point in points)
+
+
+async def _all_texts() -> list[str]:
+    points, _ = await vector_store.get_async_client().scroll("apply_docs", limit=100, with_payload=True)
+    return sorted(point.payload["page_content"] for point in points)
+
+
+async def test_stage_swap_and_gc_keep_only_the_current_generation(embeddings):
+    first = await vector_store.anew_generation("u1")
+    await vector_store.astage_documents("u1", first, [_doc("a"), _doc("b")])
+    assert await _current_texts() == ["a", "b"]  # 포인터가 없는 사용자는 user_id로만 읽는다.
+    assert await vector_store.aset_current_generation("u1", first)
+
+    second = await vector_store.anew_generation("u1")
+    embedded, reused = await vector_store.astage_documents("u1", second, [_doc("a"), _doc("c")], current_generation=first)
+    assert (embedded, reused) == (1, 1)
+    # 전환 전에는 이전 generation이 그대로 보인다.
+    assert await _current_texts() == ["a", "b"]
+
+    assert await vector_store.aset_current_generation("u1", second)
+    assert await _current_texts() == ["a", "c"]
+    await vector_store.agc_generations("u1", second)
+    assert await _all_texts() == ["a", "c"]
+    assert embeddings.embedded == ["a", "b", "c"]
+
+
+async def test_concurrent_allocations_get_distinct_increasing_generations(embeddings):
+    generations = await asyncio.gather(*[vector_store.anew_generation("u1") for _ in range(5)])
+
+    assert sorted(generations) == list(range(1, 6))
+    assert await vector_store.anew_generation("u2") == 1
+
+
+async def test_an_older_generation_can_not_replace_a_newer_pointer(embeddings):
+    older, newer = await vector_store.anew_generation("u1"), await vector_store.anew_generation("u1")
+
+    results = await asyncio.gather(
+        vector_store.aset_current_generation("u1", newer),
+        vector_store.aset_current_generation("u1", older),
+    )
+
+    assert results == [True, False]
+    assert await vector_store.aget_current_generation("u1") == newer
+    assert not await vector_store.aset_current_generation("u1", older)
+    assert await vector_store.aget_current_generation("u1") == newer
+
+
+async def test_gc_uses_the_pointer_it_reads_not_the_generation_it_was_given(embeddings):
+    current = await vector_store.anew_generation("u1")
+    await vector_store.astage_documents("u1", current, [_doc("a"), _doc("b")])
+    await vector_store.aset_current_generation("u1", current)
+    # 새 generation은 기록만 되고 전환되지 않았다(예: 더 새로운 실행에 밀려 전환에 실패).
+    staged = await vector_store.anew_generation("u1")
+    await vector_store.astage_documents("u1", staged, [_doc("c")], current_generation=current)
+
+    await vector_store.agc_generations("u1", staged)
+
+    assert await _current_texts() == ["a", "b"]
+    assert await _all_texts() == ["a", "b", "c"]
+
+
+async def test_gc_sweeps_abandoned_generations_but_keeps_the_newest_allocation(embeddings):
+    current = await vector_store.anew_generation("u1")
+    await vector_store.astage_documents("u1", current, [_doc("a"), _doc("b")])
+    await vector_store.aset_current_generation("u1", current)
+    # 취소된 파싱이 남긴 generation: 기록만 되고 전환되지 않았다.
+    abandoned = await vector_store.anew_generation("u1")
+    await vector_store.astage_documents("u1", abandoned, [_doc("a"), _doc("orphan")], current_generation=current)
+    # 가장 최근 generation은 아직 진행 중일 수 있다.
+    newest = await vector_store.anew_generation("u1")
+    await vector_store.astage_documents("u1", newest, [_doc("c")], current_generation=current)
+
+    await vector_store.agc_generations("u1", current)
+
+    assert await _current_texts() == ["a", "b"]
+    assert await _all_texts() == ["a", "b", "c"]
+    points, _ = await vector_store.get_async_client().scroll("apply_docs", limit=100, with_payload=True)
+    generations = {point.payload["page_content"]: point.payload["metadata"]["generations"] for point in points}
+    assert generations["a"] == [current]
+
+
+async def test_new_generations_continue_after_a_legacy_pointer(embeddings):
+    legacy_generation = 1_700_000_000_000
+    assert await vector_store.aset_current_generation("u1", legacy_generation)
+
+    assert await vector_store.anew_generation("u1") == legacy_generation + 1
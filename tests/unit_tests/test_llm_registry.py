@@ -0,0 +1,54 @@
+import asyncio
+
+from pydantic import BaseModel
+
+from constants.llm_registry import ModelRegistry, ModelSpec, get_chat_model, get_structured_model
+
+
+class Answer(BaseModel):
+    answer: str
+
+
+class CountingChatModel:
+    created = 0
+
+    def __init__(self, model, **kwargs):
+        type(self).created += 1
+        self.model = model
+        self.kwargs = kwargs
+
+    def with_structured_output(self, schema, include_raw=False):
+        return (self, schema, include_raw)
+
+
+def test_models_are_shared_per_spec_and_schema():
+    CountingChatModel.created = 0
+    spec = ModelSpec(model="gemini-2.5-flash", temperature=0.1, timeout=100)
+
+    first = get_structured_model(spec, Answer, factory=CountingChatModel)
+    second = get_structured_model(ModelSpec(model="gemini-2.5-flash", temperature=0.1, timeout=100), Answer, factory=CountingChatModel)
+    raw = get_structured_model(spec, Answer, include_raw=True, factory=CountingChatModel)
+    other = get_chat_model(ModelSpec(model="gemini-2.5-flash", temperature=0.5, timeout=100), factory=CountingChatModel)
+
+    assert first is second
+    assert raw is not first and raw[0] is first[0]
+    assert other is not first[0]
+    assert first[0].kwargs == {"temperature": 0.1, "timeout": 100}
+    assert CountingChatModel.created == 2
+
+
+def test_registry_is_bounded_and_scoped_to_the_event_loop():
+    registry = ModelRegistry(max_models=2)
+    for key in ("a", "b", "a", "c"):
+        registry.get_or_create(key, object)
+
+    assert len(registry) == 2
+    assert registry.stats()["evictions"] == 1
+    # "b"가 가장 오래 쓰이지 않았으므로 먼저 내보내진다.
+    assert registry.get_or_create("a", lambda: None) is not None
+
+    async def create():
+        return get_chat_model(ModelSpec(model="gemini-2.5-flash"), factory=CountingChatModel)
+
+    # google-genai의 async 클라이언트는 이벤트 루프에 묶이므로 루프마다 따로 만든다.
+    assert asyncio.run(create()) is not asyncio.run(create())
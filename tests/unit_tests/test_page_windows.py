@@ -0,0 +1,101 @@
+import io
+
+import pytest
+
+from parsing_graph.page_windows import count_pages, merge_parse_results, split_into_page_windows
+from parsing_graph.schema.schema import CandidateEducation, CandidateProfile, CareerExperience, ProjectExperience, ResumeParseResult
+
+
+def _pdf(pages: int) -> bytes:
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=612, height=792)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def _career(company: str, start_date=None, end_date=None, position=("BE",), tech_stack=("Python",), summary="summary") -> CareerExperience:
+    return CareerExperience(
+        company=company,
+        company_description="",
+        employee_type="EMPLOYEE",
+        start_date=start_date,
+        end_date=end_date,
+        position=list(position),
+        tech_stack=list(tech_stack),
+        summary=summary,
+    )
+
+
+def _education(institution: str) -> CandidateEducation:
+    return CandidateEducation(institution=institution, degree="학사", field_of_study=None, start_date=None, end_date=None, description="")
+
+
+def _result(careers=(), projects=(), objective="", education=()) -> ResumeParseResult:
+    return ResumeParseResult(
+        candidate_profile=CandidateProfile(name="Kim", position="BE", objective=objective, education=list(education)),
+        career_experiences=list(careers),
+        project_experiences=list(projects),
+    )
+
+
+def test_long_documents_are_split_into_overlapping_windows():
+    windows = split_into_page_windows(_pdf(20), window_size=8, overlap=1)
+
+    assert [(window.start, window.end) for window in windows] == [(0, 8), (7, 15), (14, 20)]
+    assert [count_pages(window.data) for window in windows] == [8, 8, 6]
+    assert windows[1].label == "pages 8-15 of 20"
+
+
+def test_short_documents_are_returned_as_one_window():
+    data = _pdf(5)
+
+    windows = split_into_page_windows(data, window_size=8, overlap=1)
+
+    assert len(windows) == 1 and windows[0].data == data and windows[0].label == "pages 1-5 of 5"
+    with pytest.raises(ValueError):
+        split_into_page_windows(data, window_size=2, overlap=2)
+
+
+def test_an_experience_cut_by_a_window_boundary_is_merged():
+    first = _career("(주)카카오", start_date="2020-01", tech_stack=["Python"], summary="short")
+    second = _career("카카오 주식회사", start_date=None, end_date="2022-12", tech_stack=["Python", "Kafka"], summary="a longer summary")
+    project = ProjectExperience(project_name="Side", project_type="PERSONAL", start_date="2021-01", end_date=None, tech_stack=[], summary="s")
+
+    merged = merge_parse_results([
+        _result(careers=[first], projects=[project], education=[_education("서울대학교")]),
+        _result(careers=[second], projects=[project], objective="backend", education=[_education("서울대학교")]),
+    ])
+
+    assert len(merged.career_experiences) == 1
+    career = merged.career_experiences[0]
+    assert (career.start_date, career.end_date) == ("2020-01", "2022-12")
+    assert career.tech_stack == ["Python", "Kafka"] and career.summary == "a longer summary"
+    assert len(merged.project_experiences) == 1
+    assert merged.candidate_profile.objective == "backend"
+    assert len(merged.candidate_profile.education) == 1
+
+
+def test_separate_stints_at_the_same_company_are_kept_apart():
+    merged = merge_parse_results([
+        # 같은 구간에 나온 두 항목은 모델이 따로 추출한 서로 다른 경험이다.
+        _result(careers=[_career("Kakao", start_date="2016-03"), _career("Kakao", start_date=None)]),
+        # 겹치지 않는 구간(0과 2)의 항목은 날짜가 없어도 합치지 않는다.
+        _result(careers=[]),
+        _result(careers=[_career("Kakao", start_date=None)]),
+    ])
+
+    assert len(merged.career_experiences) == 3
+
+
+def test_undated_experiences_with_different_roles_are_kept_apart():
+    merged = merge_parse_results([
+        _result(careers=[_career("Kakao", start_date="2016-03", position=["BE"])]),
+        _result(careers=[_career("Kakao", start_date=None, position=["FE"]), _career("Kakao", start_date="2016-03", end_date="2018-02")]),
+    ])
+
+    assert [career.position for career in merged.career_experiences] == [["BE"], ["FE"]]
+    assert merged.career_experiences[0].end_date == "2018-02"
@@ -0,0 +1,146 @@
+import dataclasses
+import importlib
+import sys
+
+import pytest
+
+from constants.cache import SqliteCacheBackend
+from parsing_graph.cache import ParseCache, build_parse_cache_key
+from parsing_graph.configuration import ConfigSchema
+
+FILE_HASH = "0" * 64
+EMPTY_RESUME = "data:application/pdf;base64,"
+
+
+@pytest.mark.parametrize(
+    "changes",
+    [
+        {"parse_strategy": "page_windows"},
+        {"parse_strategy": "schema_split"},
+        {"career_relevant_document_parse_model": "gemini-2.5-flash"},
+        {"is_resume_model": "gemini-2.5-pro"},
+        {"system_prompt": "another prompt"},
+        {"repair_model": "gemini-2.5-flash"},
+        {"repair_enabled": False},
+        {"is_resume_fallback_models": ["gemini-2.5-flash"]},
+        {"parse_fallback_models": ["anthropic:claude-sonnet-4-20250514"]},
+        {"adaptive_parse_policy": True},
+        {"pdf_slim_enabled": True},
+        {"stream_parse": True},
+        {"hedge_enabled": True},
+    ],
+)
+def test_every_output_affecting_setting_changes_the_key(changes):
+    configurable = ConfigSchema()
+
+    assert build_parse_cache_key(FILE_HASH, dataclasses.replace(configurable, **changes)) != build_parse_cache_key(FILE_HASH, configurable)
+
+
+@pytest.mark.parametrize(
+    "strategy, changes",
+    [
+        ("page_windows", {"page_window_size": 4}),
+        ("page_windows", {"page_window_overlap": 2}),
+        ("page_windows", {"page_window_min_pages": 6}),
+        ("schema_split", {"career_parse_model": "gemini-2.5-flash"}),
+        ("schema_split", {"profile_parse_thinking_budget": 1024}),
+        ("schema_split", {"project_parse_max_output_tokens": 4096}),
+    ],
+)
+def test_strategy_settings_change_the_key_of_their_strategy(strategy, changes):
+    configurable = ConfigSchema(parse_strategy=strategy)
+
+    assert build_parse_cache_key(FILE_HASH, dataclasses.replace(configurable, **changes)) != build_parse_cache_key(FILE_HASH, configurable)
+
+
+@pytest.mark.parametrize(
+    "enabled, changes",
+    [
+        ({"pdf_slim_enabled": True}, {"pdf_slim_jpeg_quality": 60}),
+        ({"pdf_slim_enabled": True}, {"pdf_slim_strip_fonts": True}),
+        ({"hedge_enabled": True}, {"hedge_model": "gemini-2.5-flash"}),
+    ],
+)
+def test_enabled_feature_settings_change_the_key(enabled, changes):
+    configurable = ConfigSchema(**enabled)
+
+    assert build_parse_cache_key(FILE_HASH, dataclasses.replace(configurable, **changes)) != build_parse_cache_key(FILE_HASH, configurable)
+
+
+def test_settings_that_do_not_affect_the_output_keep_the_key():
+    configurable = ConfigSchema()
+    unrelated = dataclasses.replace(configurable, page_window_size=4, career_parse_model="gemini-2.5-flash", hedge_model="gemini-2.5-flash")
+
+    assert build_parse_cache_key(FILE_HASH, unrelated) == build_parse_cache_key(FILE_HASH, configurable)
+    assert build_parse_cache_key("1" * 64, configurable) != build_parse_cache_key(FILE_HASH, configurable)
+
+
+class CountingStructuredLLM:
+    def __init__(self, schema, calls):
+        self.schema = schema
+        self.calls = calls
+
+    async def ainvoke(self, messages, config=None):
+        from parsing_graph.schema.is_resume import IsResumeResult
+        from parsing_graph.schema.schema import CandidateProfile, ResumeParseResult
+
+        self.calls.append(self.schema.__name__)
+        if self.schema is IsResumeResult:
+            return IsResumeResult(is_resume=True, reason="stub")
+        parsed = ResumeParseResult(candidate_profile=CandidateProfile(name="stub", position="BE", objective="stub"))
+        return {"raw": None, "parsed": parsed, "parsing_error": None}
+
+
+@pytest.mark.anyio
+async def test_graph_serves_a_hit_and_misses_when_the_config_changes(monkeypatch, tmp_path):
+    monkeypatch.setenv("GOOGLE_API_KEY", "test")
+    importlib.import_module("parsing_graph.parsing_graph")
+    pg = sys.modules["parsing_graph.parsing_graph"]
+    calls: list[str] = []
+    parse_cache = ParseCache(SqliteCacheBackend(tmp_path / "parse_cache.sqlite"))
+
+    class StubChatModel:
+        def __init__(self, model, **kwargs):
+            pass
+
+        def with_structured_output(self, schema, include_raw=False):
+            return CountingStructuredLLM(schema, calls)
+
+    async def stub_aget_current_generation(user_id):
+        return None
+
+    async def stub_astage_documents(user_id, generation, documents, current_generation=None):
+        return len(documents), 0
+
+    async def stub_anew_generation(user_id):
+        return 1
+
+    async def stub_aset_current_generation(user_id, generation):
+        return True
+
+    monkeypatch.setattr(pg, "ChatGoogleGenerativeAI", StubChatModel)
+    monkeypatch.setattr(pg, "_get_parse_cache", lambda configurable: parse_cache)
+    monkeypatch.setattr(pg, "aget_current_generation", stub_aget_current_generation)
+    monkeypatch.setattr(pg, "astage_documents", stub_astage_documents)
+    monkeypatch.setattr(pg, "aset_current_generation", stub_aset_current_generation)
+    monkeypatch.setattr(pg, "anew_generation", stub_anew_generation)
+    monkeypatch.setattr(pg, "schedule_generation_gc", lambda user_id, generation: None)
+
+    async def run(configurable):
+        return await pg.parsing_graph.ainvoke(
+            {"user_id": "user", "resume_file_path": EMPTY_RESUME},
+            {"configurable": {"parse_cache_enabled": True, **configurable}},
+        )
+
+    first = await run({})
+    assert first["error"] is None and not first["parse_cache_hit"]
+    assert calls == ["IsResumeResult", "ResumeParseResult"]
+
+    second = await run({})
+    assert second["error"] is None and second["parse_cache_hit"]
+    assert second["parsed_result"] == first["parsed_result"]
+    assert len(calls) == 2
+
+    third = await run({"parse_fallback_models": ["gemini-2.5-flash"]})
+    assert third["error"] is None and not third["parse_cache_hit"]
+    assert len(calls) == 4
@@ -0,0 +1,63 @@
+import importlib
+import io
+from types import SimpleNamespace
+
+import pytest
+
+from parsing_graph.configuration import ConfigSchema, DocumentFeatures, select_parse_policy
+from parsing_graph.pre_classifier import extract_document_features
+
+
+def test_policy_scales_with_document_size():
+    configurable = ConfigSchema(adaptive_parse_policy=True)
+
+    one_page_cv = select_parse_policy(DocumentFeatures(page_count=1, text_chars=3000, image_count=0), configurable)
+    scanned_cv = select_parse_policy(DocumentFeatures(page_count=1, text_chars=0, image_count=1), configurable)
+    portfolio = select_parse_policy(DocumentFeatures(page_count=40, text_chars=20000, image_count=60), configurable)
+
+    assert (one_page_cv.tier, one_page_cv.model) == ("light", configurable.light_parse_model)
+    assert one_page_cv.timeout < portfolio.timeout
+    assert scanned_cv.tier == "standard"
+    assert (portfolio.tier, portfolio.model) == ("heavy", configurable.career_relevant_document_parse_model)
+
+
+def test_policy_falls_back_to_heavy_and_escalates_on_retry():
+    features = DocumentFeatures(page_count=1, text_chars=3000, image_count=0)
+
+    adaptive = ConfigSchema(adaptive_parse_policy=True)
+
+    assert select_parse_policy(features, ConfigSchema()).reason == "adaptive policy disabled"
+    no_features = select_parse_policy(None, adaptive)
+    assert (no_features.tier, no_features.model, no_features.reason) == ("heavy", adaptive.career_relevant_document_parse_model, "no document features")
+    assert select_parse_policy(features, adaptive, attempt=1).tier == "standard"
+    assert select_parse_policy(features, adaptive, attempt=5).tier == "heavy"
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("mime_type, data", [("application/pdf", b"not a pdf"), ("image/png", b"\x89PNG")])
+async def test_unreadable_documents_use_the_heavy_tier(monkeypatch, mime_type, data):
+    monkeypatch.setenv("GOOGLE_API_KEY", "test")
+    pg = importlib.import_module("parsing_graph.parsing_graph")
+
+    async def aget_resume_file(path, file_hash):
+        return SimpleNamespace(mime_type=mime_type, data=data)
+
+    monkeypatch.setattr(pg, "aget_resume_file", aget_resume_file)
+    state = pg.ParsingState(user_id="u1", resume_file_path="resume.pdf")
+
+    policy = await pg._aselect_parse_policy(state, ConfigSchema(adaptive_parse_policy=True))
+
+    assert (policy.tier, policy.reason) == ("heavy", "no document features")
+
+
+def test_features_are_read_without_rendering():
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    for _ in range(3):
+        writer.add_blank_page(width=612, height=792)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+
+    assert extract_document_features(buffer.getvalue()) == DocumentFeatures(page_count=3, text_chars=0, image_count=0)
+    assert extract_document_features(b"not a pdf") is None
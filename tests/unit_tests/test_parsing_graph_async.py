@@ -0,0 +1,117 @@
+import asyncio
+import gc
+import importlib
+import sys
+import time
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+EMPTY_RESUME = "data:application/pdf;base64,"
+
+N_RUNS = 50
+STUB_LLM_LATENCY = 0.2
+MAX_LOOP_LAG = 0.1
+
+
+@pytest.fixture
+def parsing_graph_module(monkeypatch):
+    # constants.vector_store는 import 시점에 Qdrant에 연결하지 않으므로, 실제 모듈을 그대로 import한다.
+    monkeypatch.setenv("GOOGLE_API_KEY", "test")
+    importlib.import_module("parsing_graph.parsing_graph")
+    # 서버 lifespan처럼, import 시점에 만들어진 객체를 full GC 대상에서 빼 둔다.
+    gc.collect()
+    gc.freeze()
+    yield sys.modules["parsing_graph.parsing_graph"]
+    gc.unfreeze()
+
+
+class StubStructuredLLM:
+    def __init__(self, schema, include_raw=False):
+        self.schema = schema
+        self.include_raw = include_raw
+
+    def invoke(self, *args, **kwargs):
+        raise AssertionError("Synchronous invoke blocks the event loop.")
+
+    async def ainvoke(self, messages, config=None):
+        from parsing_graph.schema.is_resume import IsResumeResult
+        from parsing_graph.schema.schema import CandidateProfile, ResumeParseResult
+
+        await asyncio.sleep(STUB_LLM_LATENCY)
+        if self.schema is IsResumeResult:
+            return IsResumeResult(is_resume=True, reason="stub")
+        parsed = ResumeParseResult(candidate_profile=CandidateProfile(name="stub", position="BE", objective="stub"))
+        if self.include_raw:
+            return {"raw": None, "parsed": parsed, "parsing_error": None}
+        return parsed
+
+
+class StubChatModel:
+    def __init__(self, model, **kwargs):
+        self.model = model
+
+    def with_structured_output(self, schema, include_raw=False):
+        return StubStructuredLLM(schema, include_raw)
+
+
+async def _measure_loop_lag(stop: asyncio.Event, lags: list[float]) -> None:
+    loop = asyncio.get_running_loop()
+    interval = 0.01
+    while not stop.is_set():
+        started_at = loop.time()
+        await asyncio.sleep(interval)
+        lags.append(loop.time() - started_at - interval)
+
+
+@pytest.mark.parametrize("speculative_parse", [False, True])
+async def test_concurrent_runs_never_block_event_loop(parsing_graph_module, monkeypatch, speculative_parse):
+    stored = []
+
+    async def stub_aget_current_generation(user_id):
+        await asyncio.sleep(0.01)
+        return None
+
+    async def stub_astage_documents(user_id, generation, documents, current_generation=None):
+        await asyncio.sleep(0.01)
+        stored.append(user_id)
+        return len(documents), 0
+
+    async def stub_anew_generation(user_id):
+        return 1
+
+    async def stub_aset_current_generation(user_id, generation):
+        await asyncio.sleep(0.01)
+        return True
+
+    monkeypatch.setattr(parsing_graph_module, "ChatGoogleGenerativeAI", StubChatModel)
+    monkeypatch.setattr(parsing_graph_module, "aget_current_generation", stub_aget_current_generation)
+    monkeypatch.setattr(parsing_graph_module, "astage_documents", stub_astage_documents)
+    monkeypatch.setattr(parsing_graph_module, "aset_current_generation", stub_aset_current_generation)
+    monkeypatch.setattr(parsing_graph_module, "anew_generation", stub_anew_generation)
+    monkeypatch.setattr(parsing_graph_module, "schedule_generation_gc", lambda user_id, generation: None)
+
+    config = {"configurable": {"parse_cache_enabled": False, "speculative_parse": speculative_parse}}
+    stop = asyncio.Event()
+    lags: list[float] = []
+    monitor = asyncio.create_task(_measure_loop_lag(stop, lags))
+
+    started_at = time.perf_counter()
+    results = await asyncio.gather(
+        *[
+            parsing_graph_module.parsing_graph.ainvoke(
+                {"user_id": f"user-{i}", "resume_file_path": EMPTY_RESUME}, config
+            )
+            for i in range(N_RUNS)
+        ]
+    )
+    elapsed = time.perf_counter() - started_at
+    stop.set()
+    await monitor
+
+    assert all(result["error"] is None for result in results)
+    assert len(stored) == N_RUNS
+    assert max(lags) < MAX_LOOP_LAG
+    # 순차 실행이라면 N_RUNS * 2 * STUB_LLM_LATENCY(= 20초)가 걸린다.
+    assert elapsed < N_RUNS * STUB_LLM_LATENCY / 2
@@ -0,0 +1,96 @@
+import asyncio
+import io
+import random
+import zlib
+
+import pytest
+
+from parsing_graph.page_windows import count_pages
+from parsing_graph.pdf_slim import SlimOptions, slim_pdf
+
+
+def _portfolio_pdf(pages: int = 3) -> bytes:
+    """Every page shows the same large lossless screenshot, as exported portfolios often do."""
+    import pikepdf
+
+    pdf = pikepdf.new()
+    pdf.docinfo["/Producer"] = "Keynote"
+    width, height = 1200, 900
+    pixels = random.Random(0).randbytes(width * height * 3)
+    for _ in range(pages):
+        pdf.add_blank_page(page_size=(612, 792))
+        page = pdf.pages[-1]
+        image = pikepdf.Stream(pdf, zlib.compress(pixels), Type=pikepdf.Name.XObject, Subtype=pikepdf.Name.Image)
+        image.Width, image.Height = width, height
+        image.ColorSpace, image.BitsPerComponent = pikepdf.Name.DeviceRGB, 8
+        image.Filter = pikepdf.Name.FlateDecode
+        page.Resources = pikepdf.Dictionary(XObject=pikepdf.Dictionary(Im0=image))
+        page.Contents = pikepdf.Stream(pdf, b"q 500 0 0 375 50 300 cm /Im0 Do Q")
+    buffer = io.BytesIO()
+    pdf.save(buffer)
+    return buffer.getvalue()
+
+
+def test_slimming_downsamples_and_deduplicates_images():
+    # pikepdf/Pillow는 수집 단계가 아니라 테스트 안에서 import해, 다른 테스트의 힙(GC 시간)을 키우지 않는다.
+    import pikepdf
+    from PIL import Image
+
+    data = _portfolio_pdf()
+
+    result = slim_pdf(data, SlimOptions(max_image_dimension=400))
+
+    assert result.slim_bytes < result.original_bytes / 3
+    assert result.images_recompressed == 1
+    assert result.images_deduplicated == 2
+    assert count_pages(result.data) == 3
+    with pikepdf.open(io.BytesIO(result.data)) as pdf:
+        image = pikepdf.PdfImage(pdf.pages[2].Resources.XObject.Im0)
+        assert max(image.width, image.height) == 400
+        assert isinstance(image.as_pil_image(), Image.Image)
+        assert "/Producer" not in pdf.docinfo
+
+
+def test_unreadable_files_are_returned_unchanged():
+    result = slim_pdf(b"not a pdf")
+
+    assert result.data == b"not a pdf"
+    assert result.bytes_saved == 0
+
+
+@pytest.mark.anyio
+async def test_slimmed_copies_never_replace_the_original_entry(monkeypatch):
+    import hashlib
+    import importlib
+    import sys
+
+    from langchain_core.runnables import RunnableLambda
+
+    from parsing_graph.resume_file import ResumeFile, resume_file_store
+    from parsing_graph.state import ParsingState
+
+    monkeypatch.setenv("GOOGLE_API_KEY", "test")
+    importlib.import_module("parsing_graph.parsing_graph")
+    pg = sys.modules["parsing_graph.parsing_graph"]
+    data = _portfolio_pdf()
+    original = ResumeFile(sha256=hashlib.sha256(data).hexdigest(), data=data)
+    resume_file_store.put(original)
+    state = ParsingState(resume_file_path="portfolio.pdf", resume_file_hash=original.sha256)
+
+    async def slim(configurable):
+        return await RunnableLambda(pg.slim_resume_file_node).ainvoke(state, {"configurable": configurable})
+
+    small, large, disabled = await asyncio.gather(
+        slim({"pdf_slim_enabled": True, "pdf_slim_max_image_dimension": 400}),
+        slim({"pdf_slim_enabled": True, "pdf_slim_max_image_dimension": 800}),
+        slim({"pdf_slim_enabled": False}),
+    )
+
+    # 원본 엔트리는 그대로이고, 경량화 설정마다 별도의 엔트리가 생긴다.
+    assert resume_file_store.get(original.sha256) is original
+    assert disabled == {}
+    assert small["model_file_key"] != large["model_file_key"]
+    assert all(key.startswith(f"{original.sha256}:slim-") for key in (small["model_file_key"], large["model_file_key"]))
+    small_file, large_file = resume_file_store.get(small["model_file_key"]), resume_file_store.get(large["model_file_key"])
+    assert small_file.sha256 == large_file.sha256 == original.sha256
+    assert len(small_file.data) < len(large_file.data) < len(data)
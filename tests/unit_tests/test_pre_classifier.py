@@ -0,0 +1,57 @@
+import importlib
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+from parsing_graph.pre_classifier import PreClassification, classify_text, evaluate, pre_classify
+
+FIXTURES = Path(__file__).parent / "fixtures" / "is_resume_samples.jsonl"
+
+
+def _load_samples() -> list[tuple[str, bool]]:
+    with FIXTURES.open(encoding="utf-8") as f:
+        return [(row["text"], row["is_resume"]) for row in map(json.loads, f)]
+
+
+def test_confident_decisions_are_correct_on_labeled_fixtures():
+    report = evaluate(_load_samples())
+
+    # 확신이 높은 판정만 LLM을 건너뛰므로, 판정한 문서는 틀리면 안 된다.
+    assert report["precision"] == 1.0
+    assert report["rejection_precision"] == 1.0
+    assert report["recall"] >= 0.8
+    assert report["coverage"] >= 0.7
+    assert report["latency_saved_seconds"] > 0
+
+
+def test_documents_without_text_layer_are_left_to_the_model():
+    assert classify_text("").is_resume is None
+    assert classify_text("홍길동 이력서 010-1234-5678").is_resume is None
+    # 스캔 PDF나 PDF가 아닌 파일은 텍스트 레이어를 읽을 수 없다.
+    assert pre_classify(b"not a pdf").is_resume is None
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("is_resume, skips_llm", [(True, True), (False, False), (None, False)])
+async def test_only_accepted_documents_skip_the_is_resume_model(monkeypatch, is_resume, skips_llm):
+    monkeypatch.setenv("GOOGLE_API_KEY", "test")
+    pg = importlib.import_module("parsing_graph.parsing_graph")
+
+    async def aget_resume_file(path, file_hash):
+        return SimpleNamespace(data=b"%PDF")
+
+    verdict = PreClassification(is_resume=is_resume, score=0, matched_signals=("-job_posting",), text_chars=500)
+    monkeypatch.setattr(pg, "aget_resume_file", aget_resume_file)
+    monkeypatch.setattr(pg, "pre_classify", lambda data, **kwargs: verdict)
+
+    node = RunnableLambda(pg.pre_classify_node)
+    state = pg.ParsingState(user_id="u1", resume_file_path="resume.pdf")
+
+    # 사전 분류는 opt-in이다.
+    assert await node.ainvoke(state, {"configurable": {}}) == {}
+    update = await node.ainvoke(state, {"configurable": {"pre_classify_enabled": True}})
+
+    assert ("is_resume_result" in update) is skips_llm
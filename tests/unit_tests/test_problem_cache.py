@@ -0,0 +1,92 @@
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+from constants.cache import SqliteCacheBackend
+from problem_gen import graph as problem_gen_graph
+from problem_gen.cache import ProblemCache
+from problem_gen.schema import Problem_Content, Problem_Contents
+from problem_gen.state import Document_with_Id
+
+pytestmark = pytest.mark.anyio
+
+CACHED = {"configurable": {"problem_cache_enabled": True}}
+
+
+class UnavailableError(Exception):
+    code = 503
+
+
+class CountingProblemModel:
+    calls: list[str] = []
+    failing: set[str] = set()
+
+    def __init__(self, model: str):
+        self.model = model
+
+    async def ainvoke(self, messages, config=None):
+        type(self).calls.append(self.model)
+        if self.model in self.failing:
+            raise UnavailableError(f"{self.model} is unavailable")
+        return Problem_Contents(contents=[Problem_Content(question=f"{self.model} question {len(self.calls)}", explanation="why")])
+
+
+@pytest.fixture
+def problem_cache(tmp_path, monkeypatch):
+    cache = ProblemCache(SqliteCacheBackend(tmp_path / "problem_cache.sqlite3"))
+    monkeypatch.setattr(problem_gen_graph, "get_problem_cache", lambda **kwargs: cache)
+    monkeypatch.setattr(problem_gen_graph, "get_structured_model", lambda spec, schema: CountingProblemModel(spec.model))
+    CountingProblemModel.calls = []
+    CountingProblemModel.failing = set()
+    return cache
+
+
+def _state(problem_type: str, experience: str) -> dict:
+    return {
+        "problem_type": problem_type,
+        "candidate_profile": Document_with_Id(id="profile", page_content="", metadata={"candidate_name": "Kim", "user_id": "u1"}),
+        "experience": Document_with_Id(id="experience", page_content=experience, metadata={}),
+    }
+
+
+async def _problem_gen(state: dict, config: dict) -> dict:
+    # ConfigSchema는 실행 중인 runnable의 config를 읽으므로 RunnableLambda로 감싸 호출한다.
+    return await RunnableLambda(problem_gen_graph.problem_gen).ainvoke(state, config)
+
+
+async def test_unchanged_inputs_skip_the_llm(problem_cache):
+    first = await _problem_gen(_state("tech", "Built a payment service."), CACHED)
+    second = await _problem_gen(_state("tech", "Built a payment service."), CACHED)
+    edited = await _problem_gen(_state("tech", "Built a payment service in Go."), CACHED)
+    other_type = await _problem_gen(_state("cowork", "Built a payment service."), CACHED)
+
+    assert len(CountingProblemModel.calls) == 3
+    assert second["problems"][0]["content"] == first["problems"][0]["content"]
+    assert edited["problems"][0]["content"][0].question.endswith("question 2")
+    assert other_type["problems"][0]["content"][0].question.endswith("question 3")
+    assert problem_cache.stats()["by_problem_type"] == {
+        "cowork": {"hits": 0, "misses": 1, "hit_rate": 0.0},
+        "tech": {"hits": 1, "misses": 2, "hit_rate": 0.3333},
+    }
+
+
+async def test_cache_is_off_by_default(problem_cache):
+    await _problem_gen(_state("tech", "Built a payment service."), {"configurable": {}})
+    await _problem_gen(_state("tech", "Built a payment service."), {"configurable": {}})
+
+    assert len(CountingProblemModel.calls) == 2
+    assert problem_cache.stats()["by_problem_type"] == {}
+
+
+async def test_fallback_results_are_not_served_as_the_primary_models(problem_cache):
+    config = {"configurable": {**CACHED["configurable"], "tech_problem_gen_model": "fake-primary", "problem_gen_fallback_models": ["fake-backup"]}}
+    CountingProblemModel.failing = {"fake-primary"}
+    fell_back = await _problem_gen(_state("tech", "Built a payment service."), config)
+
+    CountingProblemModel.failing = set()
+    recovered = await _problem_gen(_state("tech", "Built a payment service."), config)
+    cached = await _problem_gen(_state("tech", "Built a payment service."), config)
+
+    assert fell_back["problems"][0]["content"][0].question.startswith("fake-backup")
+    assert recovered["problems"][0]["content"][0].question.startswith("fake-primary")
+    assert cached["problems"][0]["content"] == recovered["problems"][0]["content"]
+    assert CountingProblemModel.calls == ["fake-primary", "fake-backup", "fake-primary"]
@@ -0,0 +1,136 @@
+import asyncio
+
+import pytest
+from langchain_core.documents import Document
+
+from problem_gen import graph as problem_gen_graph
+from problem_gen.schema import Problem_Content, Problem_Contents, Problem_Set
+
+pytestmark = pytest.mark.anyio
+
+
+class SlowProblemModel:
+    """Records how many problem_gen workers call the model at the same time."""
+
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+        self.configs = []
+
+    async def ainvoke(self, messages, config=None):
+        self.configs.append(config)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.05)
+        self.running -= 1
+        return Problem_Contents(contents=[Problem_Content(question="question", explanation="why")])
+
+
+def _patch_vector_store(monkeypatch, docs, loads=None, deletes=None, adds=None):
+    async def aget_user_apply_docs(user_id):
+        if loads is not None:
+            loads.append(user_id)
+        return docs
+
+    async def adelete_docs_by_any(key, values, collection_name=None):
+        if deletes is not None:
+            deletes.append(values)
+
+    async def aadd_documents(documents, ids, collection_name=None):
+        if adds is not None:
+            adds.append(documents)
+        return ids
+
+    monkeypatch.setattr(problem_gen_graph, "aget_user_apply_docs", aget_user_apply_docs)
+    monkeypatch.setattr(problem_gen_graph, "adelete_docs_by_any", adelete_docs_by_any)
+    monkeypatch.setattr(problem_gen_graph, "aadd_documents", aadd_documents)
+    monkeypatch.setattr(problem_gen_graph, "get_personalized_problems_collection_name", lambda: "problems")
+
+
+async def test_batch_mode_loads_the_profile_once_and_upserts_once(monkeypatch):
+    docs = [
+        Document(id="profile", page_content="profile", metadata={"apply_doc_type": "candidate_profile", "candidate_name": "Kim"}),
+        Document(id="career", page_content="career", metadata={"apply_doc_type": "career_experience"}),
+        Document(id="project", page_content="project", metadata={"apply_doc_type": "project_experience"}),
+    ]
+    loads, deletes, adds = [], [], []
+    model = SlowProblemModel()
+    _patch_vector_store(monkeypatch, docs, loads, deletes, adds)
+    monkeypatch.setattr(problem_gen_graph, "get_structured_model", lambda spec, schema: model)
+
+    result = await problem_gen_graph.problem_gen_graph.ainvoke(
+        {"user_id": "u1", "all_experiences": True},
+        {"configurable": {"problem_cache_enabled": False, "batch_max_concurrency": 2}},
+    )
+
+    assert loads == ["u1"]
+    assert deletes == [["career", "project"]]
+    assert len(adds) == 1
+    assert sorted({doc.metadata["experience_id"] for doc in adds[0]}) == ["career", "project"]
+    assert len(adds[0]) == 6
+    assert model.max_running == 2
+    assert result["batch_report"]["experiences"] == 2 and result["batch_report"]["problems"] == 6
+    # 노드의 config가 LLM 호출까지 전달된다.
+    assert {config["metadata"]["langgraph_node"] for config in model.configs} == {"problem_gen"}
+
+
+async def test_single_call_mode_generates_every_type_in_one_call(monkeypatch):
+    docs = [
+        Document(id="profile", page_content="profile", metadata={"apply_doc_type": "candidate_profile"}),
+        Document(id="career", page_content="career", metadata={"apply_doc_type": "career_experience"}),
+        Document(id="project", page_content="project", metadata={"apply_doc_type": "project_experience"}),
+    ]
+    schemas, deletes, adds = [], [], []
+    problem = Problem_Content(question="question", explanation="why")
+
+    class ProblemSetModel:
+        async def ainvoke(self, messages, config=None):
+            return Problem_Set(experience=[problem], tech=[problem, problem], cowork=[problem])
+
+    _patch_vector_store(monkeypatch, docs, deletes=deletes, adds=adds)
+    monkeypatch.setattr(problem_gen_graph, "get_structured_model", lambda spec, schema: schemas.append(schema) or ProblemSetModel())
+
+    result = await problem_gen_graph.problem_gen_graph.ainvoke(
+        {"user_id": "u1", "experience_ids": ["project"]},
+        {"configurable": {"problem_cache_enabled": False, "problem_gen_mode": "single_call"}},
+    )
+
+    # 경험 하나에 한 번의 호출(+ hedge용 runnable 조회)만 한다.
+    assert set(schemas) == {Problem_Set}
+    assert [problems["problem_type"] for problems in result["problems"]] == ["experience", "tech", "cowork"]
+    assert [doc.metadata["problem_type"] for doc in adds[0]] == ["experience", "tech", "tech", "cowork"]
+    # 단일 경험 경로도 이전 문제를 experience_id 필터로 지운다.
+    assert deletes == [["project"]]
+    assert {doc.metadata["experience_id"] for doc in adds[0]} == {"project"}
+
+
+async def test_cancelling_a_run_cancels_the_in_flight_llm_calls(monkeypatch):
+    docs = [
+        Document(id="profile", page_content="profile", metadata={"apply_doc_type": "candidate_profile"}),
+        Document(id="career", page_content="career", metadata={"apply_doc_type": "career_experience"}),
+    ]
+    started, cancelled = [], []
+
+    class HangingModel:
+        async def ainvoke(self, messages, config=None):
+            started.append(messages)
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.append(messages)
+                raise
+
+    _patch_vector_store(monkeypatch, docs)
+    monkeypatch.setattr(problem_gen_graph, "get_structured_model", lambda spec, schema: HangingModel())
+
+    run = asyncio.create_task(problem_gen_graph.problem_gen_graph.ainvoke(
+        {"user_id": "u1", "all_experiences": True},
+        {"configurable": {"problem_cache_enabled": False}},
+    ))
+    while len(started) < 3:
+        await asyncio.sleep(0.01)
+    run.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await run
+
+    assert len(cancelled) == 3
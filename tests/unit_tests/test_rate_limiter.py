@@ -0,0 +1,115 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from constants import llm_invoke
+from constants.llm_invoke import ainvoke_llm, invoke_llm
+from constants.rate_limiter import configure_rate_limit, get_rate_limiter
+
+pytestmark = pytest.mark.anyio
+
+RPM = 1200  # 20 requests/s
+BURST = 5
+
+
+class QuotaError(Exception):
+    """Like google-genai's ClientError: the HTTP status is in `code`."""
+
+    code = 429
+
+
+class FakeQuotaModel:
+    """Rejects calls like the Gemini API does once more than `rpm` requests/min (after a burst) arrive."""
+
+    def __init__(self, rpm: int, burst: int):
+        self.rpm = rpm
+        self.burst = burst
+        self.started_at = time.monotonic()
+        self.accepted = 0
+        self.rejected = 0
+        self.calls: list[str] = []
+        self._lock = threading.Lock()
+
+    def _admit(self, messages) -> str:
+        with self._lock:
+            allowed = self.burst + (time.monotonic() - self.started_at) * self.rpm / 60
+            if self.accepted + 1 > allowed:
+                self.rejected += 1
+                raise QuotaError("429 RESOURCE_EXHAUSTED: Quota exceeded for requests per minute.")
+            self.accepted += 1
+            self.calls.append(messages)
+            return messages
+
+    async def ainvoke(self, messages, config=None):
+        await asyncio.sleep(0.001)
+        return self._admit(messages)
+
+    def invoke(self, messages, config=None):
+        return self._admit(messages)
+
+
+async def test_calls_wait_for_a_slot_instead_of_hitting_the_quota():
+    configure_rate_limit("fake-quota-model", rpm=RPM)
+    limiter = get_rate_limiter("fake-quota-model")
+    limiter._requests = BURST
+    model = FakeQuotaModel(rpm=RPM, burst=BURST)
+
+    async def call(user: str, i: int):
+        return await ainvoke_llm(model, f"{user}-{i}", model="fake-quota-model", user_id=user, max_quota_retries=0)
+
+    # sync 노드(스레드)와 async 노드가 같은 limiter를 공유한다.
+    thread_results = []
+    thread = threading.Thread(
+        target=lambda: thread_results.extend(
+            invoke_llm(model, f"sync-{i}", model="google_genai:fake-quota-model", user_id="sync", max_quota_retries=0) for i in range(3)
+        )
+    )
+    thread.start()
+    results = await asyncio.gather(*[call(user, i) for user in ("a", "b", "c") for i in range(5)])
+    await asyncio.to_thread(thread.join)
+
+    assert model.rejected == 0
+    assert len(results) + len(thread_results) == 18
+    stats = limiter.stats()
+    assert stats["throttled"] > 0
+    assert stats["queue_depth"] == 0
+    assert stats["max_queue_depth"] >= 10
+
+
+async def test_users_are_served_round_robin():
+    configure_rate_limit("fake-fair-model", rpm=RPM)
+    get_rate_limiter("fake-fair-model")._requests = 0
+    model = FakeQuotaModel(rpm=RPM, burst=RPM)
+
+    async def call(user: str, i: int):
+        return await ainvoke_llm(model, f"{user}-{i}", model="fake-fair-model", user_id=user)
+
+    heavy = [asyncio.create_task(call("heavy", i)) for i in range(12)]
+    await asyncio.sleep(0)
+    light = [asyncio.create_task(call("light", i)) for i in range(2)]
+    await asyncio.gather(*heavy, *light)
+
+    # 먼저 12건을 넣은 사용자가 있어도, 나중에 온 사용자의 요청이 번갈아 처리된다.
+    assert model.calls.index("light-1") <= 4
+
+
+async def test_quota_errors_pause_the_limiter_and_retry(monkeypatch):
+    monkeypatch.setattr(llm_invoke, "QUOTA_BACKOFF_SECONDS", 0.05)
+    configure_rate_limit("fake-unlimited-model")
+    model = FakeQuotaModel(rpm=RPM, burst=0)
+
+    result = await ainvoke_llm(model, "hello", model="fake-unlimited-model", user_id="a")
+
+    assert result == "hello"
+    assert model.rejected >= 1
+    assert get_rate_limiter("fake-unlimited-model").stats()["pauses"] >= 1
+
+
+def test_quota_errors_are_classified_by_status_not_message():
+    wrapped = RuntimeError("ChatGoogleGenerativeAIError")
+    wrapped.__cause__ = QuotaError("Resource has been exhausted")
+
+    assert llm_invoke.is_quota_error(wrapped)
+    assert not llm_invoke.is_quota_error(ValueError("field 'quota_429' is required"))
@@ -0,0 +1,93 @@
+import importlib
+import sys
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+
+from parsing_graph.repair import raw_output_text
+from parsing_graph.schema.schema import CandidateProfile, ResumeParseResult
+from parsing_graph.state import ParsingState
+
+pytestmark = pytest.mark.anyio
+
+EMPTY_RESUME = "data:application/pdf;base64,"
+
+TRUNCATED_OUTPUT = '{"candidate_profile": {"name": "Kim", "position": "BE", "objective": "backend"}, "career_experiences": ['
+REPAIRED = ResumeParseResult(candidate_profile=CandidateProfile(name="Kim", position="BE", objective="backend"))
+
+
+@pytest.fixture
+def parsing_graph_module(monkeypatch):
+    monkeypatch.setenv("GOOGLE_API_KEY", "test")
+    importlib.import_module("parsing_graph.parsing_graph")
+    return sys.modules["parsing_graph.parsing_graph"]
+
+
+def _stub_models(monkeypatch, pg, repair_fails: bool = False):
+    calls = []
+
+    class StubStructuredLLM:
+        def __init__(self, model):
+            self.model = model
+
+        async def ainvoke(self, messages, config=None):
+            calls.append((self.model, messages))
+            if self.model == "fake-repair-model":
+                if repair_fails:
+                    raise RuntimeError("repair failed")
+                return REPAIRED
+            return {"raw": AIMessage(content=TRUNCATED_OUTPUT), "parsed": None, "parsing_error": ValueError("Unterminated JSON array")}
+
+    class StubChatModel:
+        def __init__(self, model, **kwargs):
+            self.model = model
+
+        def with_structured_output(self, schema, include_raw=False):
+            return StubStructuredLLM(self.model)
+
+    monkeypatch.setattr(pg, "ChatGoogleGenerativeAI", StubChatModel)
+    return calls
+
+
+async def _parse(pg, **configurable):
+    config = {"configurable": {"career_relevant_document_parse_model": "fake-parse-model", "repair_model": "fake-repair-model", **configurable}}
+    return await RunnableLambda(pg.parse_resume_node).ainvoke(ParsingState(user_id="u1", resume_file_path=EMPTY_RESUME), config)
+
+
+async def test_invalid_output_is_repaired_by_the_text_model(parsing_graph_module, monkeypatch):
+    calls = _stub_models(monkeypatch, parsing_graph_module)
+
+    update = await _parse(parsing_graph_module)
+
+    assert update["error"] is None and update["parsed_result"] == REPAIRED
+    assert [model for model, _ in calls] == ["fake-parse-model", "fake-repair-model"]
+    # 수리 요청은 PDF 없이 원본 출력과 검증 오류만 보낸다.
+    repair_prompt = calls[1][1][1].content
+    assert TRUNCATED_OUTPUT in repair_prompt and "Unterminated JSON array" in repair_prompt
+
+
+async def test_a_failed_repair_falls_back_to_a_full_reparse(parsing_graph_module, monkeypatch):
+    calls = _stub_models(monkeypatch, parsing_graph_module, repair_fails=True)
+
+    update = await _parse(parsing_graph_module)
+
+    assert update["parsed_result"] is None and "Structured output validation failed" in update["error"]
+    assert [model for model, _ in calls] == ["fake-parse-model", "fake-repair-model"]
+
+
+async def test_repair_can_be_disabled(parsing_graph_module, monkeypatch):
+    calls = _stub_models(monkeypatch, parsing_graph_module)
+
+    update = await _parse(parsing_graph_module, repair_enabled=False)
+
+    assert update["parsed_result"] is None and update["error"]
+    assert [model for model, _ in calls] == ["fake-parse-model"]
+
+
+def test_raw_output_text_reads_tool_calls_and_text():
+    tool_call = AIMessage(content="", tool_calls=[{"name": "ResumeParseResult", "args": {"candidate_profile": {}}, "id": "1"}])
+
+    assert raw_output_text(tool_call) == '{"candidate_profile": {}}'
+    assert raw_output_text(AIMessage(content=TRUNCATED_OUTPUT)) == TRUNCATED_OUTPUT
+    assert raw_output_text(None) == ""
@@ -0,0 +1,194 @@
+import hashlib
+import importlib
+import sys
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from constants import supabase
+from parsing_graph.resume_file import afetch_resume_file, resume_file_store
+from parsing_graph.supabase_utils import FileAccessError, FileDownloadError, FileNotFoundError
+
+pytestmark = pytest.mark.anyio
+
+RESUME_BYTES = b"%PDF-1.4\n" + b"resume " * 10_000
+SIGNED_URL_PREFIX = "/storage/v1/object/sign/resumes"
+
+
+class StubStorageHandler(BaseHTTPRequestHandler):
+    """Serves the paths a Supabase Storage signed URL can answer with."""
+
+    requests: Counter = Counter()
+
+    def do_GET(self):
+        path = self.path.removeprefix(SIGNED_URL_PREFIX)
+        self.requests[path] += 1
+        if path == "/resume.pdf":
+            self.send_response(200)
+            self.send_header("Content-Type", "application/pdf")
+            self.send_header("Content-Length", str(len(RESUME_BYTES)))
+            self.end_headers()
+            self.wfile.write(RESUME_BYTES)
+        elif path == "/expired.pdf":
+            self.send_response(403)
+            self.end_headers()
+        elif path == "/redirect.pdf":
+            self.send_response(302)
+            self.send_header("Location", "http://169.254.169.254/latest/meta-data/")
+            self.end_headers()
+        else:
+            self.send_response(404)
+            self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def storage_url(monkeypatch):
+    StubStorageHandler.requests = Counter()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubStorageHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(supabase, "supabase_url", f"http://127.0.0.1:{server.server_address[1]}")
+    yield f"{supabase.supabase_url}{SIGNED_URL_PREFIX}"
+    server.shutdown()
+    server.server_close()
+
+
+async def test_fetch_streams_the_file_into_the_store(storage_url):
+    resume_file = await afetch_resume_file(f"{storage_url}/resume.pdf")
+
+    assert resume_file.data == RESUME_BYTES
+    assert resume_file.sha256 == hashlib.sha256(RESUME_BYTES).hexdigest()
+    assert resume_file.mime_type == "application/pdf"
+    assert resume_file_store.get(resume_file.sha256) == resume_file
+
+
+async def test_fetch_maps_failures_to_storage_errors(storage_url):
+    with pytest.raises(FileAccessError):
+        await afetch_resume_file(f"{storage_url}/expired.pdf")
+    with pytest.raises(FileNotFoundError):
+        await afetch_resume_file(f"{storage_url}/missing.pdf")
+    with pytest.raises(FileDownloadError):
+        await afetch_resume_file(f"{storage_url}/resume.pdf", max_bytes=1024)
+    # 리다이렉트는 따라가지 않는다.
+    with pytest.raises(FileDownloadError):
+        await afetch_resume_file(f"{storage_url}/redirect.pdf")
+
+
+async def test_fetch_rejects_paths_outside_supabase_storage(storage_url, tmp_path):
+    local_file = tmp_path / "secret.pdf"
+    local_file.write_bytes(RESUME_BYTES)
+
+    for resume_file_path in [
+        str(local_file),
+        f"file://{local_file}",
+        "http://169.254.169.254/latest/meta-data/",
+        storage_url.replace("127.0.0.1", "localhost") + "/resume.pdf",
+        storage_url.replace(SIGNED_URL_PREFIX, "/storage/v1/object/public/resumes") + "/resume.pdf",
+    ]:
+        with pytest.raises(FileAccessError):
+            await afetch_resume_file(resume_file_path)
+    assert sum(StubStorageHandler.requests.values()) == 0
+
+
+class StubStructuredLLM:
+    def __init__(self, schema, include_raw, urls):
+        self.schema = schema
+        self.include_raw = include_raw
+        self.urls = urls
+
+    async def ainvoke(self, messages, config=None):
+        from parsing_graph.schema.is_resume import IsResumeResult
+        from parsing_graph.schema.schema import CandidateProfile, ResumeParseResult
+
+        self.urls.append(messages[1].content[1]["image_url"]["url"])
+        if self.schema is IsResumeResult:
+            return IsResumeResult(is_resume=True, reason="stub")
+        if self.urls.count(self.urls[-1]) == 2:
+            # 첫 파싱 호출은 실패시켜 재시도 경로를 거치게 한다.
+            raise RuntimeError("stub failure")
+        parsed = ResumeParseResult(candidate_profile=CandidateProfile(name="stub", position="BE", objective="stub"))
+        return {"raw": None, "parsed": parsed, "parsing_error": None}
+
+
+async def test_graph_fetches_the_file_once_across_nodes_and_retries(storage_url, monkeypatch):
+    monkeypatch.setenv("GOOGLE_API_KEY", "test")
+    importlib.import_module("parsing_graph.parsing_graph")
+    pg = sys.modules["parsing_graph.parsing_graph"]
+    urls: list[str] = []
+
+    class StubChatModel:
+        def __init__(self, model, **kwargs):
+            pass
+
+        def with_structured_output(self, schema, include_raw=False):
+            return StubStructuredLLM(schema, include_raw, urls)
+
+    async def stub_aget_current_generation(user_id):
+        return None
+
+    async def stub_astage_documents(user_id, generation, documents, current_generation=None):
+        return len(documents), 0
+
+    async def stub_anew_generation(user_id):
+        return 1
+
+    async def stub_aset_current_generation(user_id, generation):
+        return True
+
+    monkeypatch.setattr(pg, "ChatGoogleGenerativeAI", StubChatModel)
+    monkeypatch.setattr(pg, "aget_current_generation", stub_aget_current_generation)
+    monkeypatch.setattr(pg, "astage_documents", stub_astage_documents)
+    monkeypatch.setattr(pg, "aset_current_generation", stub_aset_current_generation)
+    monkeypatch.setattr(pg, "anew_generation", stub_anew_generation)
+    monkeypatch.setattr(pg, "schedule_generation_gc", lambda user_id, generation: None)
+
+    result = await pg.parsing_graph.ainvoke(
+        {"user_id": "user", "resume_file_path": f"{storage_url}/resume.pdf"},
+        {"configurable": {"parse_cache_enabled": False}},
+    )
+
+    assert result["error"] is None
+    assert result["parse_retry_count"] == 1
+    # is_resume, 실패한 parse, 재시도한 parse 모두 같은 바이트를 data URI로 보낸다.
+    assert len(urls) == 3
+    assert all(url.startswith("data:application/pdf;base64,") for url in urls)
+    assert StubStorageHandler.requests["/resume.pdf"] == 1
+
+
+async def test_graph_rejects_local_paths_without_reading_them(tmp_path, monkeypatch):
+    monkeypatch.setenv("GOOGLE_API_KEY", "test")
+    importlib.import_module("parsing_graph.parsing_graph")
+    pg = sys.modules["parsing_graph.parsing_graph"]
+    local_file = tmp_path / "secret.pdf"
+    local_file.write_bytes(RESUME_BYTES)
+
+    class FailingChatModel:
+        def __init__(self, model, **kwargs):
+            raise AssertionError("The model must not be called with a local file.")
+
+    monkeypatch.setattr(pg, "ChatGoogleGenerativeAI", FailingChatModel)
+
+    result = await pg.parsing_graph.ainvoke({"user_id": "user", "resume_file_path": str(local_file)})
+
+    assert result["error"].startswith("이력서 파일에 접근할 수 없습니다")
+
+
+async def test_graph_reports_expired_urls_without_calling_the_model(storage_url, monkeypatch):
+    monkeypatch.setenv("GOOGLE_API_KEY", "test")
+    importlib.import_module("parsing_graph.parsing_graph")
+    pg = sys.modules["parsing_graph.parsing_graph"]
+
+    class FailingChatModel:
+        def __init__(self, model, **kwargs):
+            raise AssertionError("The model must not be called when the file cannot be fetched.")
+
+    monkeypatch.setattr(pg, "ChatGoogleGenerativeAI", FailingChatModel)
+
+    result = await pg.parsing_graph.ainvoke({"user_id": "user", "resume_file_path": f"{storage_url}/expired.pdf"})
+
+    assert result["error"].startswith("이력서 파일에 접근할 수 없습니다")
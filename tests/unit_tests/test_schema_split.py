@@ -0,0 +1,110 @@
+import importlib
+import sys
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+from parsing_graph.schema.schema import CandidateProfile, CareerExperience, CareerExperiences, ProjectExperiences, ResumeParseResult
+from parsing_graph.state import ParsingState
+
+pytestmark = pytest.mark.anyio
+
+EMPTY_RESUME = "data:application/pdf;base64,"
+
+CONFIG = {
+    "configurable": {
+        "parse_strategy": "schema_split",
+        "profile_parse_model": "fake-profile-model",
+        "profile_parse_thinking_budget": 0,
+        "career_parse_model": "fake-career-model",
+        "career_parse_thinking_budget": 2048,
+        "project_parse_model": "fake-project-model",
+    }
+}
+CAREER = CareerExperience(
+    company="Acme",
+    company_description="Payments",
+    employee_type="EMPLOYEE",
+    start_date="2020-01",
+    end_date=None,
+    tech_stack=["Python"],
+    summary="Built a payment service.",
+)
+
+
+@pytest.fixture
+def parsing_graph_module(monkeypatch):
+    monkeypatch.setenv("GOOGLE_API_KEY", "test")
+    importlib.import_module("parsing_graph.parsing_graph")
+    return sys.modules["parsing_graph.parsing_graph"]
+
+
+def _stub_models(monkeypatch, pg, fail_career: list[bool]):
+    calls = []
+
+    class StubStructuredLLM:
+        def __init__(self, model, kwargs, schema, include_raw):
+            self.model, self.kwargs, self.schema, self.include_raw = model, kwargs, schema, include_raw
+
+        async def ainvoke(self, messages, config=None):
+            calls.append((self.model, self.kwargs.get("thinking_budget"), messages[1].content[0]["text"]))
+            if self.schema is CandidateProfile:
+                parsed = CandidateProfile(name="Kim", position="BE", objective="backend")
+            elif self.schema is CareerExperiences:
+                if fail_career.pop(0):
+                    raise RuntimeError("career call failed")
+                parsed = CareerExperiences(career_experiences=[CAREER])
+            else:
+                parsed = ProjectExperiences(project_experiences=[])
+            if self.include_raw:
+                return {"raw": None, "parsed": parsed, "parsing_error": None}
+            return parsed
+
+    class StubChatModel:
+        def __init__(self, model, **kwargs):
+            self.model, self.kwargs = model, kwargs
+
+        def with_structured_output(self, schema, include_raw=False):
+            return StubStructuredLLM(self.model, self.kwargs, schema, include_raw)
+
+    monkeypatch.setattr(pg, "ChatGoogleGenerativeAI", StubChatModel)
+    return calls
+
+
+async def test_each_part_uses_its_own_model_budget_and_instruction(parsing_graph_module, monkeypatch):
+    calls = _stub_models(monkeypatch, parsing_graph_module, fail_career=[False])
+
+    update = await RunnableLambda(parsing_graph_module.parse_resume_node).ainvoke(
+        ParsingState(user_id="u1", resume_file_path=EMPTY_RESUME), CONFIG
+    )
+
+    assert update["error"] is None
+    assert update["parsed_result"] == ResumeParseResult(
+        candidate_profile=CandidateProfile(name="Kim", position="BE", objective="backend"),
+        career_experiences=[CAREER],
+    )
+    assert update["partial_parse_results"] == {}
+    by_model = {model: (thinking_budget, instruction) for model, thinking_budget, instruction in calls}
+    assert set(by_model) == {"fake-profile-model", "fake-career-model", "fake-project-model"}
+    instructions = {prefix: instruction for _, _, prefix, instruction in parsing_graph_module.SCHEMA_SPLIT_PARTS}
+    assert by_model["fake-profile-model"] == (0, instructions["profile"])
+    assert by_model["fake-career-model"] == (2048, instructions["career"])
+
+
+async def test_a_retry_calls_only_the_parts_that_failed(parsing_graph_module, monkeypatch):
+    calls = _stub_models(monkeypatch, parsing_graph_module, fail_career=[True, False])
+    node = RunnableLambda(parsing_graph_module.parse_resume_node)
+
+    failed = await node.ainvoke(ParsingState(user_id="u1", resume_file_path=EMPTY_RESUME), CONFIG)
+
+    assert failed["parsed_result"] is None and failed["error"]
+    assert set(failed["partial_parse_results"]) == {"candidate_profile", "project_experiences"}
+
+    calls.clear()
+    retried = await node.ainvoke(
+        ParsingState(user_id="u1", resume_file_path=EMPTY_RESUME, partial_parse_results=failed["partial_parse_results"]), CONFIG
+    )
+
+    assert [model for model, _, _ in calls] == ["fake-career-model"]
+    assert retried["error"] is None and retried["parsed_result"].career_experiences == [CAREER]
+    assert retried["partial_parse_results"] == {}
@@ -0,0 +1,94 @@
+import asyncio
+import importlib
+import json
+import sys
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+from parsing_graph.speculative import SpeculationStats
+from parsing_graph.state import ParsingState
+
+pytestmark = pytest.mark.anyio
+
+EMPTY_RESUME = "data:application/pdf;base64,"
+
+PROFILE = {"name": "stub", "position": "BE", "objective": "stub"}
+CAREER = {
+    "start_date": "2020-01",
+    "end_date": "2021-01",
+    "tech_stack": ["Python"],
+    "summary": "Built a payment service.",
+    "company": "Acme",
+    "company_description": "Payments",
+    "employee_type": "EMPLOYEE",
+}
+
+
+async def test_a_rejected_document_stops_the_parse_before_the_node_returns(monkeypatch):
+    monkeypatch.setenv("GOOGLE_API_KEY", "test")
+    importlib.import_module("parsing_graph.parsing_graph")
+    pg = sys.modules["parsing_graph.parsing_graph"]
+    events: list[str] = []
+
+    class RejectingStructuredLLM:
+        async def ainvoke(self, messages, config=None):
+            from parsing_graph.schema.is_resume import IsResumeResult
+
+            await asyncio.sleep(0.05)
+            return IsResumeResult(is_resume=False, reason="stub")
+
+    class SlowStreamingLLM:
+        async def astream(self, messages, config=None):
+            # 첫 경력 항목은 바로 완성되어 미리 인덱싱이 시작되고, 나머지 생성은 느리게 이어진다.
+            text = json.dumps({"candidate_profile": PROFILE, "career_experiences": [CAREER, CAREER]})
+            try:
+                cut = text.rindex("{") + 1
+                yield SimpleNamespace(text=text[:cut])
+                await asyncio.sleep(10)
+                yield SimpleNamespace(text=text[cut:])
+            finally:
+                events.append("parse stopped")
+
+    class StubChatModel:
+        def __init__(self, model, **kwargs):
+            pass
+
+        def with_structured_output(self, schema, include_raw=False):
+            return RejectingStructuredLLM()
+
+        def bind(self, **kwargs):
+            return SlowStreamingLLM()
+
+    async def stub_aget_current_generation(user_id):
+        return None
+
+    async def stub_anew_generation(user_id):
+        return 1
+
+    async def stub_astage_documents(user_id, generation, documents, current_generation=None):
+        events.append("stage started")
+        await asyncio.sleep(0.2)
+        events.append("staged")
+        return len(documents), 0
+
+    stats = SpeculationStats()
+    record_wasted = stats.record_wasted
+    monkeypatch.setattr(stats, "record_wasted", lambda seconds: events.append("wasted") or record_wasted(seconds))
+    monkeypatch.setattr(pg, "ChatGoogleGenerativeAI", StubChatModel)
+    monkeypatch.setattr(pg, "speculation_stats", stats)
+    monkeypatch.setattr(pg, "aget_current_generation", stub_aget_current_generation)
+    monkeypatch.setattr(pg, "anew_generation", stub_anew_generation)
+    monkeypatch.setattr(pg, "astage_documents", stub_astage_documents)
+
+    update = await RunnableLambda(pg.speculative_parse_node).ainvoke(
+        ParsingState(user_id="user", resume_file_path=EMPTY_RESUME),
+        {"configurable": {"speculative_parse": True, "stream_parse": True, "pre_classify_enabled": False}},
+    )
+    await asyncio.sleep(0.3)
+
+    assert update["parsed_result"] is None and update["is_resume_result"].is_resume is False
+    # 낭비 기록은 parse가 멈춘 뒤에 하고, 시작된 인덱싱은 끝까지 기록되지 않는다.
+    assert events == ["stage started", "parse stopped", "wasted"]
+    assert stats.as_dict()["wasted_parses"] == 1
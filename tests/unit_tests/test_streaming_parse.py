@@ -0,0 +1,64 @@
+from parsing_graph.schema.schema import CandidateProfile, CareerExperience, ProjectExperience, ResumeParseResult
+from parsing_graph.streaming import StreamingParseExtractor, item_title
+
+
+def _career(company: str, summary: str) -> CareerExperience:
+    return CareerExperience(
+        company=company,
+        company_description="Payments",
+        employee_type="EMPLOYEE",
+        start_date="2020-01",
+        end_date=None,
+        tech_stack=["Python"],
+        summary=summary,
+    )
+
+
+RESULT = ResumeParseResult(
+    candidate_profile=CandidateProfile(name="Kim", position="BE", objective="backend"),
+    career_experiences=[_career("Acme", "Built a payment service."), _career("Globex", "Built a ledger.")],
+    project_experiences=[ProjectExperience(project_name="Side", project_type="PERSONAL", start_date="2021-01", end_date=None, tech_stack=["Go"], summary="A CLI.")],
+)
+TEXT = RESULT.model_dump_json()
+
+
+def _stream(chunk_size: int) -> tuple[StreamingParseExtractor, list[tuple[int, str, int, object]]]:
+    extractor = StreamingParseExtractor()
+    emitted = []
+    for end in range(chunk_size, len(TEXT) + chunk_size, chunk_size):
+        emitted += [(end, *item) for item in extractor.feed(TEXT[:end])]
+    emitted += [(len(TEXT), *item) for item in extractor.feed(TEXT, final=True)]
+    return extractor, emitted
+
+
+def test_each_item_is_emitted_once_and_only_when_complete():
+    for chunk_size in (1, 7, 64):
+        extractor, emitted = _stream(chunk_size)
+
+        assert [(key, index) for _, key, index, _ in emitted] == [
+            ("career_experiences", 0),
+            ("career_experiences", 1),
+            ("project_experiences", 0),
+        ]
+        # 잘린 요약으로 미리 꺼내지 않고, 최종 결과와 같은 항목만 내보낸다.
+        assert [item for _, _, _, item in emitted] == [*RESULT.career_experiences, *RESULT.project_experiences]
+        assert extractor.candidate_profile == RESULT.candidate_profile
+        # 각 항목은 JSON에서 그 항목이 닫힌 뒤에야 나온다.
+        for end, _, _, item in emitted:
+            assert item.model_dump_json() in TEXT[:end]
+
+
+def test_the_last_item_waits_for_the_final_feed():
+    extractor = StreamingParseExtractor()
+
+    assert [index for _, index, _ in extractor.feed(TEXT)] == [0, 1]
+    assert [(key, index) for key, index, _ in extractor.feed(TEXT, final=True)] == [("project_experiences", 0)]
+    assert extractor.feed(TEXT, final=True) == []
+
+
+def test_unparseable_or_invalid_items_are_skipped():
+    extractor = StreamingParseExtractor()
+
+    assert extractor.feed("not json") == []
+    assert extractor.feed('{"career_experiences": [{"company": "Acme"}, {"company": "Globex"', final=False) == []
+    assert [item_title(item) for _, _, item in extractor.feed(TEXT, final=True)] == ["Globex", "Side"]